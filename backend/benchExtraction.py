@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark
+Measures wall time and peak memory of CompleteCaseExtractor on a set of PDFs
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Cold-start import budget for CLI commands that do not touch PDFs
+STARTUP_BUDGET_MS = 60
+HEAVY_MODULES = {"pdfplumber", "pdfminer", "fitz", "pymupdf", "pdf2image", "PIL", "numpy"}
+
+BENCH_MODES = {
+    "standard": {"low_memory": False},
+    "low_memory": {"low_memory": True},
+}
+
+
+def run_worker(mode, pdf_files, max_rss_mb=None):
+    """
+    Extract the given PDFs in this process and report timings
+
+    Runs in a fresh interpreter per mode so that the peak RSS reported
+    by the kernel belongs to that mode only.
+    """
+    from extractPDFsComplete import CompleteCaseExtractor, peak_rss_mb
+
+    options = dict(BENCH_MODES[mode])
+    if options["low_memory"] and max_rss_mb is not None:
+        options["max_rss_mb"] = max_rss_mb
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        extractor = CompleteCaseExtractor(output_dir=Path(tmp_dir) / "data", **options)
+
+        for pdf_file in pdf_files:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = extractor.extract_complete_pdf(pdf_file)
+            results.append({
+                "pdf": Path(pdf_file).name,
+                "seconds": time.perf_counter() - start,
+                "cases": len(result["cases"]),
+                "peak_rss_mb": peak_rss_mb(),
+                "stage_seconds": result["extraction_metadata"]["stage_seconds"]
+            })
+
+    return {
+        "mode": mode,
+        "pdfs": results,
+        "total_seconds": sum(r["seconds"] for r in results),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_benchmark(pdf_files, modes=("standard", "low_memory"), max_rss_mb=None):
+    """
+    Run every mode in its own subprocess
+
+    Returns:
+        List of per-mode result dictionaries
+    """
+    reports = []
+
+    for mode in modes:
+        cmd = [sys.executable, __file__, "--worker", mode]
+        if max_rss_mb is not None:
+            cmd += ["--max-rss-mb", str(max_rss_mb)]
+        cmd += [str(p) for p in pdf_files]
+
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).parent)
+        if proc.returncode != 0:
+            print(f"❌ Benchmark mode '{mode}' failed:\n{proc.stderr}")
+            continue
+
+        reports.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    return reports
+
+
+def calibrate_cost_model(reports, pdf_files, path=None):
+    """
+    Record the standard-mode timings as cost-model samples and refit it
+
+    Returns:
+        The refitted CostModel, or None without a standard-mode report
+    """
+    from extractionCost import CALIBRATION_PATH, record_samples, scan_pdf
+
+    report = next((r for r in reports if r["mode"] == "standard"), None)
+    if report is None:
+        return None
+
+    paths = {Path(p).name: p for p in pdf_files}
+    samples = [
+        {
+            "pdf": r["pdf"],
+            "features": scan_pdf(paths[r["pdf"]]),
+            "seconds": round(r["seconds"], 3),
+            "stage_seconds": r["stage_seconds"]
+        }
+        for r in report["pdfs"]
+    ]
+    return record_samples(samples, path or CALIBRATION_PATH)
+
+
+def compare_screenshots(pdf_files):
+    """
+    Compare full-page and cropped exhibit screenshots on the same pages
+
+    Both variants are rendered with PyMuPDF at the extractor's DPI so the
+    comparison does not depend on poppler being installed.
+
+    Returns:
+        List of per-PDF dictionaries with render time and bytes for both
+    """
+    import fitz
+    from extractPDFsComplete import CompleteCaseExtractor
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        extractor = CompleteCaseExtractor(output_dir=Path(tmp_dir) / "data")
+
+        for pdf_file in pdf_files:
+            out_dir = extractor.exhibits_dir / Path(pdf_file).stem
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                pages_data = extractor._extract_text_and_tables(pdf_file)
+            exhibit_pages = extractor._detect_exhibit_pages(pages_data)
+
+            start = time.perf_counter()
+            with fitz.open(pdf_file) as doc:
+                full = [extractor._render_region(doc[n - 1], n, None, out_dir) for n in exhibit_pages]
+            full_seconds = time.perf_counter() - start
+            full_bytes = sum((extractor.output_dir.parent / s["filepath"]).stat().st_size for s in full)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                cropped = extractor._create_exhibit_screenshots(pdf_file, exhibit_pages, out_dir, pages_data)
+            cropped_seconds = time.perf_counter() - start
+            cropped_bytes = sum((extractor.output_dir.parent / s["filepath"]).stat().st_size for s in cropped)
+
+            rows.append({
+                "pdf": Path(pdf_file).name,
+                "pages": len(exhibit_pages),
+                "cropped_pages": len({s["page"] for s in cropped if "region" in s}),
+                "full_seconds": full_seconds,
+                "full_bytes": full_bytes,
+                "cropped_seconds": cropped_seconds,
+                "cropped_bytes": cropped_bytes
+            })
+
+    return rows
+
+
+def print_screenshot_report(rows):
+    """Print byte and time savings of cropped screenshots"""
+    print(f"\n{'='*60}")
+    print("EXHIBIT SCREENSHOTS: FULL PAGE vs CROPPED")
+    print(f"{'='*60}\n")
+
+    for r in rows:
+        print(f"  {r['pdf'][:34]:<34} {r['cropped_pages']:3d}/{r['pages']:<3d} cropped  "
+              f"{r['full_bytes'] / 1e6:6.2f} → {r['cropped_bytes'] / 1e6:6.2f} MB  "
+              f"{r['full_seconds']:6.2f} → {r['cropped_seconds']:6.2f}s")
+
+    full_bytes = sum(r["full_bytes"] for r in rows)
+    cropped_bytes = sum(r["cropped_bytes"] for r in rows)
+    full_seconds = sum(r["full_seconds"] for r in rows)
+    cropped_seconds = sum(r["cropped_seconds"] for r in rows)
+
+    print(f"\n  Bytes: {full_bytes / 1e6:.2f} MB → {cropped_bytes / 1e6:.2f} MB "
+          f"({1 - cropped_bytes / max(full_bytes, 1):.0%} smaller)")
+    print(f"  Time:  {full_seconds:.2f}s → {cropped_seconds:.2f}s "
+          f"({1 - cropped_seconds / max(full_seconds, 1e-9):.0%} faster)\n")
+
+
+def _synthetic_corpus(extraction_path, n_cases):
+    """
+    Cases of an extraction output repeated up to n_cases
+
+    Every repetition gets its own case IDs, source and asset paths, so only
+    cases of the same (synthetic) casebook share assets, as in real output.
+    """
+    from recordCodec import load
+
+    template = json.dumps(load(extraction_path)["cases"])
+    cases = []
+    copy = 0
+    while len(cases) < n_cases:
+        for case in json.loads(template):
+            case["case_id"] = f"{copy}/{case['case_id']}"
+            case["source"] = f"{copy}/{case['source']}"
+            for assets in case.get("visual_assets", {}).values():
+                for asset in assets:
+                    asset["filepath"] = f"{copy}/{asset['filepath']}"
+            cases.append(case)
+        copy += 1
+    return {"metadata": {}, "cases": cases[:n_cases]}
+
+
+def _timed(func, repeat=3):
+    """Best wall time of several runs, and the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def compare_codecs(extraction_path, n_cases=10000):
+    """
+    Compare serialisations of the extraction output at corpus scale
+
+    Baseline is the previous format (json with indent=2, dictionaries);
+    the codec variants encode compact JSON (stdlib and orjson) and
+    MessagePack. Validation is timed on its own.
+
+    Returns:
+        Dictionary with the case count, per-format rows and the validation time
+    """
+    import recordCodec
+    from caseRecords import validate_cases
+
+    output = _synthetic_corpus(extraction_path, n_cases)
+    formats = [
+        ("json indent=2", lambda d: json.dumps(d, indent=2).encode("utf-8"), json.loads),
+        ("json compact", lambda d: json.dumps(d, separators=(",", ":")).encode("utf-8"), json.loads),
+    ]
+    if recordCodec.orjson is not None:
+        formats.append(("orjson compact", recordCodec.encode, recordCodec.decode))
+    try:
+        recordCodec.encode_binary({})
+        formats.append(("msgpack", recordCodec.encode_binary, recordCodec.decode_binary))
+    except ImportError:
+        pass
+
+    rows = []
+    for name, encode, decode in formats:
+        encode_seconds, raw = _timed(lambda: encode(output))
+        decode_seconds, _ = _timed(lambda: decode(raw))
+        rows.append({"format": name, "bytes": len(raw),
+                     "encode_seconds": encode_seconds, "decode_seconds": decode_seconds})
+
+    validate_seconds, _ = _timed(lambda: validate_cases(output["cases"]))
+
+    return {
+        "cases": n_cases,
+        "formats": rows,
+        "validate_seconds": validate_seconds
+    }
+
+
+def print_codec_report(report):
+    """Print size and speed of each serialisation"""
+    print(f"\n{'='*60}")
+    print(f"CASE SERIALISATION ({report['cases']} cases)")
+    print(f"{'='*60}\n")
+
+    base = report["formats"][0]
+    for r in report["formats"]:
+        print(f"  {r['format']:<16} {r['bytes'] / 1e6:8.1f} MB  "
+              f"encode {r['encode_seconds']:6.2f}s  decode {r['decode_seconds']:6.2f}s  "
+              f"({base['encode_seconds'] / r['encode_seconds']:.1f}x / "
+              f"{base['decode_seconds'] / r['decode_seconds']:.1f}x)")
+
+    print(f"\n  Validation: {report['validate_seconds']:.2f}s\n")
+
+
+def print_report(reports):
+    """Print a side-by-side summary of the benchmark modes"""
+    print(f"\n{'='*60}")
+    print("EXTRACTION BENCHMARK")
+    print(f"{'='*60}\n")
+
+    for report in reports:
+        print(f"{report['mode']}:")
+        for r in report["pdfs"]:
+            print(f"  {r['pdf'][:40]:<40} {r['seconds']:7.2f}s  {r['peak_rss_mb']:8.1f} MB")
+        print(f"  {'TOTAL':<40} {report['total_seconds']:7.2f}s  {report['peak_rss_mb']:8.1f} MB peak\n")
+
+    if len(reports) == 2:
+        before, after = reports
+        print(f"Peak RSS: {before['peak_rss_mb']:.1f} MB → {after['peak_rss_mb']:.1f} MB "
+              f"({after['peak_rss_mb'] - before['peak_rss_mb']:+.1f} MB)")
+        print(f"Time:     {before['total_seconds']:.2f}s → {after['total_seconds']:.2f}s\n")
+
+
+def measure_startup(commands=(["--help"], ["stats", "--help"], ["segment", "--help"])):
+    """
+    Measure cold start of the pipeline CLI with python -X importtime
+
+    Returns:
+        List of dictionaries with total import time and any heavy modules
+        (PDF/imaging libraries) the command pulled in
+    """
+    cli = Path(__file__).resolve().parent.parent / "tools" / "pipeline.py"
+    rows = []
+
+    for command in commands:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", str(cli), *command],
+            capture_output=True, text=True
+        )
+
+        import_us = 0
+        heavy = set()
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            import_us += int(self_us)
+            top_level = name.strip().split(".")[0]
+            if top_level in HEAVY_MODULES:
+                heavy.add(top_level)
+
+        rows.append({
+            "command": " ".join(command),
+            "import_ms": import_us / 1000,
+            "heavy_modules": sorted(heavy),
+            "within_budget": import_us / 1000 <= STARTUP_BUDGET_MS and not heavy
+        })
+
+    return rows
+
+
+def print_startup_report(rows):
+    """Print cold-start import time per CLI command"""
+    print(f"\n{'='*60}")
+    print(f"CLI STARTUP (budget {STARTUP_BUDGET_MS} ms, no PDF libraries)")
+    print(f"{'='*60}\n")
+
+    for r in rows:
+        status = "✓" if r["within_budget"] else "❌"
+        heavy = f"  loaded: {', '.join(r['heavy_modules'])}" if r["heavy_modules"] else ""
+        print(f"  {status} pipeline.py {r['command']:<20} {r['import_ms']:7.1f} ms{heavy}")
+    print()
+
+
+def run(args):
+    """Run the benchmark selected by parsed command-line options"""
+    if args.startup:
+        print_startup_report(measure_startup())
+        return
+
+    if args.codec:
+        print_codec_report(compare_codecs(args.codec, args.codec_cases))
+        return
+
+    pdf_files = [Path(p).resolve() for p in args.pdfs] or \
+        sorted(p.resolve() for p in Path(args.casebooks_dir).glob("*.pdf"))
+
+    if not pdf_files:
+        print(f"\n⚠️  No PDF files found in {args.casebooks_dir}\n")
+        return
+
+    if args.screenshots:
+        print_screenshot_report(compare_screenshots(pdf_files))
+    else:
+        reports = run_benchmark(pdf_files, max_rss_mb=args.max_rss_mb)
+        print_report(reports)
+        if not args.no_calibrate:
+            model = calibrate_cost_model(reports, pdf_files)
+            if model is not None:
+                print(f"📐 Extraction cost model: {model.describe()}\n")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    from pipelineArguments import add_bench_arguments
+
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction")
+    add_bench_arguments(parser)
+    parser.add_argument("--worker", choices=sorted(BENCH_MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        pdf_files = [Path(p).resolve() for p in args.pdfs]
+        print(json.dumps(run_worker(args.worker, pdf_files, args.max_rss_mb)))
+        return
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const CaseTextStore = require('./caseText');
 
 class KnowledgeBaseBuilder {
   constructor() {
@@ -13,7 +14,8 @@ class KnowledgeBaseBuilder {
       last_updated: new Date().toISOString(),
       total_cases_analyzed: 0,
       sources: [],
-      case_structures: [],
+      // Counts, in the same shape kbAggregates.py maintains per casebook
+      case_structures: { flags: {}, question_counts: {} },
       opening_patterns: {},
       framework_approaches: {},
       clarifying_questions_patterns: [],
@@ -37,6 +39,7 @@ class KnowledgeBaseBuilder {
     }
 
     const data = JSON.parse(fs.readFileSync(extractedPath, 'utf8'));
+    this.texts = new CaseTextStore(data.texts);
     return data.cases;
   }
 
@@ -76,20 +79,27 @@ class KnowledgeBaseBuilder {
   }
 
   /**
-   * Extract structure patterns
+   * Count structure flags and question counts
    */
   extractStructurePatterns(caseData) {
     const structure = {
       has_prompt: !!caseData.prompt,
       has_clarifying: !!caseData.clarifying_info,
-      has_framework: caseData.framework && caseData.framework.length > 0,
-      has_questions: caseData.questions && caseData.questions.length > 0,
-      question_count: caseData.questions ? caseData.questions.length : 0,
-      has_exhibits: caseData.exhibits && caseData.exhibits.length > 0,
+      has_framework: !!(caseData.framework && caseData.framework.length > 0),
+      has_questions: !!(caseData.questions && caseData.questions.length > 0),
+      has_exhibits: !!(caseData.exhibits && caseData.exhibits.length > 0),
       has_conclusion: !!caseData.conclusion
     };
+    const { flags, question_counts: questionCounts } = this.knowledgeBase.case_structures;
 
-    this.knowledgeBase.case_structures.push(structure);
+    Object.entries(structure).forEach(([flag, present]) => {
+      if (present) {
+        flags[flag] = (flags[flag] || 0) + 1;
+      }
+    });
+
+    const questionCount = String(caseData.questions ? caseData.questions.length : 0);
+    questionCounts[questionCount] = (questionCounts[questionCount] || 0) + 1;
   }
 
   /**
@@ -239,7 +249,7 @@ class KnowledgeBaseBuilder {
    */
   extractBrainstormingPatterns(caseData) {
     // Look for brainstorming prompts in the case
-    const text = caseData.raw_text || '';
+    const text = this.texts.caseText(caseData);
     const brainstormMatches = text.match(/(?:risks?|factors?|considerations?|approaches?).*?\?/gi);
 
     if (brainstormMatches) {
@@ -321,11 +331,30 @@ class KnowledgeBaseBuilder {
     });
   }
 
+  /**
+   * Aggregates merged by kbAggregates.py into the current knowledge base
+   */
+  loadAggregates(kbPath) {
+    try {
+      return JSON.parse(fs.readFileSync(kbPath, 'utf8')).aggregates || null;
+    } catch (e) {
+      return null;
+    }
+  }
+
   /**
    * Save knowledge base to file
+   *
+   * The per-casebook aggregates are carried over, so the next incremental
+   * update (kbAggregates.py) merges against them instead of starting over.
    */
   save() {
     const outputPath = path.join(__dirname, '../data/knowledge_base.json');
+    const aggregates = this.loadAggregates(outputPath);
+    if (aggregates) {
+      this.knowledgeBase.aggregates = aggregates;
+      this.knowledgeBase.sources = Object.keys(aggregates.sources).sort();
+    }
     fs.writeFileSync(outputPath, JSON.stringify(this.knowledgeBase, null, 2));
     console.log(`\n✓ Saved to ${outputPath}`);
   }
@@ -0,0 +1,76 @@
+/**
+ * Case Bundle
+ * Reads cases out of data/library/cases.bundle (see caseBundle.py): the
+ * header of case IDs -> byte ranges is parsed once and each case is a single
+ * positioned read of an open file descriptor
+ */
+
+const fs = require('fs');
+
+const BUNDLE_MAGIC = 'CASEBNDL';
+const BUNDLE_VERSION = 1;
+const PREAMBLE_SIZE = 16;
+
+class CaseBundle {
+  /**
+   * @param {string} bundlePath - Path to cases.bundle
+   * @throws {Error} If the file is not a case bundle of a supported version
+   */
+  constructor(bundlePath) {
+    this.path = bundlePath;
+    this.fd = fs.openSync(bundlePath, 'r');
+
+    try {
+      const preamble = Buffer.alloc(PREAMBLE_SIZE);
+      fs.readSync(this.fd, preamble, 0, PREAMBLE_SIZE, 0);
+      if (preamble.toString('latin1', 0, 8) !== BUNDLE_MAGIC || preamble.readUInt32LE(8) !== BUNDLE_VERSION) {
+        throw new Error(`${bundlePath}: not a version ${BUNDLE_VERSION} case bundle`);
+      }
+
+      const headerLength = preamble.readUInt32LE(12);
+      const header = Buffer.alloc(headerLength);
+      fs.readSync(this.fd, header, 0, headerLength, PREAMBLE_SIZE);
+      const { build, created, cases } = JSON.parse(header.toString('utf8'));
+
+      this.build = build;
+      this.created = created;
+      this.offsets = cases;
+      this.base = PREAMBLE_SIZE + headerLength;
+    } catch (error) {
+      this.close();
+      throw error;
+    }
+  }
+
+  /**
+   * @param {string} case_id - Case ID
+   * @returns {boolean}
+   */
+  has(case_id) {
+    return Object.prototype.hasOwnProperty.call(this.offsets, case_id);
+  }
+
+  /**
+   * Decoded case, or null if the case is not in the bundle
+   * @param {string} case_id - Case ID
+   * @returns {object|null}
+   */
+  get(case_id) {
+    if (!this.has(case_id)) {
+      return null;
+    }
+    const [offset, length] = this.offsets[case_id];
+    const raw = Buffer.alloc(length);
+    fs.readSync(this.fd, raw, 0, length, this.base + offset);
+    return JSON.parse(raw.toString('utf8'));
+  }
+
+  close() {
+    if (this.fd !== null) {
+      fs.closeSync(this.fd);
+      this.fd = null;
+    }
+  }
+}
+
+module.exports = CaseBundle;
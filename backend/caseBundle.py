@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Case Bundle
+Every case.json of the library packed back to back in one file, behind a
+header that maps case IDs to byte ranges, so a case is one slice of a
+memory map (Python) or one positioned read (Node) instead of a path join,
+an open and a read per case, and the library ships as one file plus its
+exhibits
+
+Layout (little-endian):
+    8 bytes   magic "CASEBNDL"
+    4 bytes   format version
+    4 bytes   header length
+    header    compact JSON {"build", "created", "cases": {case_id: [offset, length]}}
+    records   case.json bytes; offsets count from the end of the header
+"""
+
+import mmap
+import struct
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from fileUtils import write_bytes_atomic
+from recordCodec import decode, encode
+
+BUNDLE_FILE = "cases.bundle"
+BUNDLE_MAGIC = b"CASEBNDL"
+BUNDLE_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+
+
+class BundleError(ValueError):
+    """Raised when a file is not a case bundle of a supported version"""
+
+
+class CaseBundle:
+    """
+    Read-only view of a case bundle
+
+    The file is memory-mapped: records are read by slicing, and a bundle
+    replaced on disk (bundles are published atomically) does not affect
+    an open view.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = self.path.stat()
+            self.signature = (stat.st_size, stat.st_mtime_ns)
+            # mmap cannot map an empty file; a bundle always has a preamble
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < PREAMBLE.size:
+            self.close()
+            raise BundleError(f"{self.path}: too short for a case bundle")
+
+        magic, version, header_length = PREAMBLE.unpack_from(self._map)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self.close()
+            raise BundleError(f"{self.path}: not a version {BUNDLE_VERSION} case bundle")
+
+        self._base = PREAMBLE.size + header_length
+        header = decode(self._map[PREAMBLE.size:self._base])
+        self.build = header["build"]
+        self.created = header["created"]
+        self._offsets = header["cases"]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, case_id):
+        return case_id in self._offsets
+
+    def case_ids(self):
+        return list(self._offsets)
+
+    def raw(self, case_id):
+        """
+        Encoded case.json of a case
+
+        Returns:
+            Bytes, or None if the case is not in the bundle
+        """
+        location = self._offsets.get(case_id)
+        if location is None:
+            return None
+        start = self._base + location[0]
+        return self._map[start:start + location[1]]
+
+    def get(self, case_id):
+        """Decoded case, or None if the case is not in the bundle"""
+        raw = self.raw(case_id)
+        return None if raw is None else decode(raw)
+
+
+def open_bundle(path):
+    """A CaseBundle, or None if the file is missing or not a bundle"""
+    try:
+        return CaseBundle(path)
+    except (OSError, ValueError):
+        return None
+
+
+def write_bundle(path, records, build=None):
+    """
+    Write a bundle atomically
+
+    Args:
+        path: Bundle file
+        records: Iterable of (case_id, encoded case.json bytes) in the
+            order they should be stored
+        build: Build token shared with the library index (default: new)
+
+    Returns:
+        The build token
+    """
+    build = build or uuid.uuid4().hex
+    offsets = {}
+    chunks = []
+    position = 0
+
+    for case_id, raw in records:
+        offsets[case_id] = [position, len(raw)]
+        chunks.append(raw)
+        position += len(raw)
+
+    header = encode({"build": build, "created": datetime.now().isoformat(), "cases": offsets})
+    write_bytes_atomic(path, b"".join([PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)), header,
+                                       *chunks]))
+    return build
+
+
+def update_bundle(path, case_ids, new_records, fallback, previous_build=None):
+    """
+    Rebuild a bundle when few cases changed
+
+    Records of cases that are kept are copied byte for byte from the
+    previous bundle (no case file is opened or parsed); only the new
+    records are added. Cases the previous bundle lacks are read with
+    `fallback`, and so is every case when the previous bundle is not the
+    one the library index points at (a build that stopped half-way).
+
+    Args:
+        path: Bundle file (previous version read from, new one written to)
+        case_ids: IDs of every case the new bundle holds, in order
+        new_records: Dictionary case ID -> encoded case.json bytes of the
+            added or changed cases
+        fallback: Callable case ID -> bytes (e.g. reading case.json) for
+            kept cases missing from the previous bundle
+        previous_build: Build token the library index records for the
+            bundle on disk
+
+    Returns:
+        (build token, number of records copied from the previous bundle)
+    """
+    previous = open_bundle(path)
+    if previous is not None and previous.build != previous_build:
+        previous.close()
+        previous = None
+    copied = 0
+
+    def records():
+        nonlocal copied
+        for case_id in case_ids:
+            raw = new_records.get(case_id)
+            if raw is None and previous is not None:
+                raw = previous.raw(case_id)
+                if raw is not None:
+                    copied += 1
+            if raw is None:
+                raw = fallback(case_id)
+            yield case_id, raw
+
+    try:
+        build = write_bundle(path, records())
+    finally:
+        if previous is not None:
+            previous.close()
+
+    return build, copied
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Case Features
+Computes every per-case count and flag used for classification and scoring
+once, and derives case type, industry, difficulty, quality score and tags
+from the resulting feature matrix with NumPy
+"""
+
+import re
+import time
+
+import numpy as np
+
+# Bump when features are added, removed or change meaning
+FEATURES_VERSION = 1
+
+# Rules are matched against lower-cased text: plain keywords with `in`,
+# the few that need a regex with a case-sensitive pattern. Order is priority.
+CASE_TYPE_RULES = [
+    ("profitability", ["profit", "margin"], r"declining.*revenue"),
+    ("market_entry", ["market entry", "expansion"], r"enter(?:ing)? (?:the )?market"),
+    ("mergers_acquisitions", ["m&a", "merger", "acquisition", "buy", "purchase"], None),
+    ("competitive_response", ["competitor", "competition", "rival", "threat"], None),
+    ("new_product_launch", ["new product", "launch", "introduce"], None),
+    ("pricing", ["pricing", "price"], None),
+    ("cost_reduction", ["cut costs"], r"cost.*reduc|reduc.*cost"),
+    ("growth", ["grow"], r"increase.*revenue"),
+]
+
+INDUSTRY_RULES = [
+    ("Tech", ["tech", "software", "saas"], None),
+    ("Retail", ["retail", "store", "shopping"], None),
+    ("Healthcare", ["health", "hospital", "pharma"], None),
+    ("Financial Services", ["bank", "finance", "insurance"], None),
+    ("Manufacturing", ["manufacturing", "manufacturer", "factory"], None),
+    ("Energy", ["energy", "oil", "gas"], None),
+    ("Real Estate", ["real estate", "hotel", "resort", "property"], None),
+]
+
+TAG_RULES = [
+    ("quantitative", ["calculate", "compute", "×", "÷", "equation"], None),
+    ("qualitative", ["brainstorm", "discuss", "factors", "considerations"], None),
+    ("market_sizing", ["market size", "tam", "addressable market"], None),
+    ("financial_analysis", ["revenue", "cost", "profit", "margin", "npv", "irr"], None),
+    ("competitive_analysis", ["competitor", "market share", "rivalry"], None),
+    ("strategy", ["strategic", "positioning", "competitive advantage"], None),
+]
+
+CALCULATION_KEYWORDS = ["calculate", "compute", "×", "÷"]
+QUESTION_PATTERN = re.compile(r"(?:question|q)\s*\d+")
+EXHIBIT_PATTERN = re.compile(r"exhibit\s+\d+")
+
+# Column layout of the feature matrix
+FEATURE_NAMES = (
+    [f"type:{name}" for name, _, _ in CASE_TYPE_RULES]
+    + [f"industry:{name}" for name, _, _ in INDUSTRY_RULES]
+    + [f"tag:{name}" for name, _, _ in TAG_RULES]
+    + [
+        "text_questions", "text_exhibits", "has_calculations",
+        "has_prompt", "has_clarifying", "has_framework",
+        "num_questions", "num_exhibits", "has_visual_assets",
+    ]
+)
+_COLUMN = {name: idx for idx, name in enumerate(FEATURE_NAMES)}
+
+# Difficulty: points for question count, calculations and exhibits
+DIFFICULTY_MEDIUM_QUESTIONS = 3
+DIFFICULTY_HARD_QUESTIONS = 5
+DIFFICULTY_MIN_EXHIBITS = 2
+DIFFICULTY_LEVELS = ((4, "hard"), (2, "medium"), (0, "easy"))
+
+# Quality: (feature, points per unit, cap)
+QUALITY_WEIGHTS = [
+    ("has_prompt", 20, 20),
+    ("has_clarifying", 10, 10),
+    ("has_framework", 10, 10),
+    ("num_questions", 10, 30),
+    ("num_exhibits", 10, 20),
+    ("has_visual_assets", 10, 10),
+]
+MAX_TAGS = 10
+
+
+def _compile(rules):
+    return [(keywords, re.compile(pattern) if pattern else None) for _, keywords, pattern in rules]
+
+
+def _flag(keywords, pattern):
+    return lambda text: int(any(keyword in text for keyword in keywords) or bool(pattern and pattern.search(text)))
+
+
+# (column name, function of the lower-cased text) for the text columns
+TEXT_RULES = [
+    (name, _flag(keywords, pattern))
+    for name, (keywords, pattern) in zip(
+        FEATURE_NAMES, _compile(CASE_TYPE_RULES) + _compile(INDUSTRY_RULES) + _compile(TAG_RULES))
+] + [
+    ("text_questions", lambda text: len(QUESTION_PATTERN.findall(text))),
+    ("text_exhibits", lambda text: len(EXHIBIT_PATTERN.findall(text))),
+    ("has_calculations", _flag(CALCULATION_KEYWORDS, None)),
+]
+
+# RegexProfiler timing every text rule while attached (see
+# RegexProfiler.attach_rules)
+profiler = None
+
+
+def text_features(text):
+    """
+    Scan the text of one case once
+
+    The text is lower-cased a single time; keywords are then found with
+    substring tests and the remaining patterns are matched case-sensitively,
+    both much cheaper than case-insensitive regex searches.
+
+    Returns:
+        List of values for the text columns of FEATURE_NAMES
+    """
+    text = text.lower()
+
+    if profiler is None:
+        return [rule(text) for _, rule in TEXT_RULES]
+
+    row = []
+    for name, rule in TEXT_RULES:
+        start = time.perf_counter()
+        row.append(rule(text))
+        profiler.record("text_features", name, len(text), time.perf_counter() - start)
+    return row
+
+
+def case_features(case, text):
+    """
+    Full feature row of a parsed case
+
+    Args:
+        case: Case dictionary with "content" and "stats"
+        text: Text the case was parsed from
+
+    Returns:
+        Dictionary of feature name -> value
+    """
+    content = case["content"]
+    row = text_features(text) + [
+        int(bool(content.get("prompt"))),
+        int(bool(content.get("clarifying_information"))),
+        int(bool(content.get("framework"))),
+        len(content.get("questions", [])),
+        len(content.get("exhibits", [])),
+        int(bool(case.get("stats", {}).get("has_visual_assets"))),
+    ]
+    return dict(zip(FEATURE_NAMES, row))
+
+
+def feature_matrix(cases):
+    """
+    Stack the features of many cases into one matrix
+
+    Cases without stored features (extracted before they were recorded)
+    are scanned from their content.
+
+    Returns:
+        int32 array of shape (len(cases), len(FEATURE_NAMES))
+    """
+    matrix = np.zeros((len(cases), len(FEATURE_NAMES)), dtype=np.int32)
+
+    for idx, case in enumerate(cases):
+        features = case.get("features")
+        if features is None:
+            features = case_features(case, str(case["content"]))
+        matrix[idx] = [features.get(name, 0) for name in FEATURE_NAMES]
+
+    return matrix
+
+
+def _first_match(matrix, prefix, names, default):
+    """Label of the first rule (in priority order) whose flag is set"""
+    columns = [_COLUMN[f"{prefix}:{name}"] for name in names]
+    flags = matrix[:, columns] > 0
+    labels = np.array(list(names) + [default], dtype=object)
+    first = np.where(flags.any(axis=1), flags.argmax(axis=1), len(names))
+    return labels[first]
+
+
+def case_types(matrix):
+    return _first_match(matrix, "type", [name for name, _, _ in CASE_TYPE_RULES], "general")
+
+
+def industries(matrix):
+    return _first_match(matrix, "industry", [name for name, _, _ in INDUSTRY_RULES], "General")
+
+
+def difficulties(matrix):
+    """Difficulty labels: more questions, calculations and exhibits = harder"""
+    questions = matrix[:, _COLUMN["text_questions"]]
+    score = (
+        np.where(questions >= DIFFICULTY_HARD_QUESTIONS, 2,
+                 np.where(questions >= DIFFICULTY_MEDIUM_QUESTIONS, 1, 0))
+        + matrix[:, _COLUMN["has_calculations"]]
+        + (matrix[:, _COLUMN["text_exhibits"]] >= DIFFICULTY_MIN_EXHIBITS)
+    )
+
+    labels = np.full(len(matrix), DIFFICULTY_LEVELS[-1][1], dtype=object)
+    for threshold, label in reversed(DIFFICULTY_LEVELS[:-1]):
+        labels[score >= threshold] = label
+    return labels
+
+
+def quality_scores(matrix):
+    """Quality score (0-100) from content completeness"""
+    score = np.zeros(len(matrix), dtype=np.int32)
+    for name, points, cap in QUALITY_WEIGHTS:
+        score += np.minimum(matrix[:, _COLUMN[name]] * points, cap)
+    return np.minimum(score, 100)
+
+
+def tags(matrix, types=None, industry_labels=None):
+    """
+    Tags of every case: its type, its industry and the keyword tags
+
+    Args:
+        matrix: Feature matrix
+        types, industry_labels: Labels to tag with (default: derived)
+
+    Returns:
+        List of tag lists
+    """
+    types = case_types(matrix) if types is None else types
+    industry_labels = industries(matrix) if industry_labels is None else industry_labels
+
+    names = np.array([name for name, _, _ in TAG_RULES], dtype=object)
+    flags = matrix[:, [_COLUMN[f"tag:{name}"] for name in names]] > 0
+
+    result = []
+    for case_type, industry, row in zip(types, industry_labels, flags):
+        case_tags = [case_type, industry.lower().replace(" ", "_")] + list(names[row])
+        result.append(list(dict.fromkeys(case_tags))[:MAX_TAGS])
+    return result
@@ -3,14 +3,22 @@
  * Uses knowledge base + Claude API to generate realistic case interviews
  */
 
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 const ClaudeAPI = require('./claudeAPI');
 
+// Format of data/library/example_bundles.json this code reads (exampleBundles.py)
+const EXAMPLE_BUNDLES_VERSION = 1;
+
 class CaseGenerator {
   constructor() {
     this.knowledgeBase = this.loadKnowledgeBase();
     this.claudeAPI = new ClaudeAPI();
+
+    this.exampleBundlesPath = path.join(__dirname, '../data/library/example_bundles.json');
+    this.exampleBundles = null;
+    this.exampleBundlesMtime = null;
   }
 
   /**
@@ -23,7 +31,74 @@ class CaseGenerator {
       throw new Error('Knowledge base not found. Run buildKnowledgeBase.js first.');
     }
 
-    return JSON.parse(fs.readFileSync(kbPath, 'utf8'));
+    const raw = fs.readFileSync(kbPath);
+    // Example bundles record the digest of the knowledge base they were built from
+    this.knowledgeBaseDigest = crypto.createHash('sha1').update(raw).digest('hex');
+    return JSON.parse(raw.toString('utf8'));
+  }
+
+  /**
+   * Load the precomputed example bundles if they were replaced on disk.
+   * Bundles of another format or built from another knowledge base are not used.
+   * @returns {Object|null} Bundles data
+   */
+  loadExampleBundles() {
+    let mtime;
+    try {
+      mtime = fs.statSync(this.exampleBundlesPath).mtimeMs;
+    } catch (error) {
+      this.exampleBundles = null;
+      this.exampleBundlesMtime = null;
+      return null;
+    }
+
+    if (mtime !== this.exampleBundlesMtime) {
+      this.exampleBundlesMtime = mtime;
+      this.exampleBundles = null;
+      try {
+        const data = JSON.parse(fs.readFileSync(this.exampleBundlesPath, 'utf8'));
+        if (data.version !== EXAMPLE_BUNDLES_VERSION) {
+          console.warn(`⚠️  Example bundles have format ${data.version}, expected ${EXAMPLE_BUNDLES_VERSION}; rebuild the library`);
+        } else if (data.knowledge_base.digest !== this.knowledgeBaseDigest) {
+          console.warn('⚠️  Example bundles were built from another knowledge base; run `pipeline.py examples`');
+        } else {
+          this.exampleBundles = data;
+        }
+      } catch (error) {
+        console.warn('⚠️  Could not load example bundles:', error.message);
+      }
+    }
+
+    return this.exampleBundles;
+  }
+
+  /**
+   * Ready-to-send examples of a (case type, difficulty, industry) bucket
+   * @param {string} caseType - Case type
+   * @param {string} difficulty - easy|medium|hard
+   * @param {string|null} industry - Industry (null: any)
+   * @param {string} size - Bundle size (token budget name, e.g. compact|standard)
+   * @returns {{text: string, tokens: number}|null} Null if there is no bundle
+   */
+  lookupExamples(caseType, difficulty, industry, size) {
+    const bundles = this.loadExampleBundles();
+    if (!bundles || bundles.industries.length === 0) {
+      return null;
+    }
+
+    // No preference: a random industry, as when examples are assembled
+    const bucketIndustry = industry ||
+      bundles.industries[Math.floor(Math.random() * bundles.industries.length)];
+    const bucket = bundles.bundles[`${caseType}|${difficulty}|${bucketIndustry}`];
+    if (!bucket || !bucket[size]) {
+      return null;
+    }
+
+    const [fragmentIds, tokens] = bucket[size];
+    return {
+      text: fragmentIds.map(id => bundles.fragments[id]).join('\n\n'),
+      tokens
+    };
   }
 
   /**
@@ -34,6 +109,7 @@ class CaseGenerator {
    * @param {string} options.difficulty - easy|medium|hard
    * @param {string} options.industry - Optional industry preference
    * @param {string} options.firmStyle - Optional firm style (McKinsey, BCG, Bain)
+   * @param {string} options.exampleSize - Example bundle size (compact|standard)
    * @returns {Promise<Object>} Generated case
    */
   async generate(options = {}) {
@@ -41,16 +117,24 @@ class CaseGenerator {
       caseType = 'profitability',
       difficulty = 'medium',
       industry = null,
-      firmStyle = null
+      firmStyle = null,
+      exampleSize = 'standard'
     } = options;
 
     console.log(`\n🎯 Generating ${difficulty} ${caseType} case...`);
 
-    // Select relevant patterns from knowledge base
-    const relevantPatterns = this.selectRelevantPatterns(caseType, industry);
+    // Precomputed examples of this bucket, or select relevant patterns from knowledge base
+    let examplesText;
+    const examples = this.lookupExamples(caseType, difficulty, industry, exampleSize);
+    if (examples) {
+      console.log(`  🧩 Using ${exampleSize} example bundle (~${examples.tokens} tokens)`);
+      examplesText = examples.text;
+    } else {
+      examplesText = this.renderPatterns(caseType, this.selectRelevantPatterns(caseType, industry));
+    }
 
     // Build generation prompt for Claude
-    const prompt = this.buildGenerationPrompt(caseType, difficulty, relevantPatterns, industry, firmStyle);
+    const prompt = this.buildGenerationPrompt(caseType, difficulty, examplesText, industry, firmStyle);
 
     // Call Claude API
     console.log('  🤖 Calling Claude API...');
@@ -129,10 +213,33 @@ class CaseGenerator {
     return samples;
   }
 
+  /**
+   * Knowledge-base patterns as prompt sections (when there is no example bundle)
+   */
+  renderPatterns(caseType, patterns) {
+    return `OPENING STATEMENT EXAMPLES (for inspiration, create your own):
+${JSON.stringify(patterns.opening_examples, null, 2)}
+
+EXPECTED FRAMEWORKS for ${caseType} cases:
+${JSON.stringify(patterns.frameworks, null, 2)}
+
+QUANTITATIVE QUESTION PATTERNS:
+${JSON.stringify(patterns.quantitative_examples, null, 2)}
+
+${patterns.industry_context ? `INDUSTRY CONTEXT (${patterns.industry_context.name}):
+${JSON.stringify(patterns.industry_context, null, 2)}` : ''}
+
+CLARIFYING INFORMATION PATTERNS:
+${JSON.stringify(patterns.clarifying_patterns, null, 2)}
+
+BRAINSTORMING PATTERNS:
+${JSON.stringify(patterns.brainstorming_prompts, null, 2)}`;
+  }
+
   /**
    * Build the generation prompt for Claude API
    */
-  buildGenerationPrompt(caseType, difficulty, patterns, industry, firmStyle) {
+  buildGenerationPrompt(caseType, difficulty, examplesText, industry, firmStyle) {
     const difficultyGuidelines = {
       easy: 'EASY difficulty means: simple calculations (basic arithmetic), straightforward structure, clear data, 1-2 step solutions, obvious frameworks, minimal complexity',
       medium: 'MEDIUM difficulty means: moderate calculations (percentages, ratios), requires framework thinking, 2-3 step analysis, some ambiguity, standard consulting frameworks',
@@ -154,23 +261,7 @@ CASE SPECIFICATIONS:
 
 USE THIS KNOWLEDGE BASE from ${this.knowledgeBase.total_cases_analyzed} real cases:
 
-OPENING STATEMENT EXAMPLES (for inspiration, create your own):
-${JSON.stringify(patterns.opening_examples, null, 2)}
-
-EXPECTED FRAMEWORKS for ${caseType} cases:
-${JSON.stringify(patterns.frameworks, null, 2)}
-
-QUANTITATIVE QUESTION PATTERNS:
-${JSON.stringify(patterns.quantitative_examples, null, 2)}
-
-${patterns.industry_context ? `INDUSTRY CONTEXT (${patterns.industry_context.name}):
-${JSON.stringify(patterns.industry_context, null, 2)}` : ''}
-
-CLARIFYING INFORMATION PATTERNS:
-${JSON.stringify(patterns.clarifying_patterns, null, 2)}
-
-BRAINSTORMING PATTERNS:
-${JSON.stringify(patterns.brainstorming_prompts, null, 2)}
+${examplesText}
 
 CRITICAL INSTRUCTIONS:
 1. ⚠️ DIFFICULTY LEVEL: The case MUST be ${difficulty.toUpperCase()} difficulty
@@ -5,6 +5,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const CaseBundle = require('./caseBundle');
 
 class CaseLibrary {
   /**
@@ -15,6 +16,8 @@ class CaseLibrary {
     this.libraryDir = libraryDir;
     this.indexPath = path.join(libraryDir, 'index.json');
     this.index = null;
+    this.indexMtime = null;
+    this.bundle = null;
 
     // Load index
     this.loadIndex();
@@ -31,8 +34,11 @@ class CaseLibrary {
         return false;
       }
 
+      const mtime = fs.statSync(this.indexPath).mtimeMs;
       const indexData = fs.readFileSync(this.indexPath, 'utf8');
       this.index = JSON.parse(indexData);
+      this.indexMtime = mtime;
+      this.openBundle();
 
       console.log(`✓ Case library loaded: ${this.index.total_cases} cases`);
       return true;
@@ -42,11 +48,40 @@ class CaseLibrary {
     }
   }
 
+  /**
+   * Open the case bundle the index points at. A missing bundle, or one from
+   * another build than the index, leaves cases to be read from case.json.
+   */
+  openBundle() {
+    if (this.bundle) {
+      this.bundle.close();
+      this.bundle = null;
+    }
+
+    const info = this.index.bundle;
+    if (!info) {
+      return;
+    }
+
+    try {
+      const bundle = new CaseBundle(path.join(this.libraryDir, info.file));
+      if (bundle.build === info.build) {
+        this.bundle = bundle;
+      } else {
+        bundle.close();
+        console.warn('⚠️  Case bundle does not match the library index; reading case files');
+      }
+    } catch (error) {
+      console.warn(`⚠️  Case bundle unavailable (${error.message}); reading case files`);
+    }
+  }
+
   /**
    * Check if library is available
    * @returns {boolean}
    */
   isAvailable() {
+    this.reloadIfChanged();
     return this.index !== null && this.index.total_cases > 0;
   }
 
@@ -154,7 +189,6 @@ class CaseLibrary {
     }
 
     try {
-      // Load case.json
       const casePath = path.join(
         path.dirname(this.indexPath),
         '..',
@@ -162,13 +196,18 @@ class CaseLibrary {
         'case.json'
       );
 
-      if (!fs.existsSync(casePath)) {
-        console.error(`❌ Case file not found: ${casePath}`);
-        return null;
+      let caseData;
+      if (this.bundle && this.bundle.has(case_id)) {
+        caseData = this.bundle.get(case_id);
+      } else {
+        // Load case.json
+        if (!fs.existsSync(casePath)) {
+          console.error(`❌ Case file not found: ${casePath}`);
+          return null;
+        }
+        caseData = JSON.parse(fs.readFileSync(casePath, 'utf8'));
       }
 
-      const caseData = JSON.parse(fs.readFileSync(casePath, 'utf8'));
-
       // Update exhibit file paths to be absolute
       if (caseData.content && caseData.content.exhibits) {
         const caseDir = path.dirname(casePath);
@@ -196,10 +235,10 @@ class CaseLibrary {
         }
 
         if (caseData.visual_assets.screenshots) {
-          caseData.visual_assets.screenshots = caseData.visual_assets.screenshots.map(screenshot => ({
-            ...screenshot,
-            filepath: path.join(caseDir, 'exhibits', screenshot.filename)
-          }));
+          // Screenshots recorded on demand have no file: they keep their render descriptor
+          caseData.visual_assets.screenshots = caseData.visual_assets.screenshots.map(screenshot => (
+            screenshot.render ? screenshot : { ...screenshot, filepath: path.join(caseDir, 'exhibits', screenshot.filename) }
+          ));
         }
       }
 
@@ -342,6 +381,21 @@ class CaseLibrary {
   reload() {
     this.loadIndex();
   }
+
+  /**
+   * Reload the index if it was replaced on disk (e.g. by the watch mode).
+   * The index is swapped atomically, so it is always complete when read.
+   */
+  reloadIfChanged() {
+    try {
+      const mtime = fs.statSync(this.indexPath).mtimeMs;
+      if (mtime !== this.indexMtime) {
+        this.loadIndex();
+      }
+    } catch (error) {
+      // Index missing: keep whatever is loaded
+    }
+  }
 }
 
 module.exports = CaseLibrary;
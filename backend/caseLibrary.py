@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Case Library (Python)
+Read access to data/library, mirroring backend/caseLibrary.js: the index is
+loaded lazily, cases are read from the library's case bundle (or their
+case.json files), parsed cases are kept in a size-bounded LRU cache and
+batches of cases are read in parallel
+"""
+
+import hashlib
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from caseBundle import open_bundle
+from fileUtils import file_signature
+from recordCodec import decode
+
+# Default bound of the parsed-case cache (sum of case.json sizes)
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+READ_WORKERS = 8
+
+
+class CaseLibrary:
+    """
+    Query API over a built case library
+
+    Cases are returned as dictionaries shared with the cache: treat them as
+    read-only (copy before modifying).
+    """
+
+    def __init__(self, library_dir="data/library", cache_max_bytes=CACHE_MAX_BYTES,
+                 read_workers=READ_WORKERS):
+        """
+        Args:
+            library_dir: Library directory (containing index.json)
+            cache_max_bytes: Upper bound of the cached case.json files, by
+                file size; least recently used cases are evicted first
+            read_workers: Threads used by get_many
+        """
+        self.library_dir = Path(library_dir)
+        self.index_path = self.library_dir / "index.json"
+        self.cache_max_bytes = cache_max_bytes
+        self.read_workers = read_workers
+
+        self._index = None
+        self._index_signature = None
+        self._entries = {}
+        # (build token, CaseBundle or None) of the bundle the index points at
+        self._bundle = (None, None)
+        # (file signature, SimilarityIndex or None) of similarity.npz
+        self._similarity = (None, None)
+
+        # case_id -> (signature, digest, size, case)
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self):
+        """The library index, (re)loaded when index.json changed on disk"""
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return self._index
+
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature != self._index_signature:
+            with open(self.index_path, "rb") as f:
+                index = decode(f.read())
+            self._entries = {entry["case_id"]: entry for entry in index["cases"]}
+            self._index = index
+            self._index_signature = signature
+        return self._index
+
+    def is_available(self):
+        index = self.index
+        return index is not None and index["total_cases"] > 0
+
+    def __len__(self):
+        return self.index["total_cases"] if self.is_available() else 0
+
+    def __contains__(self, case_id):
+        return self.is_available() and case_id in self._entries
+
+    def entry(self, case_id):
+        """Index entry of a case, or None"""
+        return self._entries.get(case_id) if self.is_available() else None
+
+    def bundle(self):
+        """
+        The case bundle of the current index, or None
+
+        A bundle whose build token differs from the index's (a build that
+        stopped between writing the two) is not used.
+        """
+        info = (self.index or {}).get("bundle")
+        if not info:
+            return None
+
+        build, bundle = self._bundle
+        if build != info["build"]:
+            bundle = open_bundle(self.library_dir / info["file"])
+            if bundle is not None and bundle.build != info["build"]:
+                bundle = None
+            # The previous view is closed when no reader holds it any more
+            self._bundle = (info["build"], bundle)
+        return bundle
+
+    def get_statistics(self):
+        if not self.is_available():
+            return None
+
+        index = self.index
+        return {
+            "total_cases": index["total_cases"],
+            "last_updated": index["last_updated"],
+            **index["statistics"]
+        }
+
+    # ------------------------------------------------------------------
+    # Queries (index only)
+    # ------------------------------------------------------------------
+
+    def filter(self, case_type=None, difficulty=None, industry=None, tags=None, min_quality=0, limit=None):
+        """
+        Index entries matching all given criteria, best quality first
+
+        Args:
+            tags: Tags that must all be present
+            limit: Maximum number of entries (None for all)
+        """
+        if not self.is_available():
+            return []
+
+        tags = set(tags or ())
+        results = [
+            entry for entry in self.index["cases"]
+            if (not case_type or entry["case_type"] == case_type)
+            and (not difficulty or entry["difficulty"] == difficulty)
+            and (not industry or entry["industry"] == industry)
+            and entry.get("quality_score", 0) >= min_quality
+            and tags.issubset(entry.get("tags") or ())
+        ]
+        results.sort(key=lambda entry: -entry.get("quality_score", 0))
+        return results if limit is None else results[:limit]
+
+    def search(self, query, limit=10):
+        """Index entries whose title, tags or industry contain the query"""
+        if not self.is_available() or not query:
+            return []
+
+        query = query.lower()
+        results = []
+        for entry in self.index["cases"]:
+            if (query in (entry.get("title") or "").lower()
+                    or any(query in tag for tag in entry.get("tags") or ())
+                    or query in (entry.get("industry") or "").lower()):
+                results.append(entry)
+                if len(results) == limit:
+                    break
+        return results
+
+    def similar(self, query=None, case=None, case_id=None, limit=10, exclude=()):
+        """
+        Index entries of the cases closest to a text, a case (e.g. a
+        generated one) or a library case, by BM25 similarity of their text
+
+        Uses the library's similarity index (built with the library); the
+        index is reloaded when its file changes.
+
+        Args:
+            query: Query text (e.g. a prompt)
+            case: Case dictionary
+            case_id: Library case to find neighbours of (not returned itself)
+            limit: Maximum number of entries
+            exclude: Case IDs to leave out (e.g. cases already practised)
+
+        Returns:
+            Copies of the index entries with a "similarity" score, best
+            first; empty without a similarity index
+        """
+        if not self.is_available():
+            return []
+        index = self._similarity_index()
+        if index is None:
+            return []
+
+        # Ask for a few more: the similarity index may hold cases an index
+        # being rewritten no longer lists
+        hits = index.similar(text=query, case=case, case_id=case_id, limit=limit + 8, exclude=exclude)
+        results = []
+        for hit_id, score in hits:
+            entry = self._entries.get(hit_id)
+            if entry is not None:
+                results.append({**entry, "similarity": score})
+                if len(results) == limit:
+                    break
+        return results
+
+    def _similarity_index(self):
+        from similarityIndex import SIMILARITY_FILE, SimilarityIndex
+
+        path = self.library_dir / SIMILARITY_FILE
+        try:
+            signature = file_signature(path)
+        except FileNotFoundError:
+            return None
+        if signature != self._similarity[0]:
+            self._similarity = (signature, SimilarityIndex.load(path))
+        return self._similarity[1]
+
+    def find_case(self, **criteria):
+        """A random complete case matching the filter() criteria, or None"""
+        candidates = self.filter(**criteria)
+        if not candidates:
+            return None
+        return self.get(random.choice(candidates)["case_id"])
+
+    # ------------------------------------------------------------------
+    # Cases
+    # ------------------------------------------------------------------
+
+    def get(self, case_id):
+        """
+        Complete case data (case.json) by ID
+
+        The case is sliced out of the case bundle when the library has one,
+        otherwise read from its case.json. A cached case is returned while
+        the bundle (or the file) keeps the same size and mtime. If those
+        changed but the content hash did not (e.g. the file was rewritten
+        unchanged), the parsed case is kept as well.
+
+        Returns:
+            Case dictionary, or None if the ID or its file does not exist
+        """
+        entry = self.entry(case_id)
+        if entry is None:
+            return None
+
+        case_dir = self.library_dir.parent / entry["path"]
+        bundle = self.bundle()
+        if bundle is not None and case_id in bundle:
+            signature = bundle.signature
+        else:
+            bundle = None
+            try:
+                stat = (case_dir / "case.json").stat()
+            except FileNotFoundError:
+                self._evict(case_id)
+                return None
+            signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._cache.get(case_id)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(case_id)
+                self.hits += 1
+                return cached[3]
+
+        if bundle is not None:
+            raw = bundle.raw(case_id)
+        else:
+            try:
+                with open(case_dir / "case.json", "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                self._evict(case_id)
+                return None
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+
+        hit = cached is not None and cached[1] == digest
+        case = cached[3] if hit else self._prepare(decode(raw), case_dir)
+
+        self._store(case_id, (signature, digest, len(raw), case), hit)
+        return case
+
+    def get_many(self, case_ids, workers=None):
+        """
+        Several cases at once; cache misses are read in parallel
+
+        Returns:
+            Dictionary of case ID -> case (None for unknown IDs), in the
+            order of case_ids
+        """
+        case_ids = list(dict.fromkeys(case_ids))
+        workers = workers or self.read_workers
+
+        self.index  # load once, before the threads
+        with self._lock:
+            to_read = [case_id for case_id in case_ids if case_id not in self._cache]
+
+        results = {}
+        if workers > 1 and len(to_read) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(to_read))) as pool:
+                results = dict(zip(to_read, pool.map(self.get, to_read)))
+
+        # Cached cases (still validated against their files) are cheaper
+        # to serve on this thread than through the pool
+        return {case_id: results[case_id] if case_id in results else self.get(case_id)
+                for case_id in case_ids}
+
+    def cache_info(self):
+        with self._lock:
+            return {
+                "cases": len(self._cache),
+                "bytes": self._cache_bytes,
+                "max_bytes": self.cache_max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def _store(self, case_id, item, hit):
+        size = item[2]
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            old = self._cache.pop(case_id, None)
+            if old is not None:
+                self._cache_bytes -= old[2]
+            if size > self.cache_max_bytes:
+                return
+
+            self._cache[case_id] = item
+            self._cache_bytes += size
+            while self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted[2]
+
+    def _evict(self, case_id):
+        with self._lock:
+            old = self._cache.pop(case_id, None)
+            if old is not None:
+                self._cache_bytes -= old[2]
+
+    def _prepare(self, case, case_dir):
+        """
+        Point asset paths at the case's exhibits folder (as caseLibrary.js
+        does); screenshots recorded on demand keep no path (see
+        exhibitRenderer.render_exhibit)
+        """
+        # Plain string joins: a case can list hundreds of assets
+        prefix = os.path.join(str(case_dir), "exhibits", "")
+        for assets in (case.get("visual_assets") or {}).values():
+            for asset in assets:
+                if "render" not in asset:
+                    asset["filepath"] = prefix + asset["filename"]
+        return case
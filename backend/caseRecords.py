@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Case Records
+Typed, __slots__-based records for cases, exhibits, questions and visual
+assets, validated when they are built from decoded JSON
+"""
+
+_MISSING = object()
+
+
+class RecordError(ValueError):
+    """Decoded data does not match the record schema"""
+
+    def __init__(self, message, location=""):
+        self.message = message
+        self.location = location
+        super().__init__(f"{location}: {message}" if location else message)
+
+    def within(self, parent):
+        """The same error, located inside parent (a field name or "[index]")"""
+        if not self.location:
+            return RecordError(self.message, parent)
+        separator = "" if self.location.startswith("[") else "."
+        return RecordError(self.message, f"{parent}{separator}{self.location}")
+
+
+class Field:
+    """
+    Schema entry of a record
+
+    kind is a Python type (str, int, float, bool, list, dict), a Record
+    subclass, or a one-element list [RecordSubclass] for a list of records.
+    """
+
+    __slots__ = ("name", "kind", "required", "nullable", "omit_none", "convert", "exact_type")
+
+    def __init__(self, name, kind, required=True, nullable=False, omit_none=False):
+        self.name = name
+        self.kind = kind
+        # omit_none fields are optional and left out of to_dict() when unset
+        self.required = required and not omit_none
+        self.nullable = nullable or not self.required
+        self.omit_none = omit_none
+
+        # Values of exactly this type need no conversion (checked inline)
+        self.exact_type = None
+
+        if isinstance(kind, list):
+            self.convert = self._convert_records
+        elif isinstance(kind, type) and issubclass(kind, Record):
+            self.convert = self._convert_record
+        else:
+            self.convert = self._convert_value
+            self.exact_type = kind
+
+    # Converters raise RecordError without a location; the caller adds it,
+    # so no path strings are built while decoding valid data
+
+    def _check_null(self):
+        if not self.nullable:
+            raise RecordError("must not be null")
+        return None
+
+    def _convert_value(self, value, cache):
+        if value is None:
+            return self._check_null()
+        kind = self.kind
+        if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+            return value
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            return float(value)
+        raise RecordError(f"expected {kind.__name__}, got {type(value).__name__}")
+
+    def _convert_record(self, value, cache):
+        if value is None:
+            return self._check_null()
+        return self.kind._decode(value, cache)
+
+    def _convert_records(self, value, cache):
+        if value is None:
+            return self._check_null()
+        if not isinstance(value, list):
+            raise RecordError(f"expected a list, got {type(value).__name__}")
+        decode = self.kind[0]._decode
+        try:
+            return [decode(item, cache) for item in value]
+        except RecordError as e:
+            # Slow path: find which item failed
+            for idx, item in enumerate(value):
+                try:
+                    decode(item, cache)
+                except RecordError as item_error:
+                    raise item_error.within(f"[{idx}]") from None
+            raise e
+
+
+class Record:
+    """
+    Base class: subclasses list their Fields in FIELDS and the same names in
+    __slots__ (plus "extra", which keeps unknown keys so records round-trip)
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field.name, values.pop(field.name, None))
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls, data, path=None, cache=None):
+        """
+        Build and validate a record from decoded JSON
+
+        Args:
+            data: Dictionary
+            path: Location used in error messages
+            cache: Optional dictionary shared across a decode, used to
+                intern identical sub-records (see Asset)
+
+        Raises:
+            RecordError: On a missing field or a value of the wrong type,
+                naming its location (e.g. "Case.content.questions[0].number")
+        """
+        try:
+            return cls._decode(data, cache)
+        except RecordError as e:
+            raise e.within(path or cls.__name__) from None
+
+    @classmethod
+    def _decode(cls, data, cache):
+        if not isinstance(data, dict):
+            raise RecordError(f"expected an object, got {type(data).__name__}")
+
+        record = cls.__new__(cls)
+        get = data.get
+        present = 0
+        for field in cls.FIELDS:
+            name = field.name
+            value = get(name, _MISSING)
+            if value is _MISSING:
+                if field.required:
+                    raise RecordError("missing", name)
+                value = None
+            else:
+                present += 1
+                if value.__class__ is not field.exact_type:
+                    try:
+                        value = field.convert(value, cache)
+                    except RecordError as e:
+                        raise e.within(name) from None
+            setattr(record, name, value)
+
+        if present < len(data):
+            record.extra = {key: value for key, value in data.items() if key not in cls._NAMES}
+        else:
+            record.extra = None
+        return record
+
+    def to_dict(self):
+        """Plain dictionary in schema field order (inverse of from_dict)"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field.name)
+            if value is None and field.omit_none:
+                continue
+            if isinstance(value, Record):
+                value = value.to_dict()
+            elif isinstance(field.kind, list) and value is not None:
+                value = [item.to_dict() for item in value]
+            data[field.name] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        key = self.FIELDS[0].name
+        return f"{type(self).__name__}({key}={getattr(self, key)!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._NAMES = frozenset(field.name for field in cls.FIELDS)
+
+
+class Asset(Record):
+    """
+    An extracted image or exhibit screenshot
+
+    Screenshots recorded on demand have no file yet: no filepath, and a
+    render descriptor instead (see exhibitRenderer).
+    """
+
+    __slots__ = ("page", "filename", "filepath", "type", "width", "height", "format", "region", "render", "extra")
+    FIELDS = (
+        Field("page", int),
+        Field("filename", str),
+        Field("filepath", str, omit_none=True),
+        Field("type", str),
+        Field("width", int, required=False),
+        Field("height", int, required=False),
+        Field("format", str, omit_none=True),
+        Field("region", list, omit_none=True),
+        Field("render", dict, omit_none=True),
+    )
+
+    @classmethod
+    def _decode(cls, data, cache):
+        # Every case of a casebook lists the same assets: decode each file once
+        if cache is None or not isinstance(data, dict):
+            return super()._decode(data, cache)
+
+        # Reuse only an identical asset, so every copy is still validated
+        key = ("asset", data.get("filepath") or data.get("filename"), data.get("page"))
+        cached = cache.get(key)
+        if cached is not None and cached[0] == data:
+            return cached[1]
+
+        record = super()._decode(data, cache)
+        cache[key] = (data, record)
+        return record
+
+
+class Question(Record):
+    __slots__ = ("number", "text", "has_calculation", "extra")
+    FIELDS = (
+        Field("number", int),
+        Field("text", str),
+        Field("has_calculation", bool, required=False),
+    )
+
+
+class Exhibit(Record):
+    """Exhibit found in the case text, with its table if one was detected"""
+
+    __slots__ = ("exhibit_number", "type", "content", "headers", "rows", "columns", "extra")
+    FIELDS = (
+        Field("exhibit_number", int),
+        Field("type", str),
+        Field("content", str, required=False),
+        Field("headers", list, omit_none=True),
+        Field("rows", list, omit_none=True),
+        Field("columns", list, omit_none=True),
+    )
+
+
+class CaseContent(Record):
+    __slots__ = ("prompt", "clarifying_information", "framework", "questions", "exhibits", "conclusion", "extra")
+    FIELDS = (
+        Field("prompt", str, nullable=True),
+        Field("clarifying_information", str, nullable=True),
+        Field("framework", list, required=False),
+        Field("questions", [Question]),
+        Field("exhibits", [Exhibit]),
+        Field("conclusion", str, nullable=True),
+    )
+
+
+class CaseMetadata(Record):
+    __slots__ = ("case_type", "industry", "difficulty", "extra")
+    FIELDS = (
+        Field("case_type", str, required=False),
+        Field("industry", str, required=False),
+        Field("difficulty", str, required=False),
+    )
+
+
+class VisualAssets(Record):
+    __slots__ = ("images", "screenshots", "extra")
+    FIELDS = (
+        Field("images", [Asset]),
+        Field("screenshots", [Asset]),
+    )
+
+
+class Case(Record):
+    """
+    One parsed case, as in casebooks_complete.json and library case.json
+
+    Library-only keys (created_at, version) and anything added later are
+    kept in `extra`.
+    """
+
+    __slots__ = ("case_id", "source", "content", "metadata", "visual_assets", "stats", "features", "extra")
+    FIELDS = (
+        Field("case_id", str),
+        Field("source", str),
+        Field("content", CaseContent),
+        Field("metadata", CaseMetadata),
+        Field("visual_assets", VisualAssets, required=False),
+        Field("stats", dict, required=False),
+        Field("features", dict, omit_none=True),
+    )
+
+
+def validate_cases(cases, path="cases"):
+    """
+    Check a list of case dictionaries against the schema without keeping
+    the records
+
+    Each case is decoded and dropped, so validation holds one case (and the
+    assets of its casebook, which are shared by its cases and decoded once)
+    rather than a second copy of the whole list.
+
+    Raises:
+        RecordError: With the location of the first invalid value
+    """
+    if not isinstance(cases, list):
+        raise RecordError(f"expected a list, got {type(cases).__name__}", path)
+
+    cache, source = {}, None
+    for idx, case in enumerate(cases):
+        case_source = case.get("source") if isinstance(case, dict) else None
+        if case_source != source:
+            cache, source = {}, case_source
+        Case.from_dict(case, f"{path}[{idx}]", cache)
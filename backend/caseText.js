@@ -0,0 +1,61 @@
+/**
+ * Case Text Store
+ * Reads case text from the compressed "texts" section of extracted_cases.json
+ * (see textStore.py): each source document is inflated on first use and
+ * cases are sliced out of it by their UTF-8 byte range
+ */
+
+const zlib = require('zlib');
+
+class CaseTextStore {
+  /**
+   * @param {Object} texts - Source name -> {codec, size, data (base64)}
+   */
+  constructor(texts = {}) {
+    this.texts = texts;
+    this.documents = new Map();
+  }
+
+  /**
+   * UTF-8 bytes of a source document
+   * @param {string} source - PDF file name
+   * @returns {Buffer}
+   */
+  document(source) {
+    let raw = this.documents.get(source);
+    if (!raw) {
+      const packed = this.texts[source];
+      if (packed.codec !== 'zlib') {
+        throw new Error(`Text of ${source} uses ${packed.codec}; extract with text_codec="zlib" to read it from Node`);
+      }
+      raw = zlib.inflateSync(Buffer.from(packed.data, 'base64'));
+      this.documents.set(source, raw);
+    }
+    return raw;
+  }
+
+  /**
+   * Text of one case (falls back to an embedded raw_text)
+   * @param {Object} caseData - Case from extracted_cases.json
+   * @returns {string}
+   */
+  caseText(caseData) {
+    const range = caseData.text_range;
+    if (!range || !this.texts[caseData.source]) {
+      return caseData.raw_text || '';
+    }
+    return this.document(caseData.source).toString('utf8', range[0], range[1]);
+  }
+
+  /**
+   * Copy of a case with its raw_text filled in (for API responses)
+   * @param {Object} caseData - Case from extracted_cases.json
+   * @returns {Object}
+   */
+  withText(caseData) {
+    const { text_range: _range, ...rest } = caseData;
+    return { ...rest, raw_text: this.caseText(caseData) };
+  }
+}
+
+module.exports = CaseTextStore;
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Columnar Export
+Writes the case library as Parquet tables for analytics: cases, questions,
+exhibits and assets, linked by case_id and partitioned by source casebook so
+that only casebooks whose cases changed are rewritten
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from urllib.parse import quote
+
+from caseLibrary import CaseLibrary
+from fileUtils import write_json_atomic
+from recordCodec import load
+
+EXPORT_VERSION = 1
+TABLES = ("cases", "questions", "exhibits", "assets")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("The columnar export needs pyarrow: pip install pyarrow") from None
+    return pa, pq
+
+
+def table_schemas():
+    """
+    Arrow schema of every table
+
+    The source column is not stored in the files: it is the hive partition
+    key (directory source=<name>), so filters on it skip whole directories.
+    """
+    pa, _ = _pyarrow()
+    return {
+        "cases": pa.schema([
+            ("case_id", pa.string()),
+            ("title", pa.string()),
+            ("case_type", pa.string()),
+            ("difficulty", pa.string()),
+            ("industry", pa.string()),
+            ("quality_score", pa.int16()),
+            ("tags", pa.list_(pa.string())),
+            ("num_questions", pa.int32()),
+            ("num_exhibits", pa.int32()),
+            ("num_images", pa.int32()),
+            ("num_screenshots", pa.int32()),
+            ("has_visual_assets", pa.bool_()),
+            ("has_prompt", pa.bool_()),
+            ("framework_steps", pa.int32()),
+            ("path", pa.string()),
+            ("created_at", pa.string()),
+        ]),
+        "questions": pa.schema([
+            ("case_id", pa.string()),
+            ("number", pa.int32()),
+            ("text", pa.string()),
+            ("has_calculation", pa.bool_()),
+        ]),
+        "exhibits": pa.schema([
+            ("case_id", pa.string()),
+            ("exhibit_number", pa.int32()),
+            ("type", pa.string()),
+            ("content", pa.string()),
+            ("headers", pa.list_(pa.string())),
+            ("num_rows", pa.int32()),
+            ("numeric_columns", pa.int32()),
+        ]),
+        "assets": pa.schema([
+            ("case_id", pa.string()),
+            ("kind", pa.string()),
+            ("page", pa.int32()),
+            ("filename", pa.string()),
+            ("filepath", pa.string()),
+            ("format", pa.string()),
+            ("width", pa.int32()),
+            ("height", pa.int32()),
+            ("cropped", pa.bool_()),
+        ]),
+    }
+
+
+class ColumnarExporter:
+    """
+    Incremental Parquet export of a case library
+
+    Layout:
+        <export_dir>/<table>/source=<casebook>/part-0.parquet
+        <export_dir>/manifest.json
+
+    The manifest stores, per source, a digest of its index entries and
+    case.json signatures; a source is rewritten only when that digest
+    changed, and partitions of sources no longer in the library are removed.
+    """
+
+    def __init__(self, library_dir="data/library", export_dir="data/analytics"):
+        self.library_dir = Path(library_dir)
+        self.export_dir = Path(export_dir)
+        self.manifest_path = self.export_dir / "manifest.json"
+
+    def export(self, full=False):
+        """
+        Bring the Parquet tables in line with the library
+
+        Args:
+            full: Rewrite every source even if unchanged
+
+        Returns:
+            Dictionary with the numbers of written, unchanged and removed
+            sources, or None if there is no library
+        """
+        _, pq = _pyarrow()
+        schemas = table_schemas()
+
+        library = CaseLibrary(self.library_dir, cache_max_bytes=0)
+        if not library.is_available():
+            print(f"❌ No library at {self.library_dir}. Run segmentation first.\n")
+            return None
+
+        groups = {}
+        for entry in library.index["cases"]:
+            groups.setdefault(entry.get("source", "unknown"), []).append(entry)
+
+        manifest = self._load_manifest()
+        if full or manifest.get("version") != EXPORT_VERSION:
+            manifest = {"version": EXPORT_VERSION, "sources": {}}
+
+        digests = {source: self._digest(entries) for source, entries in groups.items()}
+        changed = [source for source in sorted(groups) if manifest["sources"].get(source) != digests[source]]
+        removed = [source for source in manifest["sources"] if source not in groups]
+
+        print(f"📊 Exporting {len(changed)} of {len(groups)} casebook(s) to {self.export_dir}")
+
+        for source in changed:
+            entries = groups[source]
+            cases = library.get_many([entry["case_id"] for entry in entries])
+            columns = self._build_columns(entries, cases)
+            for table in TABLES:
+                partition = self._partition_dir(table, source)
+                partition.mkdir(parents=True, exist_ok=True)
+                data = _columns_table(columns[table], schemas[table])
+                tmp_path = partition / ".part-0.parquet.tmp"
+                pq.write_table(data, tmp_path, compression="zstd")
+                tmp_path.replace(partition / "part-0.parquet")
+            manifest["sources"][source] = digests[source]
+
+        for source in removed:
+            for table in TABLES:
+                shutil.rmtree(self._partition_dir(table, source), ignore_errors=True)
+            del manifest["sources"][source]
+
+        write_json_atomic(self.manifest_path, manifest, indent=2)
+
+        summary = {"written": len(changed), "unchanged": len(groups) - len(changed), "removed": len(removed)}
+        print(f"✓ {summary['written']} written, {summary['unchanged']} unchanged, "
+              f"{summary['removed']} removed\n")
+        return summary
+
+    def _load_manifest(self):
+        try:
+            return load(self.manifest_path)
+        except (OSError, ValueError):
+            return {}
+
+    def _partition_dir(self, table, source):
+        return self.export_dir / table / f"source={quote(source, safe='')}"
+
+    def _digest(self, entries):
+        """Changes when an index entry or a case.json of the source changes"""
+        digest = hashlib.blake2b(digest_size=16)
+        for entry in sorted(entries, key=lambda e: e["case_id"]):
+            case_file = self.library_dir.parent / entry["path"] / "case.json"
+            try:
+                stat = case_file.stat()
+                signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+            except FileNotFoundError:
+                signature = "missing"
+            digest.update(repr(sorted(entry.items())).encode("utf-8"))
+            digest.update(signature.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _build_columns(self, entries, cases):
+        """Column lists of all four tables for the cases of one source"""
+        columns = {table: {name: [] for name in schema.names} for table, schema in table_schemas().items()}
+        case_cols, question_cols = columns["cases"], columns["questions"]
+        exhibit_cols, asset_cols = columns["exhibits"], columns["assets"]
+
+        for entry in entries:
+            case_id = entry["case_id"]
+            case = cases.get(case_id)
+            if case is None:
+                continue
+            content = case.get("content", {})
+            stats = case.get("stats", {})
+
+            for name, value in (
+                ("case_id", case_id),
+                ("title", entry.get("title")),
+                ("case_type", entry.get("case_type")),
+                ("difficulty", entry.get("difficulty")),
+                ("industry", entry.get("industry")),
+                ("quality_score", entry.get("quality_score")),
+                ("tags", entry.get("tags") or []),
+                ("num_questions", stats.get("num_questions", 0)),
+                ("num_exhibits", stats.get("num_exhibits", 0)),
+                ("num_images", stats.get("num_images", 0)),
+                ("num_screenshots", stats.get("num_screenshots", 0)),
+                ("has_visual_assets", stats.get("has_visual_assets", False)),
+                ("has_prompt", bool(content.get("prompt"))),
+                ("framework_steps", len(content.get("framework") or [])),
+                ("path", entry["path"]),
+                ("created_at", case.get("created_at")),
+            ):
+                case_cols[name].append(value)
+
+            for question in content.get("questions", []):
+                question_cols["case_id"].append(case_id)
+                question_cols["number"].append(question.get("number"))
+                question_cols["text"].append(question.get("text"))
+                question_cols["has_calculation"].append(question.get("has_calculation", False))
+
+            for exhibit in content.get("exhibits", []):
+                exhibit_cols["case_id"].append(case_id)
+                exhibit_cols["exhibit_number"].append(exhibit.get("exhibit_number"))
+                exhibit_cols["type"].append(exhibit.get("type"))
+                exhibit_cols["content"].append(exhibit.get("content"))
+                exhibit_cols["headers"].append(exhibit.get("headers"))
+                exhibit_cols["num_rows"].append(len(exhibit["rows"]) if exhibit.get("rows") is not None else None)
+                exhibit_cols["numeric_columns"].append(
+                    sum(1 for column in exhibit.get("columns", []) if column["type"] != "text")
+                    if "columns" in exhibit else None
+                )
+
+            exhibits_path = f"{entry['path']}/exhibits/"
+            for kind, assets in (case.get("visual_assets") or {}).items():
+                for asset in assets:
+                    asset_cols["case_id"].append(case_id)
+                    asset_cols["kind"].append(asset.get("type", kind))
+                    asset_cols["page"].append(asset.get("page"))
+                    asset_cols["filename"].append(asset["filename"])
+                    asset_cols["filepath"].append(exhibits_path + asset["filename"])
+                    asset_cols["format"].append(asset.get("format"))
+                    asset_cols["width"].append(asset.get("width"))
+                    asset_cols["height"].append(asset.get("height"))
+                    asset_cols["cropped"].append("region" in asset)
+
+        return columns
+
+
+def _columns_table(columns, schema):
+    pa, _ = _pyarrow()
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def open_table(name, export_dir="data/analytics"):
+    """
+    Open an exported table as a pyarrow dataset
+
+    Reads are lazy: pass columns= and filter= to to_table() (or use
+    read_table) and only the needed columns and partitions are read, with
+    row groups skipped by their statistics.
+
+    Example:
+        import pyarrow.dataset as ds
+        open_table("cases").to_table(
+            columns=["case_id", "num_questions"],
+            filter=(ds.field("source") == "Darden-2013") & (ds.field("num_questions") >= 3))
+    """
+    if name not in TABLES:
+        raise ValueError(f"Unknown table '{name}' (expected one of {', '.join(TABLES)})")
+
+    pa, _ = _pyarrow()
+    import pyarrow.dataset as ds
+
+    source = pa.field("source", pa.string())
+    return ds.dataset(
+        Path(export_dir) / name,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([source]), flavor="hive"),
+        schema=table_schemas()[name].append(source)
+    )
+
+
+def read_table(name, columns=None, filter=None, export_dir="data/analytics"):
+    """Read the given columns of the rows matching filter (a pyarrow expression)"""
+    return open_table(name, export_dir).to_table(columns=columns, filter=filter)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Example Bundles
+The knowledge-base patterns and library cases the case generator puts in
+its prompt, precomputed at library build time for every (case type,
+difficulty, industry) bucket and trimmed to token budgets, so a generation
+request only looks its bundle up (see caseGenerator.js)
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+from caseLibrary import CaseLibrary
+from fileUtils import write_json_atomic
+from recordCodec import load
+
+EXAMPLE_BUNDLES_FILE = "example_bundles.json"
+# Bump when the file layout or the section text changes
+EXAMPLE_BUNDLES_VERSION = 1
+
+# Token budget of each bundle size; a request picks one by name
+DEFAULT_TOKEN_BUDGETS = {"compact": 1500, "standard": 4000}
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Local approximation of a BPE tokenizer: a token per word piece of up to six
+# letters, per group of up to three digits and per punctuation mark (JSON
+# quotes, brackets and commas included). Indentation is free. It errs on the
+# high side for English prose, so bundles stay within their budget.
+TOKEN_PIECES = re.compile(r"[^\W\d_]{1,6}|\d{1,3}|[^\w\s]")
+
+# Items per section at most (what the generator used before bundles)
+MAX_OPENING_EXAMPLES = 5
+MAX_QUANTITATIVE_EXAMPLES = 2
+MAX_INDUSTRY_PROMPTS = 5
+MAX_CLARIFYING_PATTERNS = 5
+MAX_BRAINSTORMING_PROMPTS = 3
+MAX_LIBRARY_CASES = 3
+MAX_LIBRARY_QUESTIONS = 3
+LIBRARY_TEXT_CHARS = 400
+
+
+def parse_token_budgets(spec):
+    """
+    Budgets of a list such as "compact=1500,standard=4000"
+
+    Returns:
+        Dictionary bundle size name -> token budget
+    """
+    budgets = {}
+    for part in spec.replace(" ", "").split(","):
+        name, _, value = part.partition("=")
+        if not name or not value.isdigit() or int(value) == 0:
+            raise ValueError(f"Invalid token budget '{part}' (expected e.g. compact=1500)")
+        budgets[name] = int(value)
+    return budgets
+
+
+def estimate_tokens(text):
+    """Approximate token count of a text (see TOKEN_PIECES)"""
+    return len(TOKEN_PIECES.findall(text))
+
+
+def bundle_key(case_type, difficulty, industry):
+    return f"{case_type}|{difficulty}|{industry}"
+
+
+def _render(heading, value):
+    # Same text as JSON.stringify(value, null, 2) in caseGenerator.js
+    return f"{heading}\n{json.dumps(value, indent=2, ensure_ascii=False)}"
+
+
+class _Section:
+    """A prompt section holding up to max_items items"""
+
+    def __init__(self, heading, value, max_items, keep_empty=False):
+        """
+        Args:
+            heading: Section heading, as in the generation prompt
+            value: Callable n -> JSON value of the section with n items
+            max_items: Items available
+            keep_empty: Whether the section is worth sending without items
+        """
+        self.heading = heading
+        self.value = value
+        self.max_items = max_items
+        self.keep_empty = keep_empty
+
+    def fit(self, budget):
+        """(text, tokens) with as many items as fit in the budget, or None"""
+        for count in range(self.max_items, -1 if self.keep_empty else 0, -1):
+            text = _render(self.heading, self.value(count))
+            tokens = estimate_tokens(text)
+            if tokens <= budget:
+                return text, tokens
+        return None
+
+
+def _sections(kb, case_type, difficulty, industry, library_cases):
+    """
+    Sections of one bucket, in prompt order, with their priority (lower is
+    kept first when the budget is tight)
+    """
+    opening = (kb.get("opening_patterns") or {}).get(case_type) or []
+    frameworks = (kb.get("framework_approaches") or {}).get(case_type) or []
+    quantitative = [
+        (pattern_type, pattern["examples"])
+        for pattern_type, pattern in (kb.get("quantitative_patterns") or {}).items()
+        if pattern.get("examples")
+    ]
+    context = (kb.get("industry_contexts") or {}).get(industry)
+    clarifying = kb.get("clarifying_questions_patterns") or []
+    brainstorming = [prompt for prompts in (kb.get("brainstorming_categories") or {}).values() for prompt in prompts]
+
+    sections = [
+        (1, _Section("OPENING STATEMENT EXAMPLES (for inspiration, create your own):",
+                     lambda n: opening[:n], min(len(opening), MAX_OPENING_EXAMPLES))),
+        (0, _Section(f"EXPECTED FRAMEWORKS for {case_type} cases:",
+                     lambda n: frameworks, 1 if frameworks else 0)),
+        (3, _Section("QUANTITATIVE QUESTION PATTERNS:",
+                     lambda n: [{"type": pattern_type, "examples": examples[:n]}
+                                for pattern_type, examples in quantitative],
+                     MAX_QUANTITATIVE_EXAMPLES if quantitative else 0)),
+    ]
+    if context is not None:
+        prompts = context.get("example_prompts") or []
+        sections.append((4, _Section(
+            f"INDUSTRY CONTEXT ({industry}):",
+            lambda n: {**context, "example_prompts": prompts[:n], "name": industry},
+            min(len(prompts), MAX_INDUSTRY_PROMPTS), keep_empty=True
+        )))
+    sections += [
+        (5, _Section("CLARIFYING INFORMATION PATTERNS:",
+                     lambda n: clarifying[:n], min(len(clarifying), MAX_CLARIFYING_PATTERNS))),
+        (6, _Section("BRAINSTORMING PATTERNS:",
+                     lambda n: brainstorming[:n], min(len(brainstorming), MAX_BRAINSTORMING_PROMPTS))),
+        (2, _Section(f"REAL {difficulty.upper()} {case_type} CASES FROM THE LIBRARY (structure and depth to match):",
+                     lambda n: library_cases[:n], len(library_cases))),
+    ]
+    return sections
+
+
+def _fit_bundle(sections, budget):
+    """
+    Section texts that fit in the budget, in prompt order
+
+    Sections are filled in priority order with as many items as still fit;
+    a section with no item left is dropped.
+    """
+    chosen = {}
+    remaining = budget
+    for idx, (_, section) in sorted(enumerate(sections), key=lambda item: item[1][0]):
+        fitted = section.fit(remaining)
+        if fitted is not None:
+            chosen[idx] = fitted[0]
+            remaining -= fitted[1]
+    return [chosen[idx] for idx in sorted(chosen)]
+
+
+def _library_examples(library):
+    """
+    Library cases worth showing, per (case type, difficulty), best first
+
+    Returns:
+        Dictionary (case_type, difficulty) -> list of (industry, example)
+    """
+    entries = sorted(library.index["cases"], key=lambda e: (-e.get("quality_score", 0), e["case_id"]))
+    per_bucket = {}
+    for entry in entries:
+        per_bucket.setdefault((entry["case_type"], entry["difficulty"]), []).append(entry)
+
+    # Only read the cases that can make it into a bundle
+    wanted = [entry for bucket in per_bucket.values() for entry in bucket[:MAX_LIBRARY_CASES * 4]]
+    cases = library.get_many([entry["case_id"] for entry in wanted])
+
+    examples = {}
+    for entry in wanted:
+        case = cases.get(entry["case_id"])
+        if not case:
+            continue
+        content = case.get("content", {})
+        prompt = (content.get("prompt") or "").strip()
+        questions = [q["text"][:LIBRARY_TEXT_CHARS] for q in content.get("questions", [])[:MAX_LIBRARY_QUESTIONS]]
+        if not prompt and not questions:
+            continue
+        examples.setdefault((entry["case_type"], entry["difficulty"]), []).append((entry["industry"], {
+            "title": entry.get("title"),
+            "industry": entry["industry"],
+            "prompt": prompt[:LIBRARY_TEXT_CHARS],
+            "questions": questions
+        }))
+    return examples
+
+
+def build_example_bundles(library_dir="data/library", knowledge_base_path="data/knowledge_base.json",
+                          budgets=None):
+    """
+    Precompute the example bundles of every bucket and write them next to
+    the library index
+
+    Section texts are stored once and bundles list the ones they use, so
+    buckets sharing a knowledge-base section do not repeat it. The file is
+    stamped with its format version and a digest of the knowledge base; the
+    generator ignores it when either does not match what it loaded. The
+    library builder rewrites it whenever it saves the index.
+
+    Args:
+        library_dir: Case library directory (index.json)
+        knowledge_base_path: knowledge_base.json the generator loads
+        budgets: Dictionary bundle size name -> token budget
+            (default: DEFAULT_TOKEN_BUDGETS)
+
+    Returns:
+        The bundles data, or None if the knowledge base or the library is
+        missing
+    """
+    library_dir = Path(library_dir)
+    knowledge_base_path = Path(knowledge_base_path)
+    budgets = dict(budgets or DEFAULT_TOKEN_BUDGETS)
+
+    library = CaseLibrary(library_dir)
+    if not knowledge_base_path.exists() or not library.is_available():
+        return None
+
+    raw = knowledge_base_path.read_bytes()
+    kb = load(knowledge_base_path)
+    index = library.index
+
+    case_types = sorted(set(kb.get("opening_patterns") or {}) | set(kb.get("framework_approaches") or {})
+                        | {entry["case_type"] for entry in index["cases"]})
+    industries = sorted(set(kb.get("industry_contexts") or {}) | {entry["industry"] for entry in index["cases"]})
+    examples = _library_examples(library)
+
+    fragments = []
+    fragment_ids = {}
+    bundles = {}
+
+    for case_type in case_types:
+        for difficulty in DIFFICULTIES:
+            candidates = examples.get((case_type, difficulty), [])
+            for industry in industries:
+                # Cases of the requested industry first
+                library_cases = [example for _, example in sorted(
+                    candidates, key=lambda candidate: candidate[0] != industry
+                )][:MAX_LIBRARY_CASES]
+                sections = _sections(kb, case_type, difficulty, industry, library_cases)
+
+                sizes = {}
+                for name, budget in budgets.items():
+                    texts = _fit_bundle(sections, budget)
+                    ids = []
+                    for text in texts:
+                        if text not in fragment_ids:
+                            fragment_ids[text] = len(fragments)
+                            fragments.append(text)
+                        ids.append(fragment_ids[text])
+                    sizes[name] = [ids, estimate_tokens("\n\n".join(texts))]
+                bundles[bundle_key(case_type, difficulty, industry)] = sizes
+
+    data = {
+        "version": EXAMPLE_BUNDLES_VERSION,
+        "created": datetime.now().isoformat(),
+        "knowledge_base": {"digest": hashlib.sha1(raw).hexdigest(), "last_updated": kb.get("last_updated")},
+        "library": {"last_updated": index.get("last_updated"), "total_cases": index.get("total_cases")},
+        "budgets": budgets,
+        "industries": industries,
+        "fragments": fragments,
+        "bundles": bundles
+    }
+    write_json_atomic(library_dir / EXAMPLE_BUNDLES_FILE, data)
+    return data
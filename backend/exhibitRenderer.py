@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Exhibit Renderer
+Renders exhibit screenshots on first request from the page and region
+descriptors recorded by extraction with screenshots on demand (see
+extractionProfiles), and keeps the images in a size-bounded on-disk LRU
+cache keyed by (PDF hash, page, region, dpi)
+
+Usage:
+    from exhibitRenderer import render_exhibit
+
+    path = render_exhibit(screenshot)                      # recorded dpi, PNG
+    path = render_exhibit(screenshot, width=800, fmt="jpeg")
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from fileUtils import file_signature, remove_file, write_bytes_atomic
+
+EXHIBIT_CACHE_DIR = "data/exhibit_cache"
+# Default bound of the cached images (sum of file sizes)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+# pixmap.tobytes() output formats, by name and file extension
+RENDER_FORMATS = {"png": "png", "jpeg": "jpg", "jpg": "jpg"}
+MAX_RENDER_DPI = 600
+
+_digests = {}
+_digests_lock = threading.Lock()
+_default_cache = None
+
+
+class ExhibitRenderError(ValueError):
+    """Raised when a descriptor cannot be rendered (PDF missing or changed)"""
+
+
+def pdf_digest(pdf_path):
+    """
+    SHA-1 of a PDF file, remembered while its size and mtime do not change
+
+    Returns:
+        Hex digest
+    """
+    key = str(pdf_path)
+    signature = file_signature(pdf_path)
+    with _digests_lock:
+        known = _digests.get(key)
+    if known is not None and known[0] == signature:
+        return known[1]
+
+    digest = hashlib.sha1()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[key] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def describe_exhibit(pdf_path, pdf_hash, page, page_num, region, dpi):
+    """
+    Render descriptor of a page region (or the whole page when region is
+    None), with the size it has at `dpi`
+
+    Args:
+        pdf_path: PDF the page belongs to
+        pdf_hash: pdf_digest() of that PDF
+        page: fitz page
+        page_num: 1-based page number
+        region: fitz.Rect in PDF points, or None
+        dpi: Resolution the descriptor is rendered at by default
+
+    Returns:
+        (descriptor, (width, height) in pixels at dpi)
+    """
+    import fitz  # PyMuPDF
+
+    rect = page.rect if region is None else fitz.Rect(region)
+    pixels = (rect * fitz.Matrix(dpi / 72, dpi / 72)).irect
+    descriptor = {
+        "pdf": str(pdf_path),
+        "pdf_hash": pdf_hash,
+        "page": page_num,
+        # Exact coordinates: a rounded region can shift the pixel grid
+        "region": None if region is None else [float(v) for v in region],
+        "box": [round(rect.width, 2), round(rect.height, 2)],
+        "dpi": dpi
+    }
+    return descriptor, (pixels.width, pixels.height)
+
+
+class ExhibitCache:
+    """
+    Size-bounded LRU cache of rendered exhibits in a directory
+
+    Recency is the file mtime (touched on every hit), so a new process,
+    which lists the directory once, evicts in the same order. Files are
+    published atomically; another process evicting a file only costs a
+    re-render.
+    """
+
+    def __init__(self, cache_dir=EXHIBIT_CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Cache directory
+            max_bytes: Upper bound of the cached files, by size; least
+                recently used images are evicted first
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        files = []
+        for item in os.scandir(self.cache_dir):
+            if item.is_file() and not item.name.startswith("."):
+                stat = item.stat()
+                files.append((stat.st_mtime_ns, item.name, stat.st_size))
+        # name -> size, least recently used first
+        self._files = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._bytes = sum(self._files.values())
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(pdf_hash, page, region, dpi, fmt):
+        """File name of a rendered exhibit"""
+        if region is None:
+            region_key = "full"
+        else:
+            region_key = hashlib.blake2b(repr([round(v, 2) for v in region]).encode(), digest_size=6).hexdigest()
+        return f"{pdf_hash[:20]}_p{page}_{region_key}_{dpi}.{RENDER_FORMATS[fmt]}"
+
+    def get(self, name):
+        """Path of a cached image (marked as recently used), or None"""
+        path = self.cache_dir / name
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes -= self._files.pop(name, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if name not in self._files:
+                # Rendered by another process
+                self._files[name] = path.stat().st_size
+                self._bytes += self._files[name]
+            self._files.move_to_end(name)
+            self.hits += 1
+        return path
+
+    def put(self, name, data):
+        """Store an image, evicting the least recently used ones over the bound"""
+        path = self.cache_dir / name
+        write_bytes_atomic(path, data)
+
+        evicted = []
+        with self._lock:
+            self._bytes -= self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self._bytes += len(data)
+            # Never the image just stored, even when it alone is over the bound
+            while self._bytes > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._bytes -= size
+                evicted.append(old)
+        for old in evicted:
+            remove_file(self.cache_dir / old)
+        return path
+
+    def info(self):
+        with self._lock:
+            return {"files": len(self._files), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def default_cache():
+    """The ExhibitCache at EXHIBIT_CACHE_DIR, created on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExhibitCache()
+    return _default_cache
+
+
+def render_exhibit(asset, dpi=None, width=None, fmt="png", cache=None, pdf_path=None):
+    """
+    Image of an exhibit screenshot, rendered the first time it is requested
+
+    Args:
+        asset: Screenshot asset with a "render" descriptor (or the descriptor)
+        dpi: Resolution (default: the one recorded at extraction)
+        width: Width in pixels; overrides dpi
+        fmt: "png" or "jpeg"
+        cache: ExhibitCache (default: default_cache())
+        pdf_path: Where the PDF is now, if it moved since extraction
+
+    Returns:
+        Path of the image file in the cache
+
+    Raises:
+        ExhibitRenderError: Unknown format, or the PDF is missing or no
+            longer the one the descriptor was recorded from
+    """
+    descriptor = asset.get("render", asset)
+    fmt = fmt.lower()
+    if fmt not in RENDER_FORMATS:
+        raise ExhibitRenderError(f"Unknown image format '{fmt}' (expected png or jpeg)")
+
+    if width:
+        dpi = round(width * 72 / descriptor["box"][0])
+    dpi = max(1, min(int(dpi or descriptor["dpi"]), MAX_RENDER_DPI))
+
+    cache = cache or default_cache()
+    name = cache.key(descriptor["pdf_hash"], descriptor["page"], descriptor["region"], dpi, fmt)
+    path = cache.get(name)
+    if path is not None:
+        return path
+
+    import fitz  # PyMuPDF
+
+    pdf_path = Path(pdf_path or descriptor["pdf"])
+    try:
+        if pdf_digest(pdf_path) != descriptor["pdf_hash"]:
+            raise ExhibitRenderError(f"{pdf_path} changed since extraction: re-extract it")
+    except FileNotFoundError:
+        raise ExhibitRenderError(f"{pdf_path} not found")
+
+    with fitz.open(pdf_path) as doc:
+        page = doc[descriptor["page"] - 1]
+        clip = None if descriptor["region"] is None else fitz.Rect(descriptor["region"])
+        data = page.get_pixmap(dpi=dpi, clip=clip).tobytes(RENDER_FORMATS[fmt])
+    return cache.put(name, data)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Exhibit Table Normalization
+Infers column types of extracted tables and parses their cells into numeric
+columns ("$1.2M", "35%", "(4,500)", "1 200 €") in one pass over a document
+"""
+
+import re
+
+import numpy as np
+
+# Share of non-empty cells that must parse for a column to count as numeric
+NUMERIC_COLUMN_SHARE = 0.6
+
+COLUMN_TYPES = ("text", "number", "currency", "percent")
+_TEXT, _NUMBER, _CURRENCY, _PERCENT = range(len(COLUMN_TYPES))
+
+CURRENCY_SYMBOLS = {"$": "$", "€": "€", "£": "£", "¥": "¥", "EUR": "€", "USD": "$", "GBP": "£"}
+
+UNIT_SCALES = {
+    "k": 1e3, "K": 1e3,
+    "m": 1e6, "M": 1e6, "MM": 1e6, "mm": 1e6, "mn": 1e6, "Mn": 1e6,
+    "b": 1e9, "B": 1e9, "bn": 1e9, "Bn": 1e9, "Md": 1e9, "Mds": 1e9, "Mrd": 1e9,
+}
+
+_CELL_PATTERN = re.compile(
+    r"""^(?P<open>\()?\s*
+    (?P<sign>[-−–])?\s*
+    (?P<cur1>[$€£¥]|EUR|USD|GBP)?\s*
+    (?P<number>\d{1,3}(?:[ ,.\u00a0\u202f]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?|[.,]\d+)\s*
+    (?P<unit>%|Mds|Mrd|Md|MM|mm|mn|Mn|bn|Bn|[kKmMbB])?\s*
+    (?P<cur2>[$€£¥]|EUR|USD|GBP)?\s*
+    (?P<close>\))?$""",
+    re.VERBOSE
+)
+# Cells that mean "no value" rather than text
+PLACEHOLDERS = {"-", "–", "—", "n/a", "N/A", "NA", "n.a.", "/"}
+
+_GROUP_SEPARATORS = str.maketrans("", "", " \u00a0\u202f")
+
+
+def normalize_tables(tables):
+    """
+    Add typed numeric columns to every table, in place
+
+    All cells of all tables are parsed in a single pass; sign, scale and
+    column-type inference then run as NumPy operations over the whole batch.
+    The original strings stay in "headers" and "rows" only, and each table
+    gains a "columns" list:
+
+        {"name": "Revenue", "type": "currency", "unit": "$",
+         "values": [1200000.0, None, -4500.0]}
+
+    Text columns carry no values. Percentages are stored as fractions.
+
+    Args:
+        tables: Table dictionaries with "headers" and "rows"
+
+    Returns:
+        The same list of tables
+    """
+    cells, cell_table, cell_row, cell_col = [], [], [], []
+    widths = []
+
+    for table_idx, table in enumerate(tables):
+        width = max([len(table["headers"])] + [len(row) for row in table["rows"]])
+        widths.append(width)
+        for row_idx, row in enumerate(table["rows"]):
+            for col_idx, cell in enumerate(row):
+                cells.append(cell)
+                cell_table.append(table_idx)
+                cell_row.append(row_idx)
+                cell_col.append(col_idx)
+
+    values, kinds, units = parse_cells(cells)
+
+    if not any(widths):
+        for table in tables:
+            table["columns"] = []
+        return tables
+
+    # One global column id per (table, column) for the batched reductions
+    offsets = np.concatenate(([0], np.cumsum(widths, dtype=np.int64)))
+    column_ids = offsets[np.asarray(cell_table, dtype=np.int64)] + np.asarray(cell_col, dtype=np.int64) \
+        if cells else np.zeros(0, dtype=np.int64)
+    n_columns = int(offsets[-1])
+
+    non_empty = np.array([bool(c and c.strip()) and c.strip() not in PLACEHOLDERS for c in cells],
+                         dtype=bool)
+    parsed = kinds != _TEXT
+    non_empty_count = np.bincount(column_ids, weights=non_empty, minlength=n_columns)
+    parsed_count = np.bincount(column_ids, weights=parsed, minlength=n_columns)
+    kind_count = np.bincount(column_ids * len(COLUMN_TYPES) + kinds,
+                             minlength=n_columns * len(COLUMN_TYPES)).reshape(n_columns, -1)
+
+    kind_count[:, _TEXT] = 0
+    column_kind = np.where(
+        (non_empty_count > 0) & (parsed_count >= NUMERIC_COLUMN_SHARE * np.maximum(non_empty_count, 1)),
+        kind_count.argmax(axis=1),
+        _TEXT
+    )
+
+    cell_rows = np.asarray(cell_row, dtype=np.int64)
+    order = np.argsort(column_ids, kind="stable")
+    bounds = np.searchsorted(column_ids[order], np.arange(n_columns + 1))
+
+    for table_idx, table in enumerate(tables):
+        columns = []
+        for col_idx in range(widths[table_idx]):
+            column_id = offsets[table_idx] + col_idx
+            header = table["headers"][col_idx] if col_idx < len(table["headers"]) else None
+            column = {
+                "name": header or f"column_{col_idx + 1}",
+                "type": COLUMN_TYPES[column_kind[column_id]]
+            }
+
+            if column_kind[column_id] != _TEXT:
+                members = order[bounds[column_id]:bounds[column_id + 1]]
+                column_values = np.full(len(table["rows"]), np.nan)
+                column_values[cell_rows[members]] = values[members]
+                column["unit"] = next((units[i] for i in members if units[i]), None)
+                column["values"] = [None if np.isnan(v) else float(v) for v in column_values]
+
+            columns.append(column)
+
+        table["columns"] = columns
+
+    return tables
+
+
+def parse_cells(cells):
+    """
+    Parse a flat list of cell strings
+
+    Returns:
+        (values, kinds, units): float64 array (NaN where a cell is not a
+        number), int8 array of COLUMN_TYPES indices, list of currency
+        symbols (None where absent)
+    """
+    n = len(cells)
+    numbers = np.full(n, "", dtype=object)
+    scales = np.ones(n)
+    negative = np.zeros(n, dtype=bool)
+    kinds = np.zeros(n, dtype=np.int8)
+    units = [None] * n
+
+    for idx, cell in enumerate(cells):
+        if not cell:
+            continue
+        match = _CELL_PATTERN.match(cell.strip())
+        if match is None or bool(match["open"]) != bool(match["close"]):
+            continue
+
+        numbers[idx] = _canonical_number(match["number"])
+        negative[idx] = bool(match["open"] or match["sign"])
+
+        unit = match["unit"]
+        currency = match["cur1"] or match["cur2"]
+        if unit == "%":
+            kinds[idx] = _PERCENT
+        else:
+            scales[idx] = UNIT_SCALES.get(unit, 1.0)
+            kinds[idx] = _CURRENCY if currency else _NUMBER
+        if currency:
+            units[idx] = CURRENCY_SYMBOLS[currency]
+
+    values = np.full(n, np.nan)
+    parsed = kinds != _TEXT
+    if parsed.any():
+        values[parsed] = numbers[parsed].astype(np.float64) * scales[parsed]
+        values[negative & parsed] *= -1
+        values[kinds == _PERCENT] /= 100
+
+    return values, kinds, units
+
+
+def _canonical_number(number):
+    """
+    "1,234.5" / "1.234,5" / "1 234,5" / "0,35" -> "1234.5" style
+
+    The last separator is the decimal point when both "," and "." occur; a
+    single comma followed by exactly three digits is a thousands separator.
+    """
+    number = number.translate(_GROUP_SEPARATORS)
+    commas, dots = number.count(","), number.count(".")
+
+    if commas and dots:
+        if number.rfind(",") > number.rfind("."):
+            return number.replace(".", "").replace(",", ".")
+        return number.replace(",", "")
+    if commas:
+        if commas == 1 and len(number) - number.index(",") - 1 != 3:
+            return number.replace(",", ".")
+        return number.replace(",", "")
+    if dots > 1:
+        return number.replace(".", "")
+    return number
+
+
+def column_arrays(table):
+    """
+    NumPy view of a normalized table's numeric columns
+
+    Returns:
+        Dictionary of column name -> float64 array (NaN for missing cells)
+    """
+    return {
+        column["name"]: np.array([np.nan if v is None else v for v in column["values"]], dtype=np.float64)
+        for column in table.get("columns", [])
+        if column["type"] != "text"
+    }
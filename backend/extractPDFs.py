@@ -5,11 +5,16 @@ Reads all PDFs in data/casebooks/ and extracts case interview structures
 """
 
 import pdfplumber
-import json
 import re
 from pathlib import Path
 from datetime import datetime
 
+from fileUtils import file_signature, write_json_atomic
+from kbAggregates import aggregate_signature, update_knowledge_base, write_aggregate
+from textNormalizer import normalize_text
+from recordCodec import load
+from textStore import DEFAULT_CODEC, pack_text
+
 def extract_cases_from_pdf(pdf_path):
     """
     Extract case interview content from a casebook PDF
@@ -18,32 +23,45 @@ def extract_cases_from_pdf(pdf_path):
         pdf_path: Path to PDF file
 
     Returns:
-        List of extracted case dictionaries
+        (cases, text): the extracted case dictionaries and the text of their
+        sections, concatenated; each case points into it with a UTF-8 byte
+        "text_range"
     """
     cases = []
-    current_case = None
+    sections = []
 
     print(f"Processing: {pdf_path}")
 
     with pdfplumber.open(pdf_path) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            full_text += page.extract_text() + "\n\n"
+        full_text = "".join(normalize_text(page.extract_text() or "").text + "\n\n" for page in pdf.pages)
 
     # Split into individual cases
     # Common patterns: "CASE:", "Case X:", page numbers, etc.
-    case_sections = re.split(r'(?:CASE[:\s]|Case\s+\d+|^\d+\s*$)', full_text, flags=re.MULTILINE)
-
-    for section in case_sections:
+    # Sections are the text between two separators
+    bounds = [0]
+    for match in re.finditer(r'(?:CASE[:\s]|Case\s+\d+|^\d+\s*$)', full_text, flags=re.MULTILINE):
+        bounds.extend((match.start(), match.end()))
+    bounds.append(len(full_text))
+
+    for start, end in zip(bounds[::2], bounds[1::2]):
+        section = full_text[start:end]
         if len(section.strip()) < 100:  # Skip very short sections
             continue
 
         case_data = parse_case_section(section)
         if case_data:
             cases.append(case_data)
+            sections.append(section)
+
+    position = 0
+    for case_data, section in zip(cases, sections):
+        size = len(section.encode("utf-8"))
+        case_data["source"] = pdf_path.name
+        case_data["text_range"] = [position, position + size]
+        position += size
 
     print(f"  ✓ Extracted {len(cases)} cases")
-    return cases
+    return cases, "".join(sections)
 
 def parse_case_section(text):
     """
@@ -60,7 +78,6 @@ def parse_case_section(text):
     - Solutions
     """
     case = {
-        "raw_text": text,
         "prompt": extract_prompt(text),
         "case_type": extract_case_type(text),
         "industry": extract_industry(text),
@@ -218,25 +235,59 @@ def extract_conclusion(text):
         return match.group(1).strip()
     return None
 
-def process_all_pdfs(casebooks_folder="../data/casebooks"):
+def process_all_pdfs(casebooks_folder="../data/casebooks", aggregates_dir="../data/kb_aggregates",
+                     kb_path="../data/knowledge_base.json", text_codec=DEFAULT_CODEC,
+                     output_path="../data/extracted_cases.json", force=False):
     """
     Process all PDFs in the casebooks folder
 
+    The text of each PDF is stored once, compressed, under "texts"; cases
+    reference it by "source" and "text_range" (read it with
+    textStore.TextStore or backend/caseText.js). Each PDF also gets a
+    knowledge-base aggregate (see kbAggregates), and the knowledge base
+    statistics are updated from the aggregates that were added, changed or
+    removed.
+
+    A PDF whose aggregate was written for the same file (size and mtime)
+    is not read again: its cases and text are carried over from the
+    previous output.
+
+    Args:
+        force: Extract every PDF (e.g. after changing the parsing rules)
+
     Returns:
         List of all extracted cases
     """
     all_cases = []
+    texts = {}
     pdf_files = list(Path(casebooks_folder).glob("*.pdf"))
+    previous = _previous_output(output_path) if not force else None
 
     print(f"\n📚 Processing {len(pdf_files)} PDF files...\n")
 
     for pdf_file in pdf_files:
         try:
-            cases = extract_cases_from_pdf(pdf_file)
+            signature = file_signature(pdf_file)
+            if previous and pdf_file.name in previous["texts"] \
+                    and aggregate_signature(aggregates_dir, pdf_file.name) == signature:
+                all_cases.extend(c for c in previous["cases"] if c.get("source") == pdf_file.name)
+                texts[pdf_file.name] = previous["texts"][pdf_file.name]
+                print(f"Unchanged: {pdf_file}")
+                continue
+
+            cases, text = extract_cases_from_pdf(pdf_file)
             all_cases.extend(cases)
+            texts[pdf_file.name] = pack_text(text, text_codec)
+            write_aggregate(aggregates_dir, pdf_file.name, signature, cases)
         except Exception as e:
             print(f"  ✗ Error processing {pdf_file.name}: {e}")
 
+    # Casebooks removed from the folder leave the knowledge base
+    names = {f.name for f in pdf_files}
+    for path in Path(aggregates_dir).glob("*.json"):
+        if path.name[:-len(".json")] not in names:
+            path.unlink()
+
     print(f"\n✓ Total cases extracted: {len(all_cases)}\n")
 
     # Save extraction results
@@ -244,19 +295,36 @@ def process_all_pdfs(casebooks_folder="../data/casebooks"):
         "extraction_date": datetime.now().isoformat(),
         "total_cases": len(all_cases),
         "sources": [f.name for f in pdf_files],
+        "texts": texts,
         "cases": all_cases
     }
 
-    with open("../data/extracted_cases.json", "w") as f:
-        json.dump(output, f, indent=2)
+    write_json_atomic(output_path, output)
+
+    print(f"✓ Saved to {output_path}")
 
-    print("✓ Saved to ../data/extracted_cases.json")
+    update_knowledge_base(kb_path, aggregates_dir)
 
     return all_cases
 
+def _previous_output(output_path):
+    """Output of the last run, if it has per-casebook texts to carry over"""
+    try:
+        output = load(output_path)
+    except (OSError, ValueError):
+        return None
+    return output if isinstance(output.get("texts"), dict) else None
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract case structures from the casebook PDFs")
+    parser.add_argument("--force", action="store_true",
+                        help="extract every PDF, not only new or changed ones")
+    args = parser.parse_args()
+
     # Run extraction
-    cases = process_all_pdfs()
+    cases = process_all_pdfs(force=args.force)
 
     # Display summary
     print("\n" + "="*60)
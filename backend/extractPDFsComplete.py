@@ -4,15 +4,49 @@ Complete PDF Case Extractor with Visual Assets
 Extracts text, tables, images, and creates screenshots from casebook PDFs
 """
 
-import pdfplumber
-import fitz  # PyMuPDF
-from pdf2image import convert_from_path
-import json
+# pdfplumber, PyMuPDF (fitz) and pdf2image are imported where they are used:
+# they dominate start-up time and re-parsing from the page store needs none of them
+import bisect
+import contextlib
+import functools
+import gc
 import re
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
-from PIL import Image
-import io
+
+from extractionCost import CALIBRATION_PATH, CostModel, ProgressMeter, format_duration, scan_pdf
+from extractionProfiles import (TABLE_STRATEGIES, describe_profile, images_cover, resolve_profile, screenshots_cover,
+                                select_pages, tables_cover)
+from exhibitRenderer import describe_exhibit, pdf_digest
+from extractionShards import ShardStore
+from fileUtils import file_signature, write_json_atomic
+from isolatedExtraction import ExtractionFailed, extract_isolated
+from pageClassifier import CONTENT, classify_pages
+from pageStore import PageStore, page_content_hashes
+from pipelineArguments import PDF_TIMEOUT, add_extraction_arguments, profile_from_args
+from quarantine import Quarantine
+from runJournal import RunJournal
+from textNormalizer import normalize_text
+
+# Seconds between progress lines while several PDFs are extracting
+PROGRESS_INTERVAL = 30
+# Exhibit regions smaller than this share of the page (logos, bullets) are ignored
+MIN_REGION_SHARE = 0.02
+# Drawings covering more than this share of the page are backgrounds/frames
+BACKGROUND_REGION_SHARE = 0.9
+# Render the full page when the exhibit regions cover more than this share
+FULL_PAGE_REGION_SHARE = 0.6
+# Margin (PDF points) around regions; regions closer than this are merged
+REGION_PADDING = 12
+# Max distance (PDF points) between an "Exhibit N" title and the region below it
+EXHIBIT_TITLE_GAP = 80
+# Page labels whose text goes into case segmentation (dividers carry case titles)
+SEGMENT_LABELS = (CONTENT, "divider")
 
 class CompleteCaseExtractor:
     """
@@ -20,10 +54,44 @@ class CompleteCaseExtractor:
     Handles text, tables, images, and screenshots
     """
 
-    def __init__(self, output_dir="data"):
+    def __init__(self, output_dir="data", low_memory=False, max_rss_mb=None, page_store=None,
+                 crop_exhibits=True, profile=None, page_workers=1, pages_per_chunk=16,
+                 classify=True):
+        """
+        Args:
+            output_dir: Root directory for extraction output
+            low_memory: Release per-page layout caches, fitz pages and
+                rendered pixmaps as soon as each page has been captured
+            max_rss_mb: Optional RSS ceiling (MB) for low-memory mode; when
+                exceeded, open PDF handles are recycled to drop document caches
+            page_store: Optional PageStore; pages already in it are not
+                re-extracted and reparse_pdf() becomes available
+            crop_exhibits: Render only the exhibit regions of a page instead
+                of the full page
+            profile: Extraction profile name or resolve_profile() settings
+                (stages, screenshot DPI, image min-size, table strategy,
+                page ranges); default "standard"
+            page_workers: Worker processes for the pages of a single PDF
+                (1 keeps everything in this process)
+            pages_per_chunk: Pages handed to a worker at a time
+            classify: Label pages first (see pageClassifier) and skip table
+                detection, image extraction and screenshots on covers,
+                tables of contents, dividers, sponsor and blank pages
+        """
         self.output_dir = Path(output_dir)
         self.exhibits_dir = self.output_dir / "exhibits"
         self.exhibits_dir.mkdir(parents=True, exist_ok=True)
+        self.low_memory = low_memory or max_rss_mb is not None
+        self.max_rss_mb = max_rss_mb
+        self.page_store = page_store
+        self.crop_exhibits = crop_exhibits
+        self.profile = resolve_profile(profile)
+        self.screenshot_dpi = self.profile["screenshot_dpi"]
+        self.page_workers = page_workers
+        self.pages_per_chunk = pages_per_chunk
+        self.classify = classify
+        # Seconds per stage of the current PDF (see extraction_metadata)
+        self.stage_seconds = {}
 
     def extract_complete_pdf(self, pdf_path):
         """
@@ -45,109 +113,485 @@ class CompleteCaseExtractor:
         # Create exhibit directory for this PDF
         pdf_exhibits_dir = self.exhibits_dir / pdf_name
         pdf_exhibits_dir.mkdir(exist_ok=True)
+        self.stage_seconds = {}
 
-        # Extract text and tables with pdfplumber
-        print("📄 Extracting text and tables...")
-        text_data = self._extract_text_and_tables(pdf_path)
+        if self.page_store is not None:
+            text_data, images, screenshots = self._extract_with_page_store(pdf_path, pdf_exhibits_dir)
+        else:
+            pages = select_pages(self.profile, _page_count(pdf_path))
+            text_data, images, screenshots = self._run_page_extraction(
+                pdf_path, pdf_exhibits_dir, pages,
+                self._stage_pages("images", pages), self._stage_pages("screenshots", pages)
+            )
 
-        # Extract embedded images with PyMuPDF
-        print("🖼️  Extracting embedded images...")
-        images = self._extract_images(pdf_path, pdf_exhibits_dir)
+        return self._build_result(pdf_path.name, text_data, images, screenshots, self.profile)
 
-        # Detect pages with exhibits
-        print("🔍 Detecting exhibit pages...")
-        exhibit_pages = self._detect_exhibit_pages(text_data)
-
-        # Create screenshots of exhibit pages
-        print("📸 Creating exhibit screenshots...")
-        screenshots = self._create_exhibit_screenshots(
-            pdf_path,
-            exhibit_pages,
-            pdf_exhibits_dir
-        )
+    def reparse_pdf(self, source):
+        """
+        Re-run case parsing for a document already in the page store
+
+        Args:
+            source: PDF file name as stored (e.g. "Darden-2013.pdf")
+
+        Returns:
+            Dictionary with complete extraction data, or None if the
+            document is not (fully) in the store
+        """
+        text_data = self.page_store.load_pages(source)
+        if text_data is None:
+            return None
+        self.stage_seconds = {}
+
+        # Same pages and assets as the extraction run that stored the document
+        document = self.page_store.get_document(source)
+        profile = resolve_profile(document["profile"])
+        pages = select_pages(profile, len(text_data))
+        images, screenshots = _profile_assets(profile, pages, document["images"], document["screenshots"])
+        return self._build_result(source, [text_data[n - 1] for n in pages], images, screenshots, profile)
+
+    def _build_result(self, source, text_data, images, screenshots, profile):
+        """
+        Parse cases from extracted pages and assemble the per-PDF result
+
+        The profile is recorded in extraction_metadata so a later run can
+        tell whether the result covers what it asks for.
+        """
+        from exhibitTables import normalize_tables
+
+        # Typed numeric columns for every table of the document, in one pass
+        normalize_tables([table for page in text_data for table in page["tables"]])
 
         # Parse case structure
         print("📋 Parsing case structure...")
-        cases = self._parse_cases(text_data, images, screenshots, pdf_name)
+        with self._stage("parse"):
+            cases = self._parse_cases(text_data, images, screenshots, Path(source).stem)
 
         print(f"\n✓ Extraction complete!")
         print(f"  - {len(cases)} cases found")
         print(f"  - {len(images)} images extracted")
         print(f"  - {len(screenshots)} screenshots created")
 
+        page_labels = [page.get("label", CONTENT) for page in text_data]
+        label_counts = {}
+        for label in page_labels:
+            label_counts[label] = label_counts.get(label, 0) + 1
+
         return {
-            "source": pdf_path.name,
+            "source": source,
             "cases": cases,
+            "page_labels": page_labels,
             "extraction_metadata": {
                 "date": datetime.now().isoformat(),
                 "total_cases": len(cases),
                 "total_images": len(images),
-                "total_screenshots": len(screenshots)
+                "total_screenshots": len(screenshots),
+                "page_labels": label_counts,
+                "profile": profile,
+                "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()}
             }
         }
 
-    def _extract_text_and_tables(self, pdf_path):
-        """Extract text and tables using pdfplumber"""
-        pages_data = []
+    def _extract_with_page_store(self, pdf_path, pdf_exhibits_dir):
+        """
+        Extract a PDF, re-using every page whose content hash is already stored
+
+        Text and tables are looked up by page hash. Images and screenshots
+        are re-used for pages whose hash is unchanged at the same position
+        since the document was last stored.
+
+        Every stage is only re-run where what is stored does not cover the
+        profile: pages stored without tables (or with another table
+        strategy) are parsed again, images are re-extracted where the
+        stored ones were cut at a larger min-size, and screenshots are
+        re-rendered where they are missing or of a lower resolution. A
+        text-only run followed by a standard one therefore only adds the
+        visual stages. The store keeps the richest assets it has; the
+        result holds those the profile asks for.
+        """
+        profile = self.profile
+
+        print("🔑 Hashing pages...")
+        with self._stage("hash"):
+            page_hashes = page_content_hashes(pdf_path)
+        cached_pages = self.page_store.get_pages(page_hashes)
+        previous = self.page_store.get_document(pdf_path.name)
+
+        previous_hashes = previous["page_hashes"] if previous else []
+        unchanged = {
+            page_num for page_num, page_hash in enumerate(page_hashes, 1)
+            if page_num <= len(previous_hashes) and previous_hashes[page_num - 1] == page_hash
+        }
+        previous_levels = previous["asset_levels"] if previous else {}
+        previous_labels = (previous["labels"] or []) if previous else []
+
+        def levels(page_num):
+            """(image min-size, screenshot dpi) stored for an unchanged page"""
+            if page_num not in unchanged:
+                return None, None
+            return previous_levels.get(str(page_num), (None, None))
+
+        def covered(page):
+            # Pages without case content never get tables
+            return page.get("label", CONTENT) != CONTENT or tables_cover(page["table_strategy"], profile)
+
+        pages = select_pages(profile, len(page_hashes))
+        known_pages = {
+            page_num: {"page_number": page_num, **cached_pages[page_hashes[page_num - 1]]}
+            for page_num in pages
+            if page_hashes[page_num - 1] in cached_pages and covered(cached_pages[page_hashes[page_num - 1]])
+        }
+        for page_num, page in known_pages.items():
+            # The same page can be a cover on page 1 and content further on
+            if page_num in unchanged and page_num <= len(previous_labels) and previous_labels[page_num - 1]:
+                page["label"] = previous_labels[page_num - 1]
+        to_parse = [n for n in pages if n not in known_pages]
+        image_pages = [n for n in self._stage_pages("images", pages) if not images_cover(levels(n)[0], profile)]
+        screenshot_pages = [
+            n for n in self._stage_pages("screenshots", pages)
+            # New tables move the exhibit regions
+            if not screenshots_cover(levels(n)[1], profile) or n in to_parse
+        ]
 
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Extract text
-                text = page.extract_text() or ""
+        print(f"  {len(pages) - len(to_parse)}/{len(pages)} pages cached")
 
-                # Extract tables
-                tables = []
-                try:
-                    page_tables = page.extract_tables()
-                    if page_tables:
-                        for table_idx, table in enumerate(page_tables):
-                            # Convert table to structured format
-                            if len(table) > 0:
-                                headers = table[0] if table[0] else []
-                                data_rows = table[1:] if len(table) > 1 else []
-
-                                # Create structured table
-                                structured_table = {
-                                    "table_index": table_idx,
-                                    "headers": headers,
-                                    "rows": data_rows,
-                                    "data": []
-                                }
-
-                                # Convert to dict format
-                                for row in data_rows:
-                                    if row and len(row) == len(headers):
-                                        row_dict = {}
-                                        for idx, header in enumerate(headers):
-                                            if header:
-                                                row_dict[header] = row[idx] if idx < len(row) else ""
-                                        if row_dict:
-                                            structured_table["data"].append(row_dict)
-
-                                tables.append(structured_table)
-                except Exception as e:
-                    print(f"  ⚠️  Warning: Could not extract tables from page {page_num}: {e}")
+        fresh_data, fresh_images, fresh_screenshots = self._run_page_extraction(
+            pdf_path, pdf_exhibits_dir, to_parse, image_pages, screenshot_pages, known_pages
+        )
+
+        fresh_pages = {page["page_number"]: page for page in fresh_data}
+        if fresh_pages:
+            self.page_store.put_pages({page_hashes[n - 1]: page for n, page in fresh_pages.items()})
+
+        text_data = []
+        for page_num in pages:
+            page = known_pages.get(page_num) or fresh_pages[page_num]
+            text_data.append({
+                "page_number": page_num,
+                "text": page["text"],
+                "tables": page["tables"],
+                "label": page.get("label", CONTENT)
+            })
+
+        # Keep the stored assets of unchanged pages whose stage did not re-run
+        image_set, screenshot_set = set(image_pages), set(screenshot_pages)
+        stored_images = sorted(
+            [img for img in (previous["images"] if previous else [])
+             if img["page"] in unchanged and img["page"] not in image_set] + fresh_images,
+            key=lambda img: img["page"]
+        )
+        stored_screenshots = sorted(
+            [s for s in (previous["screenshots"] if previous else [])
+             if s["page"] in unchanged and s["page"] not in screenshot_set] + fresh_screenshots,
+            key=lambda s: s["page"]
+        )
+
+        asset_levels = {}
+        for page_num in range(1, len(page_hashes) + 1):
+            image_level, screenshot_level = levels(page_num)
+            if page_num in image_set:
+                image_level = profile["image_min_size"]
+            if page_num in screenshot_set:
+                # Screenshots recorded on demand are descriptors only: they
+                # cover no later run, which records (or renders) them again
+                screenshot_level = None if profile["screenshots_on_demand"] else profile["screenshot_dpi"]
+            if image_level is not None or screenshot_level is not None:
+                asset_levels[str(page_num)] = [image_level, screenshot_level]
+
+        labels = {page["page_number"]: page["label"] for page in text_data}
+        labels = [
+            labels.get(n) or (previous_labels[n - 1] if n in unchanged and n <= len(previous_labels) else None)
+            for n in range(1, len(page_hashes) + 1)
+        ]
+        self.page_store.put_document(pdf_path.name, page_hashes, stored_images, stored_screenshots,
+                                     labels, asset_levels, profile)
+
+        images, screenshots = _profile_assets(profile, pages, stored_images, stored_screenshots)
+        return text_data, images, screenshots
+
+    def _stage_pages(self, stage, pages):
+        """The pages an optional stage runs on: all of them, or none when it is off"""
+        return list(pages) if stage in self.profile["stages"] else []
+
+    def _run_page_extraction(self, pdf_path, output_dir, text_pages, image_pages, screenshot_pages,
+                             known_pages=None):
+        """
+        Run the page-level stages, split across worker processes when enabled
+
+        Pages are cut into contiguous chunks; each chunk goes to a worker
+        that opens its own PDF handles. Results are merged in page order.
+
+        Returns:
+            Same as _extract_pages
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        known_pages = known_pages or {}
+        pages = sorted(set(text_pages) | set(image_pages) | set(screenshot_pages))
+
+        if self.page_workers <= 1 or len(pages) <= self.pages_per_chunk:
+            return self._extract_pages(pdf_path, output_dir, text_pages, image_pages, screenshot_pages,
+                                       known_pages)
+
+        # Stages run inside the workers: only their total is timed here
+        started = time.perf_counter()
+
+        chunks = []
+        text_set, image_set, screenshot_set = set(text_pages), set(image_pages), set(screenshot_pages)
+        for start in range(0, len(pages), self.pages_per_chunk):
+            chunk = pages[start:start + self.pages_per_chunk]
+            chunks.append((
+                str(pdf_path),
+                str(output_dir),
+                [n for n in chunk if n in text_set],
+                [n for n in chunk if n in image_set],
+                [n for n in chunk if n in screenshot_set],
+                {n: known_pages[n] for n in chunk if n in known_pages}
+            ))
+
+        workers = min(self.page_workers, len(chunks))
+        print(f"⚡ Extracting {len(pages)} pages in {len(chunks)} chunks on {workers} workers...")
+
+        pages_data, images, screenshots = [], [], []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            worker_options = [self._worker_options()] * len(chunks)
+            for chunk_pages, chunk_images, chunk_screenshots in executor.map(
+                    _extract_chunk, worker_options, chunks):
+                pages_data.extend(chunk_pages)
+                images.extend(chunk_images)
+                screenshots.extend(chunk_screenshots)
+
+        self.stage_seconds["pages"] = self.stage_seconds.get("pages", 0.0) + time.perf_counter() - started
+        return pages_data, images, screenshots
+
+    def _worker_options(self):
+        """Constructor arguments for the extractor of a page-range worker"""
+        return {
+            "output_dir": str(self.output_dir),
+            "low_memory": self.low_memory,
+            "max_rss_mb": self.max_rss_mb,
+            "crop_exhibits": self.crop_exhibits,
+            "profile": self.profile,
+            "classify": self.classify
+        }
+
+    def _extract_pages(self, pdf_path, output_dir, text_pages, image_pages, screenshot_pages,
+                       known_pages=None, verbose=True):
+        """
+        Extract text, tables, images and screenshots for a set of pages
+
+        Args:
+            pdf_path: Path to PDF file
+            output_dir: Directory for visual assets of this PDF
+            text_pages: 1-based pages to extract text (and tables) from
+            image_pages: 1-based pages to extract embedded images from
+            screenshot_pages: 1-based pages to detect and render exhibits on
+            known_pages: Already extracted pages (page number -> page data),
+                used for exhibit detection on pages not in text_pages
+            verbose: Print stage headers
+
+        Returns:
+            (pages_data for text_pages, images, screenshots); every page
+            carries its "label" and the "table_strategy" it was parsed with
+        """
+        log = print if verbose else (lambda *args: None)
+        known_pages = known_pages or {}
+
+        # Label new pages; only content pages go through the stages below
+        labels = {n: page.get("label", CONTENT) for n, page in known_pages.items()}
+        skipped_pages = []
+        if self.classify:
+            log("🏷️  Classifying pages...")
+            new_pages = sorted((set(text_pages) | set(image_pages) | set(screenshot_pages)) - set(labels))
+            text_set = set(text_pages)
+            with self._stage("classify"):
+                classified = classify_pages(pdf_path, new_pages)
+            for page_num, page in classified.items():
+                labels[page_num] = page["label"]
+                if page["label"] != CONTENT and page_num in text_set:
+                    # The classifier's text is enough: no tables on these pages
+                    skipped_pages.append({"page_number": page_num, "text": page["text"],
+                                          "tables": [], "label": page["label"], "table_strategy": None})
+
+            skipped = sum(1 for n in new_pages if labels[n] != CONTENT)
+            if skipped:
+                log(f"  {skipped}/{len(new_pages)} pages without case content skipped")
+
+        def is_content(page_num):
+            return labels.get(page_num, CONTENT) == CONTENT
+
+        # Extract text and tables with pdfplumber
+        log("📄 Extracting text and tables...")
+        with self._stage("text"):
+            pages_data = self._extract_text_and_tables(
+                pdf_path, page_numbers=[n for n in text_pages if is_content(n)]
+            )
+        for page in pages_data:
+            page["label"] = CONTENT
+            page["table_strategy"] = self.profile["table_strategy"]
+        if skipped_pages:
+            pages_data = sorted(pages_data + skipped_pages, key=lambda page: page["page_number"])
+
+        images, screenshots = [], []
+
+        # Extract embedded images with PyMuPDF
+        if "images" in self.profile["stages"]:
+            log("🖼️  Extracting embedded images...")
+            with self._stage("images"):
+                images = self._extract_images(pdf_path, output_dir,
+                                              page_numbers=[n for n in image_pages if is_content(n)])
 
-                pages_data.append({
-                    "page_number": page_num,
-                    "text": text,
-                    "tables": tables
-                })
+        if "screenshots" not in self.profile["stages"]:
+            return pages_data, images, screenshots
+
+        # Detect pages with exhibits
+        log("🔍 Detecting exhibit pages...")
+        by_page = dict(known_pages)
+        by_page.update((page["page_number"], page) for page in pages_data)
+        exhibit_pages = self._detect_exhibit_pages([by_page[n] for n in screenshot_pages if is_content(n)])
+
+        # Create screenshots of exhibit pages (or only their descriptors)
+        if self.profile["screenshots_on_demand"]:
+            log("📐 Recording exhibit regions for on-demand rendering...")
+        else:
+            log("📸 Creating exhibit screenshots...")
+        with self._stage("screenshots"):
+            screenshots = self._create_exhibit_screenshots(
+                pdf_path,
+                exhibit_pages,
+                output_dir,
+                [by_page[n] for n in exhibit_pages]
+            )
+
+        return pages_data, images, screenshots
+
+    @contextlib.contextmanager
+    def _stage(self, name):
+        """Add the time spent in the block to stage_seconds[name]"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def _extract_text_and_tables(self, pdf_path, page_numbers=None):
+        """
+        Extract text and tables using pdfplumber
+
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: Optional list of 1-based pages to extract (default: all)
+        """
+        import pdfplumber
+
+        pages_data = []
+
+        if page_numbers is not None and not page_numbers:
+            return pages_data
+
+        pdf = pdfplumber.open(pdf_path, pages=page_numbers)
+        try:
+            remaining = [page.page_number for page in pdf.pages]
+            offset = 0
+
+            for idx, page_num in enumerate(remaining):
+                page = pdf.pages[idx - offset]
+                pages_data.append(self._extract_page_text_and_tables(page, page_num))
+
+                if self.low_memory:
+                    # Drop the parsed chars/objects/layout kept by pdfplumber
+                    page.close()
+
+                    if self._over_rss_ceiling() and idx < len(remaining) - 1:
+                        # pdfminer keeps every resolved object on the document;
+                        # reopening on the remaining pages is the only way to free it
+                        pdf.close()
+                        gc.collect()
+                        offset = idx + 1
+                        pdf = pdfplumber.open(pdf_path, pages=remaining[offset:])
+        finally:
+            pdf.close()
 
         return pages_data
 
-    def _extract_images(self, pdf_path, output_dir):
-        """Extract embedded images using PyMuPDF"""
+    def _extract_page_text_and_tables(self, page, page_num):
+        """Extract text and tables from a single pdfplumber page"""
+        # Extract text
+        text = page.extract_text() or ""
+
+        # Extract tables (find_tables keeps the bounding box for cropped screenshots)
+        tables = []
+        strategy = self.profile["table_strategy"]
+        if strategy is None:
+            return {"page_number": page_num, "text": text, "tables": tables}
+
+        try:
+            page_tables = page.find_tables(TABLE_STRATEGIES[strategy])
+            if page_tables:
+                for table_idx, found in enumerate(page_tables):
+                    table = found.extract()
+                    # Convert table to structured format
+                    if len(table) > 0:
+                        structured_table = self._structure_table(table, table_idx)
+                        structured_table["bbox"] = [round(v, 2) for v in found.bbox]
+                        tables.append(structured_table)
+        except Exception as e:
+            print(f"  ⚠️  Warning: Could not extract tables from page {page_num}: {e}")
+
+        return {
+            "page_number": page_num,
+            "text": text,
+            "tables": tables
+        }
+
+    def _structure_table(self, table, table_idx):
+        """
+        Convert a raw pdfplumber table (list of rows) to structured format
+
+        Cells are kept once, as strings; typed numeric columns are added by
+        normalize_tables when the document is parsed.
+        """
+        return {
+            "table_index": table_idx,
+            "headers": table[0] if table[0] else [],
+            "rows": table[1:] if len(table) > 1 else []
+        }
+
+    def _over_rss_ceiling(self):
+        """Check whether the process is above the configured RSS ceiling"""
+        return self.max_rss_mb is not None and current_rss_mb() > self.max_rss_mb
+
+    def _extract_images(self, pdf_path, output_dir, page_numbers=None):
+        """
+        Extract embedded images using PyMuPDF
+
+        Images narrower or shorter than the profile's image_min_size (icons,
+        bullets, logos) are skipped; file names keep the image's position
+        on the page either way.
+
+        Args:
+            pdf_path: Path to PDF file
+            output_dir: Directory to write image files to
+            page_numbers: Optional list of 1-based pages to extract (default: all)
+        """
+        import fitz  # PyMuPDF
+
         images = []
 
         try:
             doc = fitz.open(pdf_path)
 
-            for page_num in range(len(doc)):
+            if page_numbers is None:
+                page_indexes = range(len(doc))
+            else:
+                page_indexes = [n - 1 for n in page_numbers]
+
+            for page_num in page_indexes:
                 page = doc[page_num]
                 image_list = page.get_images(full=True)
 
                 for img_index, img in enumerate(image_list):
+                    if min(img[2], img[3]) < (self.profile["image_min_size"] or 0):
+                        continue
                     try:
                         xref = img[0]
                         base_image = doc.extract_image(xref)
@@ -161,23 +605,27 @@ class CompleteCaseExtractor:
                         with open(image_path, "wb") as img_file:
                             img_file.write(image_bytes)
 
-                        # Get image dimensions
-                        img_obj = Image.open(io.BytesIO(image_bytes))
-                        width, height = img_obj.size
-
+                        # PyMuPDF already reports the dimensions, no need to decode
                         images.append({
                             "page": page_num + 1,
                             "filename": image_filename,
                             "filepath": str(image_path.relative_to(self.output_dir.parent)),
                             "type": "embedded_image",
                             "format": image_ext,
-                            "width": width,
-                            "height": height
+                            "width": base_image["width"],
+                            "height": base_image["height"]
                         })
 
+                        del base_image, image_bytes
+
                     except Exception as e:
                         print(f"  ⚠️  Warning: Could not extract image {img_index + 1} from page {page_num + 1}: {e}")
 
+                if self.low_memory:
+                    # Drop the page and empty MuPDF's object/glyph store
+                    page = None
+                    fitz.TOOLS.store_shrink(100)
+
             doc.close()
 
         except Exception as e:
@@ -189,23 +637,23 @@ class CompleteCaseExtractor:
         """Detect which pages contain exhibits"""
         exhibit_pages = []
 
+        # Matched against the lower-cased canonical text
         exhibit_patterns = [
-            r'EXHIBIT\s+\d+',
-            r'Exhibit\s+\d+',
-            r'TABLE\s+\d+',
-            r'FIGURE\s+\d+',
-            r'Variable\s+[A-Z]:',
-            r'Pool\s+Options',
-            r'Hotel\s+Stories'
+            r'exhibit\s+\d+',
+            r'table\s+\d+',
+            r'figure\s+\d+',
+            r'variable\s+[a-z]:',
+            r'pool\s+options',
+            r'hotel\s+stories'
         ]
 
         for page_data in pages_data:
-            text = page_data["text"]
+            text = normalize_text(page_data["text"]).lower
             page_num = page_data["page_number"]
 
             # Check for exhibit patterns
             for pattern in exhibit_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
+                if re.search(pattern, text):
                     if page_num not in exhibit_pages:
                         exhibit_pages.append(page_num)
                     break
@@ -217,12 +665,166 @@ class CompleteCaseExtractor:
 
         return sorted(exhibit_pages)
 
-    def _create_exhibit_screenshots(self, pdf_path, exhibit_pages, output_dir):
-        """Create high-quality screenshots of exhibit pages"""
-        screenshots = []
+    def _create_exhibit_screenshots(self, pdf_path, exhibit_pages, output_dir, pages_data=None):
+        """
+        Create high-quality screenshots of exhibit pages
+
+        With crop_exhibits, only the exhibit regions of each page are rendered
+        (tables found by pdfplumber, drawings and images); pages with no usable
+        region, or where exhibits cover most of the page, are rendered whole.
+
+        With screenshots on demand (profile setting), nothing is rendered:
+        each screenshot is a descriptor of its page and region, rendered by
+        exhibitRenderer.render_exhibit the first time it is requested.
+        """
+        import fitz  # PyMuPDF
 
         if not exhibit_pages:
-            return screenshots
+            return []
+
+        on_demand = self.profile["screenshots_on_demand"]
+        if not self.crop_exhibits and not on_demand:
+            return self._create_full_page_screenshots(pdf_path, exhibit_pages, output_dir)
+
+        tables_by_page = {p["page_number"]: p["tables"] for p in (pages_data or [])}
+        screenshots = []
+
+        try:
+            doc = fitz.open(pdf_path)
+            if on_demand:
+                capture = functools.partial(self._describe_region, pdf_path=pdf_path, pdf_hash=pdf_digest(pdf_path))
+            else:
+                capture = self._render_region
+
+            for page_num in exhibit_pages:
+                try:
+                    page = doc[page_num - 1]
+                    regions = self._exhibit_regions(page, tables_by_page.get(page_num, [])) \
+                        if self.crop_exhibits else None
+
+                    if regions is None:
+                        screenshots.append(capture(page, page_num, None, output_dir))
+                    else:
+                        for region_idx, region in enumerate(regions, 1):
+                            screenshots.append(capture(page, page_num, region, output_dir, region_idx))
+
+                except Exception as e:
+                    print(f"  ⚠️  Warning: Could not create screenshot for page {page_num}: {e}")
+
+                if self.low_memory:
+                    page = None
+                    fitz.TOOLS.store_shrink(100)
+
+            doc.close()
+
+        except Exception as e:
+            print(f"  ⚠️  Warning: Could not create screenshots: {e}")
+
+        return screenshots
+
+    def _exhibit_regions(self, page, tables):
+        """
+        Find the exhibit regions of a page
+
+        Args:
+            page: fitz page
+            tables: Structured tables of that page (with pdfplumber "bbox")
+
+        Returns:
+            List of fitz.Rect in PDF points, or None to render the full page
+        """
+        import fitz  # PyMuPDF
+
+        page_rect = page.rect
+        page_area = page_rect.get_area()
+
+        candidates = [fitz.Rect(t["bbox"]) & page_rect for t in tables if t.get("bbox")]
+        if any(r.get_area() > FULL_PAGE_REGION_SHARE * page_area for r in candidates):
+            # Page-sized table (slide frames): no need to look at drawings
+            return None
+
+        candidates += [fitz.Rect(info["bbox"]) for info in page.get_image_info()]
+        candidates += [
+            rect for rect in page.cluster_drawings()
+            # Page backgrounds and frames are drawings too
+            if rect.get_area() < BACKGROUND_REGION_SHARE * page_area
+        ]
+
+        rects = []
+        for rect in candidates:
+            rect = rect & page_rect
+            if rect.get_area() >= MIN_REGION_SHARE * page_area:
+                rects.append(rect)
+
+        if not rects:
+            return None
+
+        # Pull "Exhibit N" titles that sit just above a region into it
+        for hit in page.search_for("exhibit"):
+            for idx, rect in enumerate(rects):
+                overlaps = hit.x0 < rect.x1 and hit.x1 > rect.x0
+                if overlaps and 0 <= rect.y0 - hit.y1 <= EXHIBIT_TITLE_GAP:
+                    rects[idx] = rect | hit
+
+        regions = _merge_rects(rects, REGION_PADDING)
+        regions = [fitz.Rect(r.x0 - REGION_PADDING, r.y0 - REGION_PADDING,
+                             r.x1 + REGION_PADDING, r.y1 + REGION_PADDING) & page_rect
+                   for r in regions]
+
+        if sum(r.get_area() for r in regions) > FULL_PAGE_REGION_SHARE * page_area:
+            return None
+
+        return regions
+
+    def _render_region(self, page, page_num, region, output_dir, region_idx=None):
+        """Render a page region (or the whole page when region is None) to PNG"""
+        pix = page.get_pixmap(dpi=self.screenshot_dpi, clip=region)
+
+        if region is None:
+            screenshot_filename = f"exhibit_page{page_num}.png"
+        else:
+            screenshot_filename = f"exhibit_page{page_num}_region{region_idx}.png"
+
+        screenshot_path = output_dir / screenshot_filename
+        pix.save(screenshot_path)
+
+        screenshot = {
+            "page": page_num,
+            "filename": screenshot_filename,
+            "filepath": str(screenshot_path.relative_to(self.output_dir.parent)),
+            "type": "screenshot",
+            "width": pix.width,
+            "height": pix.height
+        }
+        if region is not None:
+            screenshot["region"] = [round(v, 2) for v in region]
+
+        return screenshot
+
+    def _describe_region(self, page, page_num, region, output_dir, region_idx=None, pdf_path=None, pdf_hash=None):
+        """Screenshot asset of a page region to render on demand (no file is written)"""
+        descriptor, (width, height) = describe_exhibit(pdf_path, pdf_hash, page, page_num, region,
+                                                        self.screenshot_dpi)
+        screenshot = {
+            "page": page_num,
+            # The name the rendered file would have, for consumers that key on it
+            "filename": f"exhibit_page{page_num}.png" if region is None
+            else f"exhibit_page{page_num}_region{region_idx}.png",
+            "type": "screenshot",
+            "width": width,
+            "height": height,
+            "render": descriptor
+        }
+        if region is not None:
+            screenshot["region"] = [round(v, 2) for v in region]
+
+        return screenshot
+
+    def _create_full_page_screenshots(self, pdf_path, exhibit_pages, output_dir):
+        """Create full-page screenshots of exhibit pages with pdf2image"""
+        from pdf2image import convert_from_path
+
+        screenshots = []
 
         try:
             # Convert only exhibit pages to images
@@ -231,7 +833,7 @@ class CompleteCaseExtractor:
                     # Convert single page (pdf2image uses 1-based indexing)
                     images = convert_from_path(
                         pdf_path,
-                        dpi=200,  # High quality
+                        dpi=self.screenshot_dpi,
                         first_page=page_num,
                         last_page=page_num
                     )
@@ -253,6 +855,11 @@ class CompleteCaseExtractor:
                             "height": img.height
                         })
 
+                        if self.low_memory:
+                            img.close()
+
+                    del images
+
                 except Exception as e:
                     print(f"  ⚠️  Warning: Could not create screenshot for page {page_num}: {e}")
 
@@ -263,17 +870,41 @@ class CompleteCaseExtractor:
 
     def _parse_cases(self, pages_data, images, screenshots, pdf_name):
         """Parse individual cases from the extracted data"""
+        from caseFeatures import feature_matrix, case_types, industries, difficulties
+
         cases = []
 
-        # Combine all text
+        # Combine all text; covers, tables of contents, sponsor and blank
+        # pages hold no case text (a TOC would even match the case patterns).
+        # Each page is normalized once: the rules below match the canonical
+        # text case-sensitively through its lower-cased copy
+        segment_pages = []
+        for page in pages_data:
+            if page.get("label", CONTENT) in SEGMENT_LABELS:
+                normalized = normalize_text(page["text"])
+                segment_pages.append({**page, "text": normalized.text, "lower": normalized.lower})
+        pages_data = segment_pages
         full_text = "\n\n".join([page["text"] for page in pages_data])
+        full_lower = "\n\n".join([page["lower"] for page in pages_data])
+
+        # Offset of each page in full_text
+        page_starts = []
+        position = 0
+        for page in pages_data:
+            page_starts.append(position)
+            position += len(page["text"]) + 2
 
-        # Split into cases (basic implementation - can be improved)
-        case_sections = self._split_into_cases(full_text, pages_data)
+        def page_at(offset):
+            return pages_data[bisect.bisect_right(page_starts, offset) - 1]["page_number"]
 
-        for case_idx, case_section in enumerate(case_sections):
+        # Split into cases (basic implementation - can be improved); sections
+        # are (start, end) offsets, sliced one at a time
+        case_spans = self._split_into_cases(full_text, pages_data, page_starts)
+
+        for case_idx, (start, end) in enumerate(case_spans):
             case_data = self._parse_single_case(
-                case_section,
+                full_text[start:end],
+                full_lower[start:end],
                 pages_data,
                 images,
                 screenshots,
@@ -282,16 +913,39 @@ class CompleteCaseExtractor:
             )
 
             if case_data:
+                # Pages the case text comes from (its text is in the page store)
+                case_data["pages"] = [page_at(start), page_at(end - 1)]
                 cases.append(case_data)
 
+        # Classify all cases of the document at once from their features
+        matrix = feature_matrix(cases)
+        for case, case_type, industry, difficulty in zip(
+            cases, case_types(matrix), industries(matrix), difficulties(matrix)
+        ):
+            case["metadata"] = {
+                "case_type": case_type,
+                "industry": industry,
+                "difficulty": difficulty
+            }
+
         return cases
 
-    def _split_into_cases(self, full_text, pages_data):
-        """Split full text into individual cases"""
+    def _split_into_cases(self, full_text, pages_data, page_starts):
+        """
+        Split full text into individual cases
+
+        Args:
+            full_text: Canonical text of pages_data joined with blank lines
+            pages_data: Pages making up full_text (canonical "text" and "lower")
+            page_starts: Offset of each page in full_text
+
+        Returns:
+            List of (start, end) offsets of the case sections in full_text
+        """
         # Look for case boundaries
         # Common patterns: "CASE:", "Case X:", page separators, etc.
 
-        case_sections = []
+        case_spans = []
 
         # Try to split by common patterns
         patterns = [
@@ -303,53 +957,63 @@ class CompleteCaseExtractor:
 
         # Try each pattern
         for pattern in patterns:
-            sections = re.split(pattern, full_text, flags=re.MULTILINE)
-            if len(sections) > 1:
-                case_sections = [s.strip() for s in sections if len(s.strip()) > 200]
+            bounds = [match.start() for match in re.finditer(pattern, full_text, flags=re.MULTILINE)]
+            if bounds:
+                bounds = [0] + bounds + [len(full_text)]
+                for start, end in zip(bounds, bounds[1:]):
+                    start, end = _strip_span(full_text, start, end)
+                    if end - start > 200:
+                        case_spans.append((start, end))
                 break
 
         # If no pattern matched, treat entire PDF as one case (or split by pages)
-        if not case_sections:
+        if not case_spans:
             # Fallback: group pages into cases (approximate)
-            case_sections = []
-            current_case = []
+            first = None
 
-            for page in pages_data:
-                current_case.append(page["text"])
+            for idx, page in enumerate(pages_data):
+                # A divider page (case title) starts a new case
+                if page.get("label") == "divider" and first is not None:
+                    case_spans.append((page_starts[first], page_starts[idx] - 2))
+                    first = None
+
+                if first is None:
+                    first = idx
 
                 # Simple heuristic: if we see conclusion/summary, end the case
-                if re.search(r'(?:Conclusion|Recommendation|End of Case)',
-                           page["text"], re.IGNORECASE):
-                    if current_case:
-                        case_sections.append("\n\n".join(current_case))
-                        current_case = []
+                if re.search(r'(?:conclusion|recommendation|end of case)', page["lower"]):
+                    case_spans.append((page_starts[first], page_starts[idx] + len(page["text"])))
+                    first = None
 
             # Add remaining
-            if current_case:
-                case_sections.append("\n\n".join(current_case))
+            if first is not None:
+                case_spans.append((page_starts[first], len(full_text)))
+
+        return case_spans
 
-        return case_sections
+    def _parse_single_case(self, case_text, case_lower, pages_data, images, screenshots, pdf_name, case_idx):
+        """
+        Parse a single case into structured format
 
-    def _parse_single_case(self, case_text, pages_data, images, screenshots, pdf_name, case_idx):
-        """Parse a single case into structured format"""
+        Rules search `case_lower` (the lower-cased copy of `case_text`, same
+        offsets) with case-sensitive patterns and cut what they find out of
+        `case_text`.
+        """
+        from caseFeatures import case_features
 
         # Extract case components
         case = {
             "case_id": f"{pdf_name}_case_{case_idx + 1}",
             "source": pdf_name,
             "content": {
-                "prompt": self._extract_prompt(case_text),
-                "clarifying_information": self._extract_clarifying(case_text),
-                "framework": self._extract_framework(case_text),
-                "questions": self._extract_questions(case_text),
-                "exhibits": self._extract_exhibits_from_text(case_text, pages_data, images, screenshots),
-                "conclusion": self._extract_conclusion(case_text)
-            },
-            "metadata": {
-                "case_type": self._extract_case_type(case_text),
-                "industry": self._extract_industry(case_text),
-                "difficulty": self._estimate_difficulty(case_text),
+                "prompt": self._extract_prompt(case_text, case_lower),
+                "clarifying_information": self._extract_clarifying(case_text, case_lower),
+                "framework": self._extract_framework(case_lower),
+                "questions": self._extract_questions(case_text, case_lower),
+                "exhibits": self._extract_exhibits_from_text(case_text, case_lower, pages_data),
+                "conclusion": self._extract_conclusion(case_text, case_lower)
             },
+            "metadata": {},  # Derived from the features in _parse_cases
             "visual_assets": {
                 "images": [],  # Will be populated based on relevant pages
                 "screenshots": []  # Will be populated based on relevant pages
@@ -375,37 +1039,40 @@ class CompleteCaseExtractor:
         case["stats"]["num_screenshots"] = len(screenshots)
         case["stats"]["has_visual_assets"] = len(images) > 0 or len(screenshots) > 0
 
+        # Every count and flag used for classification and scoring, scanned once
+        case["features"] = case_features(case, case_lower)
+
         return case if case["content"]["prompt"] or case["content"]["questions"] else None
 
     # Helper extraction methods (similar to original script)
 
-    def _extract_prompt(self, text):
+    def _extract_prompt(self, text, lower):
         """Extract the opening statement/prompt"""
         patterns = [
-            r'Prompt:\s*\n(.*?)(?:\n\n|Clarifying)',
-            r'Your client (?:is|has|wants)(.*?)(?:\n\n|\?)',
-            r'(?:Client|Situation):\s*(.*?)(?:\n\n|Question:)',
-            r'^(Our client.*?)(?:\n\n)',
+            r'prompt:\s*\n(.*?)(?:\n\n|clarifying)',
+            r'your client (?:is|has|wants)(.*?)(?:\n\n|\?)',
+            r'(?:client|situation):\s*(.*?)(?:\n\n|question:)',
+            r'^(our client.*?)(?:\n\n)',
         ]
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+            match = re.search(pattern, lower, re.DOTALL)
             if match:
-                return match.group(1).strip()[:1000]
+                return text[match.start(1):match.end(1)].strip()[:1000]
         return None
 
-    def _extract_clarifying(self, text):
+    def _extract_clarifying(self, text, lower):
         """Extract clarifying information"""
         match = re.search(
-            r'Clarifying\s*(?:Information|Questions?):\s*(.*?)(?:\n\n|Framework|Question)',
-            text,
-            re.DOTALL | re.IGNORECASE
+            r'clarifying\s*(?:information|questions?):\s*(.*?)(?:\n\n|framework|question)',
+            lower,
+            re.DOTALL
         )
         if match:
-            return match.group(1).strip()
+            return text[match.start(1):match.end(1)].strip()
         return None
 
-    def _extract_framework(self, text):
+    def _extract_framework(self, lower):
         """Extract framework mentions"""
         frameworks = []
         common_frameworks = [
@@ -414,24 +1081,24 @@ class CompleteCaseExtractor:
         ]
 
         for framework in common_frameworks:
-            if re.search(framework, text, re.IGNORECASE):
+            if re.search(framework.lower(), lower):
                 frameworks.append(framework)
 
         return frameworks
 
-    def _extract_questions(self, text):
+    def _extract_questions(self, text, lower):
         """Extract numbered questions"""
         questions = []
 
-        question_pattern = r'(?:Question|Q)\s*(\d+)[:\.]?\s*(.*?)(?=(?:Question|Q)\s*\d+|Solution|Exhibit|$)'
-        matches = re.finditer(question_pattern, text, re.DOTALL | re.IGNORECASE)
+        question_pattern = r'(?:question|q)\s*(\d+)[:\.]?\s*(.*?)(?=(?:question|q)\s*\d+|solution|exhibit|$)'
+        matches = re.finditer(question_pattern, lower, re.DOTALL)
 
         for match in matches:
             question_num = match.group(1)
-            question_text = match.group(2).strip()
+            question_text = text[match.start(2):match.end(2)].strip()
 
             # Check if it has calculations
-            has_calculation = bool(re.search(r'calculate|compute|×|÷|\+|-|=', question_text, re.IGNORECASE))
+            has_calculation = bool(re.search(r'calculate|compute|×|÷|\+|-|=', match.group(2)))
 
             questions.append({
                 "number": int(question_num),
@@ -441,21 +1108,21 @@ class CompleteCaseExtractor:
 
         return questions
 
-    def _extract_exhibits_from_text(self, text, pages_data, images, screenshots):
-        """Extract exhibit information and link to visual assets"""
+    def _extract_exhibits_from_text(self, text, lower, pages_data):
+        """Extract exhibit information and link it to the table on its page"""
         exhibits = []
 
-        exhibit_pattern = r'EXHIBIT\s+(\d+)[:\.]?\s*(.*?)(?=EXHIBIT|\n\n\n|$)'
-        matches = re.finditer(exhibit_pattern, text, re.DOTALL | re.IGNORECASE)
+        exhibit_pattern = r'exhibit\s+(\d+)[:\.]?\s*(.*?)(?=exhibit|\n\n\n|$)'
+        matches = re.finditer(exhibit_pattern, lower, re.DOTALL)
 
         for match in matches:
             exhibit_num = match.group(1)
-            exhibit_content = match.group(2).strip()
+            exhibit_content = text[match.start(2):match.end(2)].strip()
 
             # Try to find associated table data
             table_data = None
             for page_data in pages_data:
-                if f"EXHIBIT {exhibit_num}" in page_data["text"].upper():
+                if f"exhibit {exhibit_num}" in page_data["lower"]:
                     if page_data["tables"]:
                         table_data = page_data["tables"][0]  # Get first table on page
                     break
@@ -468,93 +1135,156 @@ class CompleteCaseExtractor:
 
             if table_data:
                 exhibit["headers"] = table_data.get("headers", [])
-                exhibit["data"] = table_data.get("data", [])
+                exhibit["rows"] = table_data.get("rows", [])
+                exhibit["columns"] = table_data.get("columns", [])
 
             exhibits.append(exhibit)
 
         return exhibits
 
-    def _extract_conclusion(self, text):
+    def _extract_conclusion(self, text, lower):
         """Extract conclusion section"""
         match = re.search(
-            r'(?:Conclusion|Recommendation|Summary):\s*(.*?)(?:\n\n\n|$)',
-            text,
-            re.DOTALL | re.IGNORECASE
+            r'(?:conclusion|recommendation|summary):\s*(.*?)(?:\n\n\n|$)',
+            lower,
+            re.DOTALL
         )
         if match:
-            return match.group(1).strip()[:500]
+            return text[match.start(1):match.end(1)].strip()[:500]
         return None
 
-    def _extract_case_type(self, text):
-        """Identify the case type"""
-        case_types = {
-            'profitability': r'profit(?:ability)?|margin|declining.*revenue',
-            'market_entry': r'market entry|enter(?:ing)? (?:the )?market|expansion',
-            'mergers_acquisitions': r'M&A|merger|acquisition|buy|purchase',
-            'competitive_response': r'compet(?:itor|ition)|rival|threat',
-            'new_product_launch': r'new product|launch|introduce',
-            'pricing': r'pricing|price|priced',
-            'cost_reduction': r'cost.*reduc|reduc.*cost|cut costs',
-            'growth': r'growth|grow|increase.*revenue',
-        }
 
-        for case_type, pattern in case_types.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return case_type
-        return 'general'
-
-    def _extract_industry(self, text):
-        """Identify the industry"""
-        industries = {
-            'Tech': r'tech(?:nology)?|software|SaaS',
-            'Retail': r'retail|store|shopping',
-            'Healthcare': r'health(?:care)?|hospital|pharma',
-            'Financial Services': r'bank(?:ing)?|finance|insurance',
-            'Manufacturing': r'manufact(?:uring|urer)|factory',
-            'Energy': r'energy|oil|gas',
-            'Real Estate': r'real estate|hotel|resort|property'
-        }
+def _extract_chunk(options, chunk):
+    """Page-range worker: extract one chunk of a PDF in a separate process"""
+    pdf_path, output_dir, text_pages, image_pages, screenshot_pages, known_pages = chunk
+    extractor = CompleteCaseExtractor(**options)
+    return extractor._extract_pages(
+        Path(pdf_path), Path(output_dir), text_pages, image_pages, screenshot_pages, known_pages,
+        verbose=False
+    )
+
+
+def _profile_assets(profile, pages, images, screenshots):
+    """The stored images and screenshots a profile asks for, on the given pages"""
+    selected = set(pages)
+    images = [
+        img for img in images
+        if "images" in profile["stages"] and img["page"] in selected
+        and min(img["width"], img["height"]) >= profile["image_min_size"]
+    ]
+    screenshots = [s for s in screenshots if "screenshots" in profile["stages"] and s["page"] in selected]
+    return images, screenshots
+
+
+def _strip_span(text, start, end):
+    """Offsets of text[start:end].strip() within text"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _page_count(pdf_path):
+    """Number of pages of a PDF"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def _merge_rects(rects, gap):
+    """Merge rectangles that overlap or lie within `gap` points of each other"""
+    import fitz  # PyMuPDF
+
+    merged = [fitz.Rect(r) for r in rects]
+
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            grown = fitz.Rect(merged[i].x0 - gap, merged[i].y0 - gap,
+                              merged[i].x1 + gap, merged[i].y1 + gap)
+            for j in range(i + 1, len(merged)):
+                if grown.intersects(merged[j]):
+                    merged[i] |= merged.pop(j)
+                    changed = True
+                    break
+            if changed:
+                break
 
-        for industry, pattern in industries.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return industry
-        return 'General'
-
-    def _estimate_difficulty(self, text):
-        """Estimate case difficulty based on content"""
-        # Simple heuristic: more questions + calculations = harder
-        num_questions = len(re.findall(r'(?:Question|Q)\s*\d+', text, re.IGNORECASE))
-        has_calculations = bool(re.search(r'calculate|compute|×|÷', text, re.IGNORECASE))
-        num_exhibits = len(re.findall(r'EXHIBIT\s+\d+', text, re.IGNORECASE))
-
-        score = 0
-        if num_questions >= 5: score += 2
-        elif num_questions >= 3: score += 1
-
-        if has_calculations: score += 1
-        if num_exhibits >= 2: score += 1
-
-        if score >= 4:
-            return "hard"
-        elif score >= 2:
-            return "medium"
-        else:
-            return "easy"
+    return sorted(merged, key=lambda r: (r.y0, r.x0))
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        # No procfs (macOS): fall back to the peak, which is an upper bound
+        return peak_rss_mb()
 
 
-def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/casebooks_complete.json"):
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/casebooks_complete.json",
+                          low_memory=False, max_rss_mb=None, page_store_path="data/page_store.sqlite",
+                          crop_exhibits=True, page_workers=1, classify=True, resume=False,
+                          shards_dir="data/extraction_shards",
+                          journal_path="data/extraction_journal.jsonl",
+                          isolate=True, timeout=PDF_TIMEOUT, memory_limit_mb=None,
+                          quarantine_path="data/quarantine.json", retry_quarantined=False,
+                          pdf_workers=1, cost_model_path=CALIBRATION_PATH, profile=None):
     """
     Process all PDFs in casebooks directory
 
+    Every finished PDF is checkpointed (shard + journal entry) as soon as it
+    completes, so a killed run loses at most the PDFs in progress. PDFs
+    that fail (including timeouts and memory blow-ups in isolated mode) are
+    quarantined and skipped by later runs until they change.
+
+    Before extracting, every PDF is pre-scanned and its extraction time
+    estimated (see extractionCost.py). With several PDF workers the largest
+    PDFs start first, so a big casebook does not run alone at the end; the
+    estimates also drive the throughput/ETA lines printed as PDFs finish.
+
     Args:
         casebooks_dir: Directory containing PDF files
         output_file: Output JSON file path
+        low_memory: Use the memory-bounded extraction mode
+        max_rss_mb: Optional RSS ceiling (MB), implies low_memory
+        page_store_path: SQLite page store to read from and update
+            (None disables it and re-extracts every page)
+        crop_exhibits: Screenshot only the exhibit regions of a page
+        page_workers: Worker processes used for the pages of each PDF
+        classify: Skip the expensive stages on pages without case content
+        resume: Continue the previous run: PDFs it completed (and that did
+            not change since) are loaded from their shards
+        shards_dir: Per-PDF extraction results
+        journal_path: Run journal
+        isolate: Extract each PDF in its own worker process
+        timeout: Wall-clock limit per PDF in seconds (isolated mode)
+        memory_limit_mb: RSS limit per PDF in MB (isolated mode, Linux)
+        quarantine_path: Record of PDFs that failed
+        retry_quarantined: Try quarantined PDFs again
+        pdf_workers: PDFs extracted at the same time (isolated mode only)
+        cost_model_path: Calibration samples of the cost model
+        profile: Extraction profile name or resolve_profile() settings;
+            PDFs finished with a cheaper profile are extracted again, which
+            with the page store only runs the stages they are missing
 
     Returns:
         Complete extraction data
     """
     casebooks_path = Path(casebooks_dir)
-    pdf_files = list(casebooks_path.glob("*.pdf"))
+    pdf_files = sorted(casebooks_path.glob("*.pdf"))
 
     if not pdf_files:
         print("\n⚠️  No PDF files found in", casebooks_dir)
@@ -564,21 +1294,232 @@ def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/case
     print(f"\n{'='*60}")
     print(f"COMPLETE PDF EXTRACTION SYSTEM")
     print(f"{'='*60}")
-    print(f"\n📚 Found {len(pdf_files)} PDF file(s) to process\n")
-
-    extractor = CompleteCaseExtractor()
-    all_results = []
+    profile = resolve_profile(profile)
+    print(f"\n📚 Found {len(pdf_files)} PDF file(s) to process")
+    print(f"🎛️  Profile {describe_profile(profile)}\n")
+
+    extractor_options = {
+        "low_memory": low_memory,
+        "max_rss_mb": max_rss_mb,
+        "crop_exhibits": crop_exhibits,
+        "page_workers": page_workers,
+        "classify": classify,
+        "profile": profile
+    }
+    page_store = None
+    extractor = None
+    shards = ShardStore(shards_dir)
+    journal = RunJournal(journal_path)
+    quarantine = Quarantine(quarantine_path)
+    completed = {}
+
+    if resume:
+        completed = journal.completed()
+        interrupted = journal.interrupted()
+        print(f"⏯️  Resuming: {len(completed)} PDF(s) already done"
+              + (f", redoing {', '.join(interrupted)}" if interrupted else ""))
+    else:
+        journal.begin(casebooks_dir=str(casebooks_dir), pdfs=[p.name for p in pdf_files])
+
+    results = {}
+    jobs = []
 
     for pdf_file in pdf_files:
+        signature = file_signature(pdf_file)
+
+        if completed.get(pdf_file.name) == signature and shards.is_current(pdf_file.name, signature, profile):
+            print(f"⏭️  {pdf_file.name} (done in previous run)")
+            results[pdf_file.name] = shards.get(pdf_file.name)["result"]
+            continue
+
+        reason = quarantine.reason(pdf_file.name, signature)
+        if reason is not None and not retry_quarantined:
+            print(f"🚫 {pdf_file.name} (quarantined: {reason})")
+            continue
+
+        jobs.append((pdf_file, signature))
+
+    if pdf_workers > 1 and not isolate:
+        print("⚠️  Warning: --pdf-workers needs isolated extraction; using one worker")
+        pdf_workers = 1
+    pdf_workers = max(1, min(pdf_workers, len(jobs) or 1))
+
+    meter = None
+    if jobs:
+        print("📏 Estimating extraction cost...")
+        model = CostModel.load(cost_model_path)
+        # Quarantined PDFs were left out above; an unreadable one gets a
+        # size-only estimate and fails (and is quarantined) in its worker
+        features = {pdf_file.name: scan_pdf(pdf_file) for pdf_file, _ in jobs}
+        for name, values in features.items():
+            if "error" in values:
+                print(f"  ⚠️  Warning: Could not pre-scan {name} ({values['error']}); estimating from its size")
+        estimates = {name: model.estimate(values) for name, values in features.items()}
+        meter = ProgressMeter(estimates, {name: values["pages"] for name, values in features.items()},
+                              pdf_workers)
+        if pdf_workers > 1:
+            jobs.sort(key=lambda job: -estimates[job[0].name])
+        print(f"   {len(jobs)} PDF(s), {sum(meter.pages.values())} pages, "
+              f"about {format_duration(meter.eta())} "
+              f"on {pdf_workers} worker(s) [{model.describe()}]\n")
+
+    def finish(pdf_file, signature, result=None, error=None):
+        if error is not None:
+            print(f"\n❌ Error processing {pdf_file.name}: {error}\n")
+            if not isinstance(error, ExtractionFailed):
+                import traceback
+                traceback.print_exception(error)
+            journal.failed(pdf_file.name, signature, str(error))
+            quarantine.add(pdf_file.name, signature, str(error))
+            print(meter.finish(pdf_file.name))
+            return
+
+        quarantine.release(pdf_file.name)
+        images, screenshots = _result_assets(result)
+        journal.done(pdf_file.name, signature, shards.shards_dir / f"{pdf_file.name}.json",
+                     images, screenshots)
+        results[pdf_file.name] = result
+        print(meter.finish(pdf_file.name, result))
+
+    if pdf_workers == 1:
+        for pdf_file, signature in jobs:
+            journal.start(pdf_file.name)
+            meter.start(pdf_file.name)
+            try:
+                if isolate:
+                    extract_isolated(pdf_file, signature, shards.shards_dir, page_store_path,
+                                     extractor_options, timeout=timeout, memory_limit_mb=memory_limit_mb)
+                    result = shards.get(pdf_file.name)["result"]
+                else:
+                    if extractor is None:
+                        page_store = PageStore(page_store_path) if page_store_path else None
+                        extractor = CompleteCaseExtractor(page_store=page_store, **extractor_options)
+                    result = extractor.extract_complete_pdf(pdf_file)
+                    shards.put(pdf_file.name, signature, result)
+            except Exception as e:
+                finish(pdf_file, signature, error=e)
+                continue
+            finish(pdf_file, signature, result)
+    else:
+        _extract_concurrently(jobs, pdf_workers, shards, journal, meter, finish, page_store_path,
+                              extractor_options, timeout, memory_limit_mb)
+
+    # Same order as a sequential run, whatever order the PDFs finished in
+    all_results = [results[p.name] for p in pdf_files if p.name in results]
+
+    if page_store_path:
+        # Forget casebooks that were removed from the directory
+        with page_store or PageStore(page_store_path) as store:
+            store.prune(p.name for p in pdf_files)
+
+    output = _compile_output(all_results, len(pdf_files))
+    _save_output(output, output_file)
+
+    return output
+
+
+def _extract_concurrently(jobs, workers, shards, journal, meter, finish, page_store_path,
+                          extractor_options, timeout, memory_limit_mb):
+    """
+    Extract PDFs in isolated workers, several at a time
+
+    Jobs are submitted in order (largest first) as workers free up; each
+    worker's own progress output is discarded and a throughput/ETA line
+    is printed instead, on every completion and every PROGRESS_INTERVAL
+    seconds. Ctrl-C kills the running workers.
+
+    Args:
+        jobs: (pdf_file, signature) pairs in scheduling order
+        workers: PDFs extracted at the same time
+        finish: Callback(pdf_file, signature, result=None, error=None)
+    """
+    cancel = threading.Event()
+    pending = list(reversed(jobs))
+    running = {}
+
+    def extract(pdf_file, signature):
+        extract_isolated(pdf_file, signature, shards.shards_dir, page_store_path, extractor_options,
+                         timeout=timeout, memory_limit_mb=memory_limit_mb, quiet=True, cancel=cancel)
+        return shards.get(pdf_file.name)["result"]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
         try:
-            result = extractor.extract_complete_pdf(pdf_file)
+            while pending or running:
+                while pending and len(running) < workers:
+                    pdf_file, signature = pending.pop()
+                    journal.start(pdf_file.name)
+                    meter.start(pdf_file.name)
+                    print(f"▶️  {pdf_file.name}")
+                    running[pool.submit(extract, pdf_file, signature)] = (pdf_file, signature)
+
+                done, _ = wait(running, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                if not done:
+                    print(meter.status())
+                for future in done:
+                    pdf_file, signature = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        finish(pdf_file, signature, error=e)
+                    else:
+                        finish(pdf_file, signature, result)
+        except BaseException:
+            cancel.set()
+            raise
+
+
+def reparse_all_casebooks(page_store_path="data/page_store.sqlite",
+                          output_file="data/casebooks_complete.json"):
+    """
+    Re-run case parsing over every document in the page store
+
+    No PDF is opened: use this after changing the parsing heuristics.
+
+    Args:
+        page_store_path: SQLite page store written by process_all_casebooks
+        output_file: Output JSON file path
+
+    Returns:
+        Complete extraction data
+    """
+    if not Path(page_store_path).exists():
+        print(f"\n⚠️  No page store found at {page_store_path}")
+        print("   Run a full extraction first.\n")
+        return None
+
+    print(f"\n{'='*60}")
+    print(f"RE-PARSING FROM PAGE STORE")
+    print(f"{'='*60}")
+
+    with PageStore(page_store_path) as page_store:
+        extractor = CompleteCaseExtractor(page_store=page_store)
+        sources = page_store.sources()
+        all_results = []
+
+        for source in sources:
+            print(f"\n📖 {source}")
+            result = extractor.reparse_pdf(source)
+            if result is None:
+                print(f"  ⚠️  Incomplete in page store, skipped (re-run extraction)")
+                continue
             all_results.append(result)
-        except Exception as e:
-            print(f"\n❌ Error processing {pdf_file.name}: {e}\n")
-            import traceback
-            traceback.print_exc()
 
-    # Compile complete output
+    output = _compile_output(all_results, len(sources))
+    _save_output(output, output_file)
+
+    return output
+
+
+def _result_assets(result):
+    """Images and screenshots of a per-PDF result (every case links all of them)"""
+    if not result["cases"]:
+        return [], []
+    visual_assets = result["cases"][0]["visual_assets"]
+    return visual_assets["images"], visual_assets["screenshots"]
+
+
+def _compile_output(all_results, total_pdfs):
+    """Merge per-PDF results into the complete output structure"""
     total_cases = sum(len(r["cases"]) for r in all_results)
     total_images = sum(r["extraction_metadata"]["total_images"] for r in all_results)
     total_screenshots = sum(r["extraction_metadata"]["total_screenshots"] for r in all_results)
@@ -586,7 +1527,7 @@ def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/case
     output = {
         "metadata": {
             "extraction_date": datetime.now().isoformat(),
-            "total_pdfs": len(pdf_files),
+            "total_pdfs": total_pdfs,
             "total_cases": total_cases,
             "total_images": total_images,
             "total_screenshots": total_screenshots,
@@ -598,6 +1539,7 @@ def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/case
             ]
         },
         "sources": [r["source"] for r in all_results],
+        "page_labels": {r["source"]: r.get("page_labels", []) for r in all_results},
         "cases": []
     }
 
@@ -605,46 +1547,105 @@ def process_all_casebooks(casebooks_dir="data/casebooks", output_file="data/case
     for result in all_results:
         output["cases"].extend(result["cases"])
 
-    # Save to JSON
+    return output
+
+
+def _save_output(output, output_file):
+    """Write the complete output JSON and print a summary"""
     output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(output_path, output)
 
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
+    metadata = output["metadata"]
 
     # Print summary
     print(f"\n{'='*60}")
     print(f"EXTRACTION COMPLETE")
     print(f"{'='*60}")
-    print(f"\n✓ Processed {len(pdf_files)} PDF(s)")
-    print(f"✓ Extracted {total_cases} case(s)")
-    print(f"✓ Extracted {total_images} image(s)")
-    print(f"✓ Created {total_screenshots} screenshot(s)")
+    print(f"\n✓ Processed {metadata['total_pdfs']} PDF(s)")
+    print(f"✓ Extracted {metadata['total_cases']} case(s)")
+    print(f"✓ Extracted {metadata['total_images']} image(s)")
+    print(f"✓ Created {metadata['total_screenshots']} screenshot(s)")
     print(f"\n💾 Saved to: {output_path}")
     print(f"📁 Visual assets in: data/exhibits/\n")
 
-    return output
+
+def run_extraction(args, reparse=False):
+    """
+    Run extraction (or re-parsing) from parsed command-line options
+
+    Returns:
+        Complete extraction data, or None
+    """
+    profiler = None
+    with contextlib.ExitStack() as stack:
+        if args.profile_regex:
+            from regexProfiler import RegexProfiler
+            profiler = RegexProfiler()
+            stack.enter_context(profiler.attach(sys.modules[__name__]))
+            import caseFeatures
+            stack.enter_context(profiler.attach_rules(caseFeatures))
+
+        if reparse or getattr(args, "reparse", False):
+            result = reparse_all_casebooks(args.page_store, args.output)
+        else:
+            profile = profile_from_args(args)
+            isolate, pdf_workers = not args.no_isolation, args.pdf_workers
+            if profiler and isolate:
+                # The profiler patches this process only: parse here
+                print("⚠️  Warning: --profile-regex only sees this process; extracting without isolation")
+                isolate, pdf_workers = False, 1
+            # Run complete extraction
+            result = process_all_casebooks(
+                args.casebooks_dir,
+                args.output,
+                low_memory=args.low_memory,
+                max_rss_mb=args.max_rss_mb,
+                page_store_path=None if args.no_page_store else args.page_store,
+                crop_exhibits=not args.full_page_screenshots,
+                page_workers=args.page_workers,
+                classify=not args.no_page_classifier,
+                resume=args.resume,
+                isolate=isolate,
+                timeout=args.pdf_timeout,
+                memory_limit_mb=args.pdf_memory_limit_mb,
+                retry_quarantined=args.retry_quarantined,
+                pdf_workers=pdf_workers,
+                profile=profile
+            )
+
+    if profiler:
+        profiler.print_report()
+
+    return result
+
+
+def print_statistics(result):
+    """Print case type and visual asset statistics of an extraction result"""
+    print("\n" + "="*60)
+    print("STATISTICS")
+    print("="*60)
+
+    # Count by case type
+    case_types = {}
+    for case in result["cases"]:
+        ct = case["metadata"].get("case_type", "unknown")
+        case_types[ct] = case_types.get(ct, 0) + 1
+
+    print("\nCase Types:")
+    for ct, count in sorted(case_types.items(), key=lambda x: -x[1]):
+        print(f"  {ct}: {count}")
+
+    # Count cases with visual assets
+    cases_with_visuals = sum(1 for c in result["cases"] if c["stats"]["has_visual_assets"])
+    print(f"\nCases with visual assets: {cases_with_visuals}/{len(result['cases'])}")
 
 
 if __name__ == "__main__":
-    # Run complete extraction
-    result = process_all_casebooks()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Complete PDF case extraction")
+    add_extraction_arguments(parser)
+    result = run_extraction(parser.parse_args())
 
     if result:
-        print("\n" + "="*60)
-        print("STATISTICS")
-        print("="*60)
-
-        # Count by case type
-        case_types = {}
-        for case in result["cases"]:
-            ct = case["metadata"].get("case_type", "unknown")
-            case_types[ct] = case_types.get(ct, 0) + 1
-
-        print("\nCase Types:")
-        for ct, count in sorted(case_types.items(), key=lambda x: -x[1]):
-            print(f"  {ct}: {count}")
-
-        # Count cases with visual assets
-        cases_with_visuals = sum(1 for c in result["cases"] if c["stats"]["has_visual_assets"])
-        print(f"\nCases with visual assets: {cases_with_visuals}/{len(result['cases'])}")
+        print_statistics(result)
@@ -10,6 +10,8 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+from textNormalizer import normalize_text
+
 def extract_text_from_pdf(pdf_path):
     """Extract text from PDF using PyPDF2"""
     text = ""
@@ -17,7 +19,7 @@ def extract_text_from_pdf(pdf_path):
         with open(pdf_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
-                text += page.extract_text() + "\n\n"
+                text += normalize_text(page.extract_text()).text + "\n\n"
     except Exception as e:
         print(f"  ✗ Error reading {pdf_path.name}: {e}")
     return text
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Extraction Cost Model
+Quick pre-scan of a PDF (pages, embedded images, table-candidate pages,
+file size), a linear estimate of its extraction time calibrated from the
+per-PDF timings recorded by benchExtraction.py, and a throughput/ETA meter
+for batch runs
+"""
+
+import time
+from pathlib import Path
+
+from fileUtils import write_json_atomic
+from recordCodec import load
+
+COST_FEATURES = ("pages", "images", "table_pages", "file_mb")
+
+# Seconds per feature unit plus a per-document base, fitted on the 34 PDFs
+# of data/cases (standard mode, one process); replaced by a fit of the
+# recorded samples once there are enough of them
+DEFAULT_COEFFICIENTS = {
+    "pages": 0.163,
+    "images": 0.0016,
+    "table_pages": 0.129,
+    "file_mb": 1.59,
+    "base": 0.133
+}
+
+CALIBRATION_PATH = "data/extraction_costs.json"
+MIN_SAMPLES = 8
+MAX_SAMPLES = 500
+
+# A page drawing this many more vector paths than the document's typical
+# page (its template) is likely a table or chart
+TABLE_MIN_PATHS = 20
+
+# Stages reported in pages/second (see CompleteCaseExtractor.stage_seconds)
+RATE_STAGES = ("text", "images", "screenshots")
+
+
+def scan_pdf(pdf_path):
+    """
+    Cost features of a PDF, without extracting anything
+
+    Reads the page tree, image lists and content streams only (about 1 ms
+    per page). Table candidates are pages whose content stream strokes or
+    fills many more paths than the median page: ruled tables and charts are
+    what make pdfplumber and the screenshots slow, while slide templates
+    draw the same frame on every page.
+
+    A PDF that cannot be opened or read is not an error here: it gets the
+    size-only features (no pages, images or tables), and its extraction
+    fails and quarantines it as usual.
+
+    Returns:
+        Dictionary with pages, images, table_pages and file_mb, plus
+        "error" when the PDF could not be scanned
+    """
+    import fitz  # PyMuPDF
+
+    features = size_only_features(pdf_path)
+
+    paths = []
+    try:
+        with fitz.open(pdf_path) as doc:
+            features["pages"] = len(doc)
+            for page in doc:
+                features["images"] += len(page.get_images(full=True))
+                paths.append(_path_operators(page.read_contents()))
+    except Exception as e:
+        return {**size_only_features(pdf_path), "error": str(e) or type(e).__name__}
+
+    if paths:
+        threshold = sorted(paths)[len(paths) // 2] + TABLE_MIN_PATHS
+        features["table_pages"] = sum(1 for count in paths if count >= threshold)
+
+    return features
+
+
+def size_only_features(pdf_path):
+    """Cost features of a PDF from its file size alone"""
+    try:
+        size = Path(pdf_path).stat().st_size
+    except OSError:
+        size = 0
+    return {"pages": 0, "images": 0, "table_pages": 0, "file_mb": size / (1024 * 1024)}
+
+
+def _path_operators(contents):
+    """Number of stroke/fill operators in a page content stream"""
+    count = 0
+    for line in contents.splitlines():
+        token = line.rsplit(None, 1)[-1] if line.strip() else b""
+        if token in (b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*"):
+            count += 1
+    return count
+
+
+class CostModel:
+    """Linear estimate of a PDF's extraction time from its cost features"""
+
+    def __init__(self, coefficients=None, samples=0):
+        """
+        Args:
+            coefficients: Seconds per unit of each COST_FEATURES entry, plus
+                "base" per document (default: DEFAULT_COEFFICIENTS)
+            samples: Number of samples the coefficients were fitted on
+        """
+        self.coefficients = dict(coefficients or DEFAULT_COEFFICIENTS)
+        self.samples = samples
+
+    @classmethod
+    def load(cls, path=CALIBRATION_PATH):
+        """The model fitted on the recorded samples, or the defaults"""
+        samples = load_samples(path)
+        if len(samples) < MIN_SAMPLES:
+            return cls()
+        return cls(fit(samples), len(samples))
+
+    def estimate(self, features):
+        """Estimated seconds to extract a PDF with these features"""
+        return self.coefficients["base"] + sum(
+            self.coefficients[name] * features[name] for name in COST_FEATURES
+        )
+
+    def describe(self):
+        terms = " + ".join(f"{self.coefficients[name]:.3g}·{name}" for name in COST_FEATURES)
+        source = f"fitted on {self.samples} runs" if self.samples else "defaults"
+        return f"{self.coefficients['base']:.3g} + {terms} s ({source})"
+
+
+def fit(samples):
+    """
+    Least-squares coefficients from (features, seconds) samples
+
+    A feature whose coefficient comes out negative (collinear with another
+    one on a small corpus) is dropped and the fit repeated, so every
+    estimate stays positive.
+    """
+    import numpy as np
+
+    names = list(COST_FEATURES)
+    y = np.array([sample["seconds"] for sample in samples])
+
+    while True:
+        x = np.array([[sample["features"][name] for name in names] + [1.0] for sample in samples])
+        solution = np.linalg.lstsq(x, y, rcond=None)[0]
+        negative = [name for name, value in zip(names, solution) if value < 0]
+        if not negative:
+            break
+        names.remove(min(negative, key=lambda name: solution[names.index(name)]))
+
+    coefficients = {name: 0.0 for name in COST_FEATURES}
+    coefficients.update(zip(names, (float(value) for value in solution)))
+    coefficients["base"] = max(float(solution[-1]), 0.0)
+    return coefficients
+
+
+def load_samples(path=CALIBRATION_PATH):
+    try:
+        return load(path)["samples"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def record_samples(new_samples, path=CALIBRATION_PATH):
+    """
+    Append per-PDF benchmark timings and refit the model
+
+    Args:
+        new_samples: Dictionaries with pdf, features, seconds and stage_seconds
+
+    Returns:
+        The refitted CostModel
+    """
+    samples = (load_samples(path) + list(new_samples))[-MAX_SAMPLES:]
+    write_json_atomic(path, {"samples": samples}, indent=2)
+    return CostModel.load(path)
+
+
+class ProgressMeter:
+    """
+    Throughput and ETA of a batch extraction
+
+    The ETA scales the cost-model estimates of the remaining PDFs by how
+    fast the finished ones actually went, and spreads the work over the
+    workers (largest-first scheduling keeps that spread even).
+    """
+
+    def __init__(self, estimates, pages, workers=1):
+        """
+        Args:
+            estimates: PDF name -> estimated seconds
+            pages: PDF name -> page count
+            workers: PDFs extracted at the same time
+        """
+        self.estimates = estimates
+        self.pages = pages
+        self.workers = workers
+        self.started_at = time.monotonic()
+        self.running = {}
+        self.finished = {}
+        self.stage_seconds = {}
+        self.stage_pages = {}
+
+    def start(self, name):
+        self.running[name] = time.monotonic()
+
+    def finish(self, name, result=None):
+        """Record a finished (or failed) PDF and return the progress line"""
+        started = self.running.pop(name, self.started_at)
+        self.finished[name] = time.monotonic() - started
+
+        if result is not None:
+            pages = len(result.get("page_labels") or ()) or self.pages.get(name, 0)
+            for stage, seconds in result["extraction_metadata"].get("stage_seconds", {}).items():
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+                self.stage_pages[stage] = self.stage_pages.get(stage, 0) + pages
+
+        return f"{self.status()} (last: {name} in {format_duration(self.finished[name])})"
+
+    def speed(self):
+        """Measured time over estimated time of the finished PDFs"""
+        estimated = sum(self.estimates.get(name, 0.0) for name in self.finished)
+        if not estimated:
+            return 1.0
+        return sum(self.finished.values()) / estimated
+
+    def eta(self):
+        """Seconds until the batch is expected to finish"""
+        speed = self.speed()
+        now = time.monotonic()
+
+        running = [max(self.estimates.get(name, 0.0) * speed - (now - started), 0.0)
+                   for name, started in self.running.items()]
+        queued = [self.estimates[name] * speed for name in self.estimates
+                  if name not in self.finished and name not in self.running]
+
+        return max(max(running, default=0.0), (sum(running) + sum(queued)) / self.workers)
+
+    def status(self):
+        """One-line summary: PDFs and pages done, throughput, stage rates, ETA"""
+        elapsed = time.monotonic() - self.started_at
+        pages_done = sum(self.pages.get(name, 0) for name in self.finished)
+        rate = pages_done / elapsed if elapsed > 0 else 0.0
+
+        stages = [f"{stage} {self.stage_pages[stage] / seconds:.1f}"
+                  for stage in RATE_STAGES
+                  if (seconds := self.stage_seconds.get(stage))]
+        stage_text = f" [{', '.join(stages)} pages/s per worker]" if stages else ""
+
+        return (f"⏱️  {len(self.finished)}/{len(self.estimates)} PDFs, "
+                f"{pages_done}/{sum(self.pages.values())} pages, {rate:.1f} pages/s"
+                f"{stage_text}, ETA {format_duration(self.eta())}")
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
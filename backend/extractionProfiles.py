@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Extraction Profiles
+Named presets of the optional extraction stages (tables, embedded images,
+exhibit screenshots) and their parameters, and the checks that decide
+whether what an earlier, possibly cheaper, run produced still covers a
+new request
+"""
+
+import re
+
+# Text is always extracted: case parsing needs it
+STAGES = ("tables", "images", "screenshots")
+
+# pdfplumber table_settings of each table strategy
+TABLE_STRATEGIES = {
+    # Ruled tables (pdfplumber's defaults)
+    "lines": {},
+    # Tables laid out with whitespace only; slower, and noisier on slides
+    "text": {"vertical_strategy": "text", "horizontal_strategy": "text"},
+}
+
+EXTRACTION_PROFILES = {
+    # Refreshing case text and page labels. Tables come out of the same
+    # pdfplumber layout pass as the text for a few percent more, and keeping
+    # them means a later visual profile only adds images and screenshots
+    "text-only": {
+        "stages": ("tables",),
+        "screenshot_dpi": None,
+        "screenshots_on_demand": False,
+        "image_min_size": None,
+        "table_strategy": "lines",
+        "pages": None
+    },
+    # What extraction always did before profiles existed
+    "standard": {
+        "stages": STAGES,
+        "screenshot_dpi": 200,
+        "screenshots_on_demand": False,
+        "image_min_size": 0,
+        "table_strategy": "lines",
+        "pages": None
+    },
+    # Print-quality exhibits
+    "full-visual": {
+        "stages": STAGES,
+        "screenshot_dpi": 300,
+        "screenshots_on_demand": False,
+        "image_min_size": 0,
+        "table_strategy": "lines",
+        "pages": None
+    },
+}
+DEFAULT_PROFILE = "standard"
+
+PAGE_RANGE_PATTERN = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+def resolve_profile(profile=None, **overrides):
+    """
+    Settings of a profile, with individual parameters overridden
+
+    Args:
+        profile: Profile name, settings returned by an earlier call, or
+            None for DEFAULT_PROFILE
+        overrides: stages, screenshot_dpi, screenshots_on_demand,
+            image_min_size, table_strategy or pages ("1-20,35" or a list of
+            page numbers); None leaves the profile's value
+
+    Returns:
+        Dictionary with name and every setting; the parameters of a stage
+        that is off are None
+
+    Raises:
+        ValueError: Unknown profile, setting, stage or table strategy
+    """
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, str):
+        if profile not in EXTRACTION_PROFILES:
+            raise ValueError(f"Unknown extraction profile '{profile}' "
+                             f"(expected one of {', '.join(EXTRACTION_PROFILES)})")
+        settings = {"name": profile, **EXTRACTION_PROFILES[profile]}
+    else:
+        settings = dict(profile)
+        # Profiles recorded before screenshots could be deferred
+        settings.setdefault("screenshots_on_demand", False)
+
+    for key, value in overrides.items():
+        if key not in EXTRACTION_PROFILES[DEFAULT_PROFILE]:
+            raise ValueError(f"Unknown extraction setting '{key}'")
+        if value is not None:
+            settings[key] = value
+
+    # A parameter given for a stage the profile leaves out turns it on
+    stages = set(settings["stages"])
+    for stage, key in (("tables", "table_strategy"), ("images", "image_min_size"),
+                       ("screenshots", "screenshot_dpi")):
+        if overrides.get(key) is not None:
+            stages.add(stage)
+    if overrides.get("screenshots_on_demand"):
+        stages.add("screenshots")
+
+    unknown = stages - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown extraction stage(s) {', '.join(sorted(unknown))}")
+    settings["stages"] = [stage for stage in STAGES if stage in stages]
+
+    defaults = EXTRACTION_PROFILES[DEFAULT_PROFILE]
+    for stage, key in (("tables", "table_strategy"), ("images", "image_min_size"),
+                       ("screenshots", "screenshot_dpi")):
+        if stage not in stages:
+            settings[key] = None
+        elif settings[key] is None:
+            settings[key] = defaults[key]
+    settings["screenshots_on_demand"] = "screenshots" in stages and bool(settings["screenshots_on_demand"])
+
+    if settings["table_strategy"] is not None and settings["table_strategy"] not in TABLE_STRATEGIES:
+        raise ValueError(f"Unknown table strategy '{settings['table_strategy']}' "
+                         f"(expected one of {', '.join(TABLE_STRATEGIES)})")
+
+    if isinstance(settings["pages"], str):
+        settings["pages"] = parse_page_ranges(settings["pages"])
+
+    return settings
+
+
+def parse_page_ranges(spec):
+    """
+    Page numbers of a range list such as "1-20,35"
+
+    Returns:
+        Sorted list of 1-based page numbers
+    """
+    pages = set()
+    for part in spec.replace(" ", "").split(","):
+        match = PAGE_RANGE_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid page range '{part}' (expected e.g. 1-20,35)")
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range '{part}'")
+        pages.update(range(first, last + 1))
+    return sorted(pages)
+
+
+def select_pages(settings, page_count):
+    """1-based pages of a document the profile covers"""
+    if settings["pages"] is None:
+        return list(range(1, page_count + 1))
+    return [n for n in settings["pages"] if n <= page_count]
+
+
+# What an earlier run produced covers a request when it is at least as rich:
+# same table strategy, images down to the same size, screenshots at the same
+# or a higher resolution. A stage that is off is covered by anything.
+# Screenshots recorded on demand (render descriptors, no files) only cover
+# another on-demand request, whose descriptors they are.
+
+def tables_cover(done_strategy, settings):
+    return settings["table_strategy"] is None or done_strategy == settings["table_strategy"]
+
+
+def images_cover(done_min_size, settings):
+    wanted = settings["image_min_size"]
+    return wanted is None or (done_min_size is not None and done_min_size <= wanted)
+
+
+def screenshots_cover(done_dpi, settings, done_on_demand=False):
+    wanted = settings["screenshot_dpi"]
+    if wanted is None:
+        return True
+    if done_dpi is None or (done_on_demand and not settings["screenshots_on_demand"]):
+        return False
+    return done_dpi >= wanted
+
+
+def profile_covers(done, settings):
+    """
+    Whether a whole result extracted with `done` satisfies `settings`
+
+    Used for finished results (shards); pages inside the page store are
+    upgraded stage by stage instead.
+
+    Args:
+        done: Profile recorded in a result's extraction_metadata; None for
+            results written before profiles (the standard profile)
+        settings: Requested profile (resolve_profile result)
+    """
+    done = resolve_profile(done)
+
+    # A result holds the cases of its pages only: other pages mean other cases
+    if done["pages"] != settings["pages"]:
+        return False
+
+    return (tables_cover(done["table_strategy"], settings)
+            and images_cover(done["image_min_size"], settings)
+            and screenshots_cover(done["screenshot_dpi"], settings, done["screenshots_on_demand"]))
+
+
+def describe_profile(settings):
+    """One-line summary for progress output"""
+    parts = []
+    if settings["table_strategy"]:
+        parts.append(f"tables ({settings['table_strategy']})")
+    if settings["image_min_size"] is not None:
+        parts.append(f"images ≥{settings['image_min_size']}px" if settings["image_min_size"] else "images")
+    if settings["screenshots_on_demand"]:
+        parts.append(f"screenshots on demand ({settings['screenshot_dpi']} dpi)")
+    elif settings["screenshot_dpi"]:
+        parts.append(f"screenshots at {settings['screenshot_dpi']} dpi")
+    pages = "" if settings["pages"] is None else f", {len(settings['pages'])} selected pages"
+    return f"{settings['name']}: {', '.join(['text'] + parts)}{pages}"
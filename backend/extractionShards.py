@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Extraction Shards
+One JSON file per casebook holding its extraction result, so the combined
+output can be re-assembled after extracting only the PDFs that changed
+"""
+
+from pathlib import Path
+
+from extractionProfiles import profile_covers
+from fileUtils import write_json_atomic, remove_file
+from recordCodec import load
+
+
+class ShardStore:
+    """
+    Directory of per-PDF extraction results
+
+    Each shard records the source file's signature ([size, mtime_ns]) next to
+    the result of CompleteCaseExtractor.extract_complete_pdf, so a shard is
+    current exactly when the signature still matches the file on disk.
+    """
+
+    def __init__(self, shards_dir="data/extraction_shards"):
+        self.shards_dir = Path(shards_dir)
+        self.shards_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, source):
+        return self.shards_dir / f"{source}.json"
+
+    def get(self, source):
+        """
+        Load a shard
+
+        Returns:
+            {"source", "signature", "result"} or None if missing or unreadable
+        """
+        try:
+            return load(self._path(source))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, source, signature, result):
+        """Atomically write the shard of one PDF"""
+        write_json_atomic(
+            self._path(source),
+            {"source": source, "signature": signature, "result": result}
+        )
+
+    def remove(self, source):
+        remove_file(self._path(source))
+
+    def sources(self):
+        """Names of all PDFs with a shard, sorted"""
+        return sorted(p.name[:-len(".json")] for p in self.shards_dir.glob("*.pdf.json"))
+
+    def is_current(self, source, signature, profile=None):
+        """
+        True if the shard of source was extracted from a file with this
+        signature (and, given a profile, with one at least as rich)
+        """
+        shard = self.get(source)
+        if shard is None or shard["signature"] != signature:
+            return False
+        return profile is None or profile_covers(shard["result"]["extraction_metadata"].get("profile"), profile)
+
+    def results(self, sources=None):
+        """
+        Extraction results of the given sources (default: all), in that order
+
+        Sources without a readable shard are skipped.
+        """
+        results = []
+        for source in self.sources() if sources is None else sources:
+            shard = self.get(source)
+            if shard is not None:
+                results.append(shard["result"])
+        return results
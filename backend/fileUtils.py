@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+File Utilities
+Atomic JSON publishing and cheap change detection for pipeline outputs
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from recordCodec import dumps
+
+
+def write_json_atomic(path, data, indent=None):
+    """
+    Write JSON so readers only ever see the old or the new file
+
+    Output is compact unless an indent is given; paths ending in .msgpack
+    are written as MessagePack instead (see recordCodec).
+
+    Args:
+        path: Destination file
+        data: JSON-serialisable object (records are encoded via to_dict)
+        indent: None for compact output, e.g. 2 for human-readable files
+    """
+    write_bytes_atomic(path, dumps(data, path, indent=indent))
+
+
+def write_bytes_atomic(path, raw):
+    """
+    Write bytes so readers only ever see the old or the new file
+
+    The data is written to a temporary file in the same directory, flushed to
+    disk and then renamed over the target, which is atomic on POSIX and
+    Windows.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; published files are world-readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_file(tmp_path)
+        raise
+
+
+def remove_file(path):
+    """Remove a file, ignoring it if it is already gone"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def file_signature(path):
+    """
+    Size and modification time of a file
+
+    Returns:
+        [size, mtime_ns] (a list so it round-trips through JSON unchanged)
+    """
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Isolated PDF Extraction
+Runs the extraction of one PDF in a child process with a wall-clock timeout
+and a memory limit, so a pathological file cannot stall a batch
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+# How often the parent checks the worker's clock and memory
+POLL_INTERVAL = 0.2
+# Workers start from a single-threaded fork server where there is one
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# PDF libraries the fork server imports once, so workers do not each pay for
+# them (the server does not see backend/ on sys.path: project modules are
+# imported by the worker)
+PRELOAD_MODULES = ["fitz", "pdfplumber"]
+
+
+class ExtractionFailed(Exception):
+    """The isolated worker timed out, ran out of memory, crashed or raised"""
+
+
+def extract_isolated(pdf_file, signature, shards_dir, page_store_path=None, extractor_options=None,
+                     timeout=None, memory_limit_mb=None, quiet=False, cancel=None):
+    """
+    Extract one PDF in a child process and store the result as its shard
+
+    The worker gets its own process group, so page workers it starts are
+    killed together with it. The memory limit is checked against the RSS of
+    the whole group (Linux only; elsewhere only the timeout applies).
+
+    Args:
+        pdf_file: PDF to extract
+        signature: file_signature() of the PDF, stored with the shard
+        shards_dir: ShardStore directory the worker writes the result to
+        page_store_path: Page store the worker opens (None disables it)
+        extractor_options: CompleteCaseExtractor keyword arguments
+        timeout: Wall-clock limit in seconds (None for no limit)
+        memory_limit_mb: RSS limit in MB (None for no limit)
+        quiet: Discard the worker's progress output (several PDFs at once)
+        cancel: Optional threading.Event; when set, the worker is killed
+
+    Raises:
+        ExtractionFailed: With the reason, if the worker did not finish
+    """
+    # Never fork: callers run this from threads (several PDFs at once), and a
+    # forked child can inherit locks another thread held at fork time
+    context = multiprocessing.get_context(START_METHOD)
+    if START_METHOD == "forkserver":
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    receiver, sender = context.Pipe(duplex=False)
+    worker = context.Process(
+        target=_worker_main,
+        args=(sender, str(pdf_file), signature, str(shards_dir), page_store_path,
+              extractor_options or {}, quiet),
+        name=f"extract-{Path(pdf_file).name}"
+    )
+
+    worker.start()
+    sender.close()
+    deadline = time.monotonic() + timeout if timeout else None
+    reason = None
+
+    try:
+        while worker.is_alive():
+            worker.join(POLL_INTERVAL)
+
+            if deadline is not None and time.monotonic() > deadline and worker.is_alive():
+                reason = f"timed out after {timeout:g}s"
+                break
+
+            if cancel is not None and cancel.is_set():
+                reason = "cancelled"
+                break
+
+            if memory_limit_mb is not None:
+                rss = process_group_rss_mb(worker.pid)
+                if rss is not None and rss > memory_limit_mb:
+                    reason = f"exceeded memory limit ({rss:.0f} MB > {memory_limit_mb:g} MB)"
+                    break
+    finally:
+        if worker.is_alive():
+            _kill_group(worker)
+        worker.join()
+
+    if reason is None:
+        if receiver.poll():
+            reason = receiver.recv()
+        else:
+            reason = _exit_reason(worker.exitcode)
+    receiver.close()
+
+    if reason is not None:
+        raise ExtractionFailed(reason)
+
+
+def _worker_main(sender, pdf_file, signature, shards_dir, page_store_path, extractor_options, quiet=False):
+    """Child process: extract, write the shard, report None or the error"""
+    from extractPDFsComplete import CompleteCaseExtractor
+    from extractionShards import ShardStore
+    from pageStore import PageStore
+
+    if hasattr(os, "setpgid"):
+        # Own process group: the parent can kill page workers along with us
+        os.setpgid(0, 0)
+
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+
+    try:
+        page_store = PageStore(page_store_path) if page_store_path else None
+        extractor = CompleteCaseExtractor(page_store=page_store, **extractor_options)
+        result = extractor.extract_complete_pdf(pdf_file)
+        ShardStore(shards_dir).put(Path(pdf_file).name, signature, result)
+        if page_store is not None:
+            page_store.close()
+    except Exception as e:
+        sender.send(f"{type(e).__name__}: {e}")
+    else:
+        sender.send(None)
+    finally:
+        sender.close()
+
+
+def _kill_group(worker):
+    """Kill the worker and every process in its group"""
+    try:
+        os.killpg(worker.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # Not POSIX, or the group was not created yet
+        worker.kill()
+
+
+def _exit_reason(exitcode):
+    if exitcode is None or exitcode == 0:
+        return "worker exited without a result"
+    if exitcode < 0:
+        try:
+            return f"worker killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            return f"worker killed by signal {-exitcode}"
+    return f"worker crashed (exit code {exitcode})"
+
+
+def process_group_rss_mb(pgid):
+    """
+    Resident memory of all processes in a process group
+
+    Returns:
+        RSS in MB, or None where /proc is not available
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            # Fields after the parenthesised command name: state, ppid, pgrp, ...
+            fields = stat[stat.rindex(")") + 2:].split()
+            if int(fields[2]) != pgid:
+                continue
+            with open(entry / "statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            # Process exited while we were reading
+            continue
+
+    return total / (1024 * 1024)
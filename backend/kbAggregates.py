@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base Aggregates
+Per-casebook counts (case types, industries, structure flags, question
+counts, frameworks) that can be added to or subtracted from the knowledge
+base, so adding or removing one casebook does not rebuild it from all cases
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+
+from fileUtils import write_json_atomic
+from recordCodec import load
+
+AGGREGATE_VERSION = 1
+
+STRUCTURE_FLAGS = ("has_prompt", "has_clarifying", "has_framework", "has_questions",
+                   "has_exhibits", "has_conclusion")
+
+# Same split as buildKnowledgeBase.js extractFrameworks
+PRIMARY_FRAMEWORK_PATTERN = re.compile(r"MECE|Revenue|Cost|3Cs|4Ps")
+
+
+def case_aggregate(cases):
+    """
+    Count the knowledge-base statistics of one casebook's cases
+
+    Args:
+        cases: Case dictionaries as produced by extractPDFs.parse_case_section
+
+    Returns:
+        Nested dictionary whose leaves are counts:
+        {"cases", "case_types", "industries", "structure", "question_counts",
+        "frameworks": {case_type: {framework: count}}}
+    """
+    aggregate = {
+        "cases": 0,
+        "case_types": {},
+        "industries": {},
+        "structure": {},
+        "question_counts": {},
+        "frameworks": {}
+    }
+
+    for case in cases:
+        case_type = case.get("case_type") or "general"
+        industry = case.get("industry") or "General"
+        questions = case.get("questions") or []
+        frameworks = case.get("framework") or []
+
+        aggregate["cases"] += 1
+        _increment(aggregate["case_types"], case_type)
+        _increment(aggregate["industries"], industry)
+
+        flags = {
+            "has_prompt": bool(case.get("prompt")),
+            "has_clarifying": bool(case.get("clarifying_info")),
+            "has_framework": bool(frameworks),
+            "has_questions": bool(questions),
+            "has_exhibits": bool(case.get("exhibits")),
+            "has_conclusion": bool(case.get("conclusion"))
+        }
+        for flag in STRUCTURE_FLAGS:
+            if flags[flag]:
+                _increment(aggregate["structure"], flag)
+
+        # JSON object keys are strings
+        _increment(aggregate["question_counts"], str(len(questions)))
+
+        if frameworks:
+            by_type = aggregate["frameworks"].setdefault(case_type, {})
+            for framework in frameworks:
+                _increment(by_type, framework)
+
+    return aggregate
+
+
+def merge_counts(total, other, sign=1):
+    """
+    Add (sign=1) or subtract (sign=-1) a nested count dictionary in place
+
+    Counts that drop to zero, and dictionaries left empty, are removed so a
+    merge followed by the matching subtract restores the original.
+
+    Returns:
+        total
+    """
+    for key, value in other.items():
+        if isinstance(value, dict):
+            merged = merge_counts(total.get(key, {}), value, sign)
+            if merged:
+                total[key] = merged
+            else:
+                total.pop(key, None)
+        else:
+            count = total.get(key, 0) + sign * value
+            if count > 0:
+                total[key] = count
+            else:
+                total.pop(key, None)
+    return total
+
+
+def aggregate_file(aggregates_dir, source):
+    """Path of the aggregate file of a casebook (named after the PDF)"""
+    return Path(aggregates_dir) / f"{source}.json"
+
+
+def write_aggregate(aggregates_dir, source, signature, cases):
+    """Write the aggregate of one casebook's cases next to the others"""
+    path = aggregate_file(aggregates_dir, source)
+    write_json_atomic(path, {
+        "version": AGGREGATE_VERSION,
+        "source": source,
+        "signature": signature,
+        "aggregate": case_aggregate(cases)
+    })
+    return path
+
+
+def aggregate_signature(aggregates_dir, source):
+    """File signature the casebook had when its aggregate was written, or None"""
+    path = aggregate_file(aggregates_dir, source)
+    if not path.exists():
+        return None
+    data = load(path)
+    return data.get("signature") if data.get("version") == AGGREGATE_VERSION else None
+
+
+def update_knowledge_base(kb_path="../data/knowledge_base.json", aggregates_dir="../data/kb_aggregates"):
+    """
+    Bring the knowledge-base statistics in line with the aggregate files
+
+    The knowledge base keeps the aggregate it merged for every source. A
+    source whose file changed is subtracted and merged again, a new source
+    is merged, and a source without a file is subtracted. Nothing else is
+    read: a knowledge base without "aggregates" (e.g. freshly built by
+    buildKnowledgeBase.js) starts from zero and merges every file.
+
+    Returns:
+        Dictionary with the lists of added, updated and removed sources
+    """
+    kb_path = Path(kb_path)
+    kb = load(kb_path) if kb_path.exists() else _empty_knowledge_base()
+
+    state = kb.get("aggregates")
+    if not state or state.get("version") != AGGREGATE_VERSION:
+        state = {"version": AGGREGATE_VERSION, "total": {}, "sources": {}}
+
+    files = {}
+    for path in sorted(Path(aggregates_dir).glob("*.json")):
+        data = load(path)
+        if data.get("version") == AGGREGATE_VERSION:
+            files[data["source"]] = data
+
+    changes = {"added": [], "updated": [], "removed": []}
+
+    for source in sorted(state["sources"]):
+        if source not in files:
+            merge_counts(state["total"], state["sources"].pop(source)["aggregate"], sign=-1)
+            changes["removed"].append(source)
+
+    for source, data in files.items():
+        stored = state["sources"].get(source)
+        if stored is not None:
+            if stored["signature"] == data["signature"] and stored["aggregate"] == data["aggregate"]:
+                continue
+            merge_counts(state["total"], stored["aggregate"], sign=-1)
+        merge_counts(state["total"], data["aggregate"])
+        state["sources"][source] = {"signature": data["signature"], "aggregate": data["aggregate"]}
+        changes["updated" if stored is not None else "added"].append(source)
+
+    kb["aggregates"] = state
+    _apply_totals(kb, state)
+    write_json_atomic(kb_path, kb, indent=2)
+
+    print(f"🧠 Knowledge base: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+          f"{len(changes['removed'])} removed ({kb['total_cases_analyzed']} cases)")
+    return changes
+
+
+def _apply_totals(kb, state):
+    """Rewrite the knowledge-base fields that derive from the counts"""
+    total = state["total"]
+
+    kb["last_updated"] = datetime.now().isoformat()
+    kb["total_cases_analyzed"] = total.get("cases", 0)
+    kb["sources"] = sorted(state["sources"])
+    kb["case_structures"] = {
+        "flags": total.get("structure", {}),
+        "question_counts": total.get("question_counts", {})
+    }
+
+    # Frameworks by case type, most frequent first; examples from a full
+    # build are kept
+    approaches = {}
+    for case_type, counts in total.get("frameworks", {}).items():
+        ranked = sorted(counts, key=lambda framework: (-counts[framework], framework))
+        previous = kb.get("framework_approaches", {}).get(case_type, {})
+        approaches[case_type] = {
+            "primary": [fw for fw in ranked if PRIMARY_FRAMEWORK_PATTERN.search(fw)],
+            "advanced": [fw for fw in ranked if not PRIMARY_FRAMEWORK_PATTERN.search(fw)],
+            "examples": previous.get("examples", [])
+        }
+    kb["framework_approaches"] = approaches
+
+    contexts = {}
+    for industry, count in total.get("industries", {}).items():
+        context = kb.get("industry_contexts", {}).get(industry) or {"typical_problems": [], "example_prompts": []}
+        contexts[industry] = {**context, "case_count": count}
+    kb["industry_contexts"] = contexts
+
+
+def _empty_knowledge_base():
+    """Same skeleton as buildKnowledgeBase.js"""
+    return {
+        "version": "1.0",
+        "last_updated": None,
+        "total_cases_analyzed": 0,
+        "sources": [],
+        "case_structures": {},
+        "opening_patterns": {},
+        "framework_approaches": {},
+        "clarifying_questions_patterns": [],
+        "quantitative_patterns": {},
+        "industry_contexts": {},
+        "brainstorming_categories": {},
+        "conclusion_formats": [],
+        "interviewer_behaviors": {},
+        "firm_styles": {}
+    }
+
+
+def _increment(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the knowledge base from per-casebook aggregates")
+    parser.add_argument("--knowledge-base", default="../data/knowledge_base.json")
+    parser.add_argument("--aggregates-dir", default="../data/kb_aggregates")
+    args = parser.parse_args()
+
+    update_knowledge_base(args.knowledge_base, args.aggregates_dir)
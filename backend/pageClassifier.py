@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Page Classifier
+Cheap first pass over a PDF that labels pages without case content (covers,
+tables of contents, section dividers, sponsor pages, blanks) from character
+counts, text and image coverage and TOC patterns, so the expensive stages
+(table detection, image extraction, screenshots) can skip them
+"""
+
+import re
+
+PAGE_LABELS = ("content", "cover", "toc", "divider", "sponsor", "blank")
+CONTENT = "content"
+
+# Blank: at most a page number, and no picture
+BLANK_MAX_CHARS = 4
+BLANK_MAX_IMAGE_SHARE = 0.05
+
+# Cover: one of the first pages, little text, usually a large picture
+COVER_MAX_PAGE = 2
+COVER_MAX_CHARS = 400
+COVER_MIN_IMAGE_SHARE = 0.3
+
+# Divider: a few short title lines on an otherwise empty page
+DIVIDER_MAX_CHARS = 160
+DIVIDER_MAX_LINES = 6
+DIVIDER_MAX_LINE_CHARS = 60
+
+# Table of contents: a contents heading near the top and page numbers, or
+# (without heading) many lines ending in a page number
+TOC_HEADING_LINES = 6
+TOC_MIN_NUMBERS = 3
+TOC_MIN_LINES = 6
+TOC_MIN_LINE_SHARE = 0.3
+
+# Sponsor: a short "Sponsors" / "Partners" heading line
+SPONSOR_MAX_CHARS = 800
+SPONSOR_HEADING_CHARS = 40
+
+# Short pages drawn with vector graphics (charts) are content, not dividers
+MAX_DRAWINGS_WITHOUT_CONTENT = 25
+
+TOC_LINE_PATTERN = re.compile(r"^\S.{2,}?(?:\.{3,}|…+|\s{2,})\s*\d{1,3}$")
+TOC_HEADING_PATTERN = re.compile(r"(?:^|\s)(?:table of contents|contents|index|sommaire|table des mati[èe]res)$")
+PAGE_NUMBER_PATTERN = re.compile(r"^\d{1,3}$")
+SPONSOR_PATTERN = re.compile(r"\b(?:sponsors?|sponsored by|our partners|partenaires)\b")
+COVER_KEYWORDS = ("casebook", "case book", "case interview")
+# Words that make a short page an exhibit rather than a divider
+CONTENT_KEYWORDS = ("exhibit", "figure", "table", "chart", "annexe", "source:")
+
+
+def page_features(page):
+    """
+    Cheap measurements of a PyMuPDF page (no layout analysis)
+
+    Returns:
+        Dictionary with text, chars, lines, text_share and image_share
+    """
+    page_area = abs(page.rect) or 1.0
+    blocks = page.get_text("blocks")
+
+    text = "\n".join(block[4] for block in blocks if block[6] == 0)
+    text_area = sum(abs((block[2] - block[0]) * (block[3] - block[1])) for block in blocks if block[6] == 0)
+
+    image_area = 0.0
+    for info in page.get_image_info():
+        x0, y0, x1, y1 = info["bbox"]
+        # Clip to the page: images often bleed over the edges
+        x0, y0 = max(x0, page.rect.x0), max(y0, page.rect.y0)
+        x1, y1 = min(x1, page.rect.x1), min(y1, page.rect.y1)
+        if x1 > x0 and y1 > y0:
+            image_area += (x1 - x0) * (y1 - y0)
+
+    return {
+        "text": text,
+        "chars": sum(1 for ch in text if not ch.isspace()),
+        "lines": [line.strip() for line in text.splitlines() if line.strip()],
+        "text_share": min(text_area / page_area, 1.0),
+        "image_share": min(image_area / page_area, 1.0),
+    }
+
+
+def classify_features(features, page_num, drawings=None):
+    """
+    Label one page from its features
+
+    Args:
+        features: Result of page_features
+        page_num: 1-based page number
+        drawings: Callable returning the page's number of vector drawings;
+            only called for short pages, where it decides between a
+            chart and a divider
+
+    Returns:
+        One of PAGE_LABELS
+    """
+    chars = features["chars"]
+    lines = [line.lower() for line in features["lines"]]
+    lower = features["text"].lower()
+
+    if chars <= BLANK_MAX_CHARS and features["image_share"] < BLANK_MAX_IMAGE_SHARE and (
+            drawings is None or drawings() < MAX_DRAWINGS_WITHOUT_CONTENT):
+        return "blank"
+
+    if page_num <= COVER_MAX_PAGE and chars <= COVER_MAX_CHARS and (
+            features["image_share"] >= COVER_MIN_IMAGE_SHARE
+            or any(keyword in lower for keyword in COVER_KEYWORDS)
+            or page_num == 1):
+        return "cover"
+
+    if chars <= BLANK_MAX_CHARS:
+        # A picture without a text layer: possibly a scanned exhibit
+        return CONTENT
+
+    has_heading = any(TOC_HEADING_PATTERN.search(line) for line in lines[:TOC_HEADING_LINES])
+    numbers = sum(1 for line in lines if PAGE_NUMBER_PATTERN.match(line))
+    toc_lines = sum(1 for line in lines if TOC_LINE_PATTERN.match(line))
+    if has_heading and numbers + toc_lines >= TOC_MIN_NUMBERS or (
+            toc_lines >= TOC_MIN_LINES and toc_lines >= TOC_MIN_LINE_SHARE * len(lines)):
+        return "toc"
+
+    if chars <= SPONSOR_MAX_CHARS and any(
+            len(line) <= SPONSOR_HEADING_CHARS and SPONSOR_PATTERN.search(line) for line in lines):
+        return "sponsor"
+
+    if any(keyword in lower for keyword in CONTENT_KEYWORDS):
+        return CONTENT
+
+    if (chars <= DIVIDER_MAX_CHARS and len(lines) <= DIVIDER_MAX_LINES and page_num > 1
+            and all(len(line) <= DIVIDER_MAX_LINE_CHARS for line in lines)):
+        if drawings is None or drawings() < MAX_DRAWINGS_WITHOUT_CONTENT:
+            return "divider"
+
+    return CONTENT
+
+
+def classify_pages(pdf_path, page_numbers=None):
+    """
+    Label the pages of a PDF
+
+    Args:
+        pdf_path: Path to PDF file
+        page_numbers: Optional 1-based pages to classify (default: all)
+
+    Returns:
+        Dictionary of page number -> {"label", "text"}; the PyMuPDF text is
+        kept so pages routed around pdfplumber still have their text
+    """
+    import fitz  # PyMuPDF
+
+    labels = {}
+    with fitz.open(pdf_path) as doc:
+        numbers = range(1, len(doc) + 1) if page_numbers is None else page_numbers
+        for page_num in numbers:
+            page = doc[page_num - 1]
+            features = page_features(page)
+            label = classify_features(features, page_num, drawings=lambda: len(page.get_cdrawings()))
+            labels[page_num] = {"label": label, "text": features["text"]}
+
+    return labels
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Persistent Page Store
+Keeps the expensive per-page extraction results (text, tables, asset
+references) in a local SQLite file so case parsing can be re-run without
+touching the PDFs again
+"""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+# Bump when the per-page payload format changes; older stores are cleared
+STORE_VERSION = 5
+# Seconds a writer waits for another process's transaction
+LOCK_TIMEOUT = 60
+
+
+def page_content_hashes(pdf_path):
+    """
+    Hash every page of a PDF from its raw content stream
+
+    Cheap compared to layout analysis: no text is extracted, only the page
+    geometry, the content stream and the raw bytes of the images it draws.
+
+    Args:
+        pdf_path: Path to PDF file
+
+    Returns:
+        List of hex digests, one per page (page 1 first)
+    """
+    import fitz  # PyMuPDF
+
+    hashes = []
+
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            digest = hashlib.sha1()
+            digest.update(repr((tuple(page.rect), page.rotation)).encode())
+            digest.update(page.read_contents())
+            for img in page.get_images(full=True):
+                digest.update(doc.xref_stream_raw(img[0]) or b"")
+            hashes.append(digest.hexdigest())
+
+    return hashes
+
+
+class PageStore:
+    """
+    SQLite store of per-page extraction results
+
+    Pages are keyed by content hash, so identical pages are stored once
+    (even across casebooks) and a re-issued casebook only misses on the
+    pages that actually changed. Each document row records its ordered
+    page hashes plus the images and screenshots extracted for it.
+    """
+
+    def __init__(self, db_path="data/page_store.sqlite"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Several isolated workers may write at once: wait for their locks
+        self.conn = sqlite3.connect(self.db_path, timeout=LOCK_TIMEOUT)
+        self._init_schema()
+
+    def _init_schema(self):
+        """Create tables, clearing the store if it was written by another version"""
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+
+        if row is None or int(row[0]) != STORE_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS pages")
+            self.conn.execute("DROP TABLE IF EXISTS documents")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (str(STORE_VERSION),)
+            )
+
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " page_hash TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " source TEXT PRIMARY KEY,"
+            " page_hashes TEXT NOT NULL,"
+            " assets BLOB NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Pages
+
+    def get_pages(self, page_hashes):
+        """
+        Load cached pages
+
+        Returns:
+            Dictionary of page hash -> {"text", "tables", "label",
+            "table_strategy"} for the hashes found
+        """
+        pages = {}
+        unique = list(set(page_hashes))
+
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT page_hash, payload FROM pages WHERE page_hash IN ({placeholders})",
+                chunk
+            )
+            for page_hash, payload in rows:
+                pages[page_hash] = _unpack(payload)
+
+        return pages
+
+    def put_pages(self, pages_by_hash):
+        """
+        Store {"text", "tables", "label", "table_strategy"} payloads keyed by
+        page hash; table_strategy is None for pages parsed without tables
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO pages (page_hash, payload) VALUES (?, ?)",
+            [
+                (page_hash, _pack({"text": page["text"], "tables": page["tables"],
+                                   "label": page.get("label", "content"),
+                                   "table_strategy": page.get("table_strategy")}))
+                for page_hash, page in pages_by_hash.items()
+            ]
+        )
+        self.conn.commit()
+
+    # Documents
+
+    def get_document(self, source):
+        """
+        Load a document record
+
+        Returns:
+            {"source", "page_hashes", "labels", "images", "screenshots",
+            "asset_levels", "profile", "updated_at"} or None if the document
+            was never stored
+        """
+        row = self.conn.execute(
+            "SELECT page_hashes, assets, updated_at FROM documents WHERE source = ?",
+            (source,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        assets = _unpack(row[1])
+        return {
+            "source": source,
+            "page_hashes": json.loads(row[0]),
+            "labels": assets["labels"],
+            "images": assets["images"],
+            "screenshots": assets["screenshots"],
+            "asset_levels": assets["asset_levels"],
+            "profile": assets["profile"],
+            "updated_at": row[2]
+        }
+
+    def put_document(self, source, page_hashes, images, screenshots, labels=None, asset_levels=None,
+                     profile=None):
+        """
+        Record the ordered page hashes and visual assets of a document
+
+        Args:
+            labels: Page label per page; labels depend on the position
+                (covers are first pages), so identical pages elsewhere in
+                the document may differ from the label stored with the page
+            asset_levels: Page number (string) -> [image min-size, screenshot
+                dpi] the page's stored assets were extracted with (None for
+                a stage that did not run on it)
+            profile: Extraction profile of the run that wrote the record
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (source, page_hashes, assets, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                source,
+                json.dumps(page_hashes),
+                _pack({"images": images, "screenshots": screenshots, "labels": labels,
+                       "asset_levels": asset_levels or {}, "profile": profile}),
+                datetime.now().isoformat()
+            )
+        )
+        self.conn.commit()
+
+    def load_pages(self, source):
+        """
+        Rebuild the pages_data list of a stored document
+
+        Returns:
+            List of {"page_number", "text", "tables", "label", "table_strategy"}
+            in page order, or None
+            if the document or any of its pages is missing
+        """
+        document = self.get_document(source)
+        if document is None:
+            return None
+
+        cached = self.get_pages(document["page_hashes"])
+        if len(cached) < len(set(document["page_hashes"])):
+            return None
+
+        pages = [
+            {"page_number": page_num, **cached[page_hash]}
+            for page_num, page_hash in enumerate(document["page_hashes"], 1)
+        ]
+        for page, label in zip(pages, document["labels"] or ()):
+            if label is not None:
+                page["label"] = label
+        return pages
+
+    def sources(self):
+        """Names of all stored documents, sorted"""
+        return [row[0] for row in self.conn.execute("SELECT source FROM documents ORDER BY source")]
+
+    def prune(self, keep_sources):
+        """
+        Drop documents not in keep_sources and pages no document references
+
+        Returns:
+            Number of documents removed
+        """
+        keep = set(keep_sources)
+        removed = [s for s in self.sources() if s not in keep]
+
+        self.conn.executemany("DELETE FROM documents WHERE source = ?", [(s,) for s in removed])
+
+        referenced = set()
+        for (hashes,) in self.conn.execute("SELECT page_hashes FROM documents"):
+            referenced.update(json.loads(hashes))
+
+        orphans = [
+            (h,) for (h,) in self.conn.execute("SELECT page_hash FROM pages")
+            if h not in referenced
+        ]
+        self.conn.executemany("DELETE FROM pages WHERE page_hash = ?", orphans)
+        self.conn.commit()
+
+        return len(removed)
+
+
+def _pack(obj):
+    """Compact JSON, zlib-compressed"""
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Pipeline Arguments
+Command-line options shared by the pipeline CLI and the extraction, watch
+and benchmark scripts. Only the standard library and extractionProfiles are
+imported, so building the parser (e.g. for --help) loads no extraction code.
+"""
+
+import argparse
+
+from extractionProfiles import DEFAULT_PROFILE, EXTRACTION_PROFILES, TABLE_STRATEGIES, parse_page_ranges, \
+    resolve_profile
+
+# Default wall-clock limit for one PDF when extracting in isolated workers
+PDF_TIMEOUT = 900
+
+
+def add_extraction_arguments(parser, reparse_flag=True, batch_flags=True):
+    """
+    Register the extraction command-line options on an argparse parser
+
+    Args:
+        parser: Parser or subparser to add the options to
+        reparse_flag: Add --reparse
+        batch_flags: Add the options that only apply to one batch run
+            (--resume, --pdf-workers, --profile-regex)
+    """
+    parser.add_argument("--casebooks-dir", default="data/casebooks")
+    parser.add_argument("--output", default="data/casebooks_complete.json")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="release per-page caches as soon as each page is captured")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="RSS ceiling in MB for low-memory mode (implies --low-memory)")
+    parser.add_argument("--page-store", default="data/page_store.sqlite",
+                        help="page store used to skip unchanged pages")
+    parser.add_argument("--no-page-store", action="store_true",
+                        help="re-extract every page and do not update the page store")
+    if reparse_flag:
+        parser.add_argument("--reparse", action="store_true",
+                            help="only re-run case parsing from the page store (no PDF access)")
+    if batch_flags:
+        parser.add_argument("--resume", action="store_true",
+                            help="continue an interrupted run, skipping PDFs it already finished")
+    parser.add_argument("--pdf-timeout", type=float, default=PDF_TIMEOUT,
+                        help="seconds one PDF may take before it is killed and quarantined")
+    parser.add_argument("--pdf-memory-limit-mb", type=float, default=None,
+                        help="kill and quarantine a PDF whose worker exceeds this RSS")
+    parser.add_argument("--no-isolation", action="store_true",
+                        help="extract in this process (no timeout or memory limit)")
+    parser.add_argument("--retry-quarantined", action="store_true",
+                        help="try PDFs that failed in earlier runs again")
+    parser.add_argument("--full-page-screenshots", action="store_true",
+                        help="screenshot whole exhibit pages instead of the exhibit regions")
+    parser.add_argument("--screenshots-on-demand", action="store_true",
+                        help="record exhibit pages and regions only; render them when first requested")
+    parser.add_argument("--no-page-classifier", action="store_true",
+                        help="run every stage on every page (no cover/TOC/divider detection)")
+    parser.add_argument("--profile", choices=list(EXTRACTION_PROFILES), default=DEFAULT_PROFILE,
+                        help="extraction stages and settings (default: %(default)s)")
+    parser.add_argument("--screenshot-dpi", type=int, default=None,
+                        help="override the profile's screenshot resolution")
+    parser.add_argument("--image-min-size", type=int, default=None,
+                        help="skip embedded images narrower or shorter than this (pixels)")
+    parser.add_argument("--table-strategy", choices=list(TABLE_STRATEGIES), default=None,
+                        help="override the profile's table detection")
+    parser.add_argument("--pages", type=_page_ranges_argument, default=None,
+                        help="only extract these pages of each PDF (e.g. 1-20,35)")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="split each PDF's pages across this many worker processes")
+    if batch_flags:
+        parser.add_argument("--pdf-workers", type=int, default=1,
+                            help="extract this many PDFs at the same time, largest first")
+        parser.add_argument("--profile-regex", action="store_true",
+                            help="report time spent in each parsing regex (extracts without isolation)")
+
+
+def profile_from_args(args):
+    """Extraction profile of parsed command-line options"""
+    return resolve_profile(args.profile, screenshot_dpi=args.screenshot_dpi,
+                           screenshots_on_demand=args.screenshots_on_demand or None,
+                           image_min_size=args.image_min_size,
+                           table_strategy=args.table_strategy, pages=args.pages)
+
+
+def _page_ranges_argument(value):
+    try:
+        return parse_page_ranges(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_watch_arguments(parser):
+    """
+    Register the watch-mode command-line options on an argparse parser
+
+    The extraction options are the same as for a batch run, except those
+    that watch mode implies (it always resumes from the shards and extracts
+    one PDF at a time).
+    """
+    add_extraction_arguments(parser, reparse_flag=False, batch_flags=False)
+    parser.add_argument("--library-dir", default="data/library")
+    parser.add_argument("--shards-dir", default="data/extraction_shards",
+                        help="per-PDF extraction results")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between directory scans")
+    parser.add_argument("--debounce", type=float, default=5.0,
+                        help="seconds without changes before an update starts")
+    parser.add_argument("--once", action="store_true",
+                        help="sync once and exit instead of watching")
+
+
+def add_bench_arguments(parser):
+    """Register the benchmark command-line options on an argparse parser"""
+    parser.add_argument("pdfs", nargs="*", help="PDF files (default: all PDFs in --casebooks-dir)")
+    parser.add_argument("--casebooks-dir", default="data/casebooks")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="RSS ceiling passed to the low-memory mode")
+    parser.add_argument("--screenshots", action="store_true",
+                        help="compare full-page and cropped exhibit screenshots instead")
+    parser.add_argument("--codec", metavar="EXTRACTION_JSON", default=None,
+                        help="compare case serialisations on this extraction output instead")
+    parser.add_argument("--codec-cases", type=int, default=10000,
+                        help="number of cases the --codec corpus is scaled to")
+    parser.add_argument("--startup", action="store_true",
+                        help="measure CLI cold-start import time instead")
+    parser.add_argument("--no-calibrate", action="store_true",
+                        help="do not add the timings to the extraction cost model")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+PDF Quarantine
+Remembers casebooks that failed extraction so later runs skip them until
+the file changes
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from fileUtils import write_json_atomic
+
+
+class Quarantine:
+    """
+    JSON file of source -> {"signature", "reason", "quarantined_at"}
+
+    An entry only applies while the file keeps the recorded signature
+    ([size, mtime_ns]); replacing the PDF releases it automatically.
+    """
+
+    def __init__(self, path="data/quarantine.json"):
+        self.path = Path(path)
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def reason(self, source, signature):
+        """Why source is quarantined, or None if it is not (or has changed since)"""
+        entry = self.entries.get(source)
+        if entry is None or entry["signature"] != signature:
+            return None
+        return entry["reason"]
+
+    def add(self, source, signature, reason):
+        self.entries[source] = {
+            "signature": signature,
+            "reason": reason,
+            "quarantined_at": datetime.now().isoformat()
+        }
+        self._save()
+
+    def release(self, source):
+        if self.entries.pop(source, None) is not None:
+            self._save()
+
+    def _save(self):
+        write_json_atomic(self.path, self.entries, indent=2)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Record Codec
+Encodes pipeline outputs as compact JSON (with orjson when it is installed)
+or, for files ending in .msgpack, as MessagePack
+"""
+
+import json
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library
+    orjson = None
+
+BINARY_SUFFIXES = (".msgpack", ".mpk")
+
+
+def _default(obj):
+    """Serialise Record instances (and anything else with to_dict)"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def encode(data, indent=None):
+    """
+    Encode to UTF-8 JSON bytes
+
+    Args:
+        data: JSON-serialisable object; records are encoded via to_dict()
+        indent: None for compact output, otherwise pretty-printed (orjson
+            only supports an indent of 2, other values use the json module)
+    """
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, default=_default, option=option)
+
+    if indent is None:
+        return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, default=_default, indent=indent, ensure_ascii=False).encode("utf-8")
+
+
+def decode(raw):
+    """Decode JSON bytes or text"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def encode_binary(data):
+    """Encode to MessagePack bytes (requires the msgpack package)"""
+    return _msgpack().packb(data, default=_default, use_bin_type=True)
+
+
+def decode_binary(raw):
+    """Decode MessagePack bytes"""
+    return _msgpack().unpackb(raw, raw=False, strict_map_key=False)
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("Binary output needs msgpack: pip install msgpack") from None
+    return msgpack
+
+
+def is_binary_path(path):
+    return Path(path).suffix.lower() in BINARY_SUFFIXES
+
+
+def dumps(data, path=None, indent=None):
+    """Encode for a file: MessagePack for .msgpack/.mpk paths, JSON otherwise"""
+    if path is not None and is_binary_path(path):
+        return encode_binary(data)
+    return encode(data, indent=indent)
+
+
+def load(path):
+    """Read a JSON or MessagePack file (chosen by suffix)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return decode_binary(raw) if is_binary_path(path) else decode(raw)
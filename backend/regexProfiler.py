@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Regex Rule Profiler
+Attributes wall time, call count and input size to every individual regex
+pattern used by the parsing heuristics, and to every named classification
+rule of caseFeatures
+"""
+
+import math
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+# A rule is flagged when time grows faster than length^SUPERLINEAR_SLOPE
+SUPERLINEAR_SLOPE = 1.5
+
+
+class RuleStats:
+    """Accumulated cost of one (function, pattern) rule"""
+
+    __slots__ = ("function", "pattern", "calls", "seconds", "input_chars", "samples")
+
+    def __init__(self, function, pattern):
+        self.function = function
+        self.pattern = pattern
+        self.calls = 0
+        self.seconds = 0.0
+        self.input_chars = 0
+        # (input length, seconds) per call, for the growth estimate
+        self.samples = []
+
+    def add(self, length, seconds):
+        self.calls += 1
+        self.seconds += seconds
+        self.input_chars += length
+        self.samples.append((length, seconds))
+
+    def growth_exponent(self, min_length=1000):
+        """
+        Estimate k in time ~ length^k
+
+        Calls are bucketed by powers of two of the input length and the median
+        time per bucket is fitted on a log-log scale, which keeps one slow
+        outlier from dominating the slope.
+
+        Returns:
+            Fitted exponent, or None if the input lengths do not span enough
+            range (at least 3 buckets, 8x between shortest and longest)
+        """
+        buckets = {}
+        for length, seconds in self.samples:
+            if length >= min_length and seconds > 0:
+                buckets.setdefault(int(math.log2(length)), []).append((length, seconds))
+
+        if len(buckets) < 3 or max(buckets) - min(buckets) < 3:
+            return None
+
+        points = []
+        for values in buckets.values():
+            values.sort(key=lambda v: v[1])
+            length, seconds = values[len(values) // 2]
+            points.append((math.log(length), math.log(seconds)))
+
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        var_x = sum((x - mean_x) ** 2 for x, _ in points)
+        cov_xy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+
+        return cov_xy / var_x if var_x else None
+
+
+class _ProfilingRe:
+    """
+    Stand-in for the re module that times every call
+
+    Only the module-level matching functions are intercepted; everything else
+    (flags, compile, escape, ...) is forwarded to the real module.
+    """
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(re, name)
+
+    def _timed(self, func, pattern, string, *args, **kwargs):
+        caller = sys._getframe(2).f_code.co_name
+        start = time.perf_counter()
+        result = func(pattern, string, *args, **kwargs)
+        if func is re.finditer:
+            # Matching happens lazily while iterating; do it here so it is timed
+            result = iter(list(result))
+        self._profiler.record(caller, pattern, len(string), time.perf_counter() - start)
+        return result
+
+    def search(self, pattern, string, *args, **kwargs):
+        return self._timed(re.search, pattern, string, *args, **kwargs)
+
+    def match(self, pattern, string, *args, **kwargs):
+        return self._timed(re.match, pattern, string, *args, **kwargs)
+
+    def fullmatch(self, pattern, string, *args, **kwargs):
+        return self._timed(re.fullmatch, pattern, string, *args, **kwargs)
+
+    def findall(self, pattern, string, *args, **kwargs):
+        return self._timed(re.findall, pattern, string, *args, **kwargs)
+
+    def finditer(self, pattern, string, *args, **kwargs):
+        return self._timed(re.finditer, pattern, string, *args, **kwargs)
+
+    def split(self, pattern, string, *args, **kwargs):
+        return self._timed(re.split, pattern, string, *args, **kwargs)
+
+    def sub(self, pattern, repl, string, *args, **kwargs):
+        return self._timed(lambda p, s: re.sub(p, repl, s, *args, **kwargs), pattern, string)
+
+    def subn(self, pattern, repl, string, *args, **kwargs):
+        return self._timed(lambda p, s: re.subn(p, repl, s, *args, **kwargs), pattern, string)
+
+
+class RegexProfiler:
+    """
+    Opt-in profiler for the regex heuristics of a module
+
+    Usage:
+        profiler = RegexProfiler()
+        with profiler.attach(extractPDFsComplete), profiler.attach_rules(caseFeatures):
+            ...  # extraction or reparse
+        profiler.print_report()
+    """
+
+    def __init__(self):
+        self.rules = {}
+
+    def record(self, function, pattern, length, seconds):
+        key = (function, pattern.pattern if hasattr(pattern, "pattern") else pattern)
+        stats = self.rules.get(key)
+        if stats is None:
+            stats = self.rules[key] = RuleStats(*key)
+        stats.add(length, seconds)
+
+    @contextmanager
+    def attach(self, module):
+        """Route the module's `re` calls through the profiler while active"""
+        original = module.re
+        module.re = _ProfilingRe(self)
+        try:
+            yield self
+        finally:
+            module.re = original
+
+    @contextmanager
+    def attach_rules(self, module):
+        """
+        Have a module that times its own named rules (caseFeatures, whose
+        rules are precompiled patterns and substring tests that never go
+        through `re`) report them while active
+        """
+        original = module.profiler
+        module.profiler = self
+        try:
+            yield self
+        finally:
+            module.profiler = original
+
+    def report(self):
+        """
+        Ranked rule costs
+
+        Returns:
+            List of dictionaries sorted by total time (descending)
+        """
+        total = sum(r.seconds for r in self.rules.values()) or 1.0
+        rows = []
+
+        for stats in sorted(self.rules.values(), key=lambda r: -r.seconds):
+            exponent = stats.growth_exponent()
+            rows.append({
+                "function": stats.function,
+                "pattern": stats.pattern,
+                "calls": stats.calls,
+                "seconds": stats.seconds,
+                "share": stats.seconds / total,
+                "input_chars": stats.input_chars,
+                "us_per_kchar": 1e9 * stats.seconds / stats.input_chars if stats.input_chars else 0.0,
+                "growth_exponent": exponent,
+                "superlinear": exponent is not None and exponent > SUPERLINEAR_SLOPE
+            })
+
+        return rows
+
+    def print_report(self, top=25):
+        """Print the most expensive rules and any super-linear ones"""
+        rows = self.report()
+
+        print(f"\n{'='*60}")
+        print("REGEX RULE PROFILE")
+        print(f"{'='*60}\n")
+        print(f"{'time':>8} {'share':>6} {'calls':>7} {'Mchar':>7} {'µs/kc':>7} {'k':>5}  rule")
+
+        for row in rows[:top]:
+            exponent = f"{row['growth_exponent']:.2f}" if row["growth_exponent"] is not None else "-"
+            flag = " ⚠️" if row["superlinear"] else ""
+            pattern = row["pattern"] if len(row["pattern"]) <= 50 else row["pattern"][:47] + "..."
+            print(f"{row['seconds']:7.3f}s {row['share']:6.1%} {row['calls']:7d} "
+                  f"{row['input_chars'] / 1e6:7.2f} {row['us_per_kchar']:7.1f} {exponent:>5}  "
+                  f"{row['function']}: {pattern}{flag}")
+
+        flagged = [row for row in rows if row["superlinear"]]
+        if flagged:
+            print(f"\n⚠️  {len(flagged)} rule(s) grow super-linearly with input length "
+                  f"(k > {SUPERLINEAR_SLOPE}):")
+            for row in flagged:
+                print(f"  {row['function']}: {row['pattern']} (k={row['growth_exponent']:.2f})")
+
+        print()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Extraction Run Journal
+Append-only log of a batch extraction run, so an interrupted run can be
+resumed without redoing the PDFs it already finished
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+class RunJournal:
+    """
+    JSON-lines journal of per-PDF progress
+
+    Every event is one line, flushed and fsync'ed before the run moves on:
+
+        {"event": "run", ...}                         new run (journal reset)
+        {"event": "start", "source": ...}             PDF extraction began
+        {"event": "done", "source", "signature", "shard", "images", "screenshots"}
+        {"event": "failed", "source", "signature", "error"}
+
+    A PDF is complete when its last event is "done"; a trailing "start"
+    marks the file that was being processed when the run died. A torn last
+    line (crash mid-write) is ignored.
+    """
+
+    def __init__(self, journal_path="data/extraction_journal.jsonl"):
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def begin(self, **details):
+        """Start a new run, discarding the previous journal"""
+        with open(self.journal_path, "w") as f:
+            self._write(f, {"event": "run", **details})
+
+    def start(self, source):
+        self._append({"event": "start", "source": source})
+
+    def done(self, source, signature, shard, images, screenshots):
+        """Checkpoint a finished PDF with its shard and asset files"""
+        self._append({
+            "event": "done",
+            "source": source,
+            "signature": signature,
+            "shard": str(shard),
+            "images": [img["filepath"] for img in images],
+            # Screenshots recorded on demand have no file
+            "screenshots": [s["filepath"] for s in screenshots if "filepath" in s]
+        })
+
+    def failed(self, source, signature, error):
+        self._append({"event": "failed", "source": source, "signature": signature, "error": error})
+
+    def state(self):
+        """
+        Last event of every PDF in the current run
+
+        Returns:
+            Dictionary of source -> event dictionary (empty if no journal)
+        """
+        state = {}
+        if not self.journal_path.exists():
+            return state
+
+        with open(self.journal_path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if "source" in event:
+                    state[event["source"]] = event
+
+        return state
+
+    def completed(self):
+        """Dictionary of source -> signature of PDFs checkpointed as done"""
+        return {
+            source: event["signature"]
+            for source, event in self.state().items()
+            if event["event"] == "done"
+        }
+
+    def interrupted(self):
+        """Sources whose extraction started but never finished or failed"""
+        return sorted(source for source, event in self.state().items() if event["event"] == "start")
+
+    def _append(self, event):
+        with open(self.journal_path, "a") as f:
+            self._write(f, event)
+
+    def _write(self, f, event):
+        event["time"] = datetime.now().isoformat()
+        f.write(json.dumps(event) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
@@ -10,6 +10,7 @@ const path = require('path');
 const fs = require('fs');
 const CaseGenerator = require('./caseGenerator');
 const CaseLibrary = require('./caseLibrary');
+const CaseTextStore = require('./caseText');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
@@ -66,12 +67,13 @@ app.get('/api/case-types', (req, res) => {
  *   "case_type": "profitability",
  *   "difficulty": "medium",
  *   "industry": "Tech" (optional),
- *   "firm_style": "BCG" (optional)
+ *   "firm_style": "BCG" (optional),
+ *   "example_size": "compact" (optional, default "standard")
  * }
  */
 app.post('/api/generate', async (req, res) => {
   try {
-    const { case_type, difficulty, industry, firm_style } = req.body;
+    const { case_type, difficulty, industry, firm_style, example_size } = req.body;
 
     // Validate inputs
     if (!case_type) {
@@ -89,7 +91,8 @@ app.post('/api/generate', async (req, res) => {
       caseType: case_type,
       difficulty: difficulty,
       industry: industry,
-      firmStyle: firm_style
+      firmStyle: firm_style,
+      exampleSize: example_size
     });
 
     // Save case
@@ -168,9 +171,10 @@ app.get('/api/real-cases', (req, res) => {
       }
     }
 
-    // Add metadata about source type
+    // Add metadata about source type (and the text, sliced from the store)
+    const texts = new CaseTextStore(extractedData.texts);
     cases = cases.map(c => ({
-      ...c,
+      ...texts.withText(c),
       source_type: c.source && c.source.toUpperCase().includes('REX') ? 'REX' : 'Casebook',
       source_display: c.source || 'Unknown'
     }));
@@ -225,8 +229,9 @@ app.get('/api/real-cases/random', (req, res) => {
       return res.status(404).json({ error: 'No cases found matching filters' });
     }
 
-    // Pick random case
-    const randomCase = cases[Math.floor(Math.random() * cases.length)];
+    // Pick random case; only its text is decompressed
+    const texts = new CaseTextStore(extractedData.texts);
+    const randomCase = texts.withText(cases[Math.floor(Math.random() * cases.length)]);
 
     // Add metadata
     randomCase.source_type = randomCase.source && randomCase.source.toUpperCase().includes('REX') ? 'REX' : 'Casebook';
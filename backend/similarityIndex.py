@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Similarity Index
+BM25-weighted sparse term index over the text of library cases, to find the
+cases closest to a prompt, a generated case or another library case
+("more like this") without scanning every case
+
+The index keeps raw term counts in a case-major sparse matrix (CSR), which
+takes new cases by appending rows, and a term-major copy of it (the
+postings) that queries read. BM25 weights are computed from the postings a
+query touches, so adding cases never re-weights stored data.
+"""
+
+import io
+import re
+
+import numpy as np
+
+from fileUtils import write_bytes_atomic
+
+SIMILARITY_FILE = "similarity.npz"
+# Bump when the tokenizer or the stored arrays change
+SIMILARITY_VERSION = 1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A case used as the query is reduced to its most distinctive terms
+MAX_QUERY_TERMS = 64
+
+TERM_PATTERN = re.compile(r"[^\W\d_]{2,}")
+# Paths and file names of exhibits are not case text
+SKIPPED_KEYS = frozenset({"files", "filepath", "filename", "bbox"})
+STOPWORDS = frozenset("""
+a an and are as at be but by can could do does for from had has have how if in into is it its
+may more most no not of on or our should so than that the their them then there these they this
+to was we were what when which who why will with would you your
+au aux avec ce ces dans de des du elle en est et il ils la le les leur mais ne nous on ou par pas
+pour qu que qui sa se ses son sur un une vous
+""".split())
+
+
+def case_text(case):
+    """
+    Text of a case for indexing or as a query
+
+    Every string of the case content (prompt, clarifying information,
+    questions, exhibits, conclusion...) is used, so library cases and
+    generated cases (whose fields are at the top level) both work.
+    """
+    parts = []
+
+    def collect(value):
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if key not in SKIPPED_KEYS:
+                    collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(case.get("content", case))
+    return "\n".join(parts)
+
+
+def tokenize(text):
+    """Term counts of a text: lower-cased words of 2+ letters, stopwords dropped"""
+    counts = {}
+    for term in TERM_PATTERN.findall(text.lower()):
+        if term not in STOPWORDS:
+            counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+class SimilarityIndex:
+    """
+    Sparse BM25 index of library cases
+
+    Usage:
+        index = SimilarityIndex.load("data/library/similarity.npz")
+        index.similar(text="Our client is a regional airline...", limit=5)
+        index.similar(case_id="case_prof_medi_001", limit=5)
+    """
+
+    def __init__(self):
+        self.case_ids = []
+        self.vocabulary = []
+        self._term_ids = {}
+        self._rows = {}
+        # Case-major term counts (CSR)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.terms = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.uint16)
+        self._postings = None
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def __contains__(self, case_id):
+        return case_id in self._rows
+
+    # Building
+
+    def add(self, cases):
+        """
+        Append cases
+
+        Args:
+            cases: Iterable of (case_id, case dictionary or text); cases
+                already in the index are replaced
+        """
+        cases = list(cases)
+        self.remove([case_id for case_id, _ in cases if case_id in self._rows])
+
+        lengths, terms, counts = [], [], []
+        for case_id, case in cases:
+            text = case if isinstance(case, str) else case_text(case)
+            term_counts = tokenize(text)
+            ids = []
+            for term in term_counts:
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    term_id = self._term_ids[term] = len(self.vocabulary)
+                    self.vocabulary.append(term)
+                ids.append(term_id)
+
+            order = np.argsort(ids)
+            terms.append(np.asarray(ids, dtype=np.int32)[order])
+            counts.append(np.minimum(list(term_counts.values()), 65535).astype(np.uint16)[order]
+                          if term_counts else np.zeros(0, dtype=np.uint16))
+            lengths.append(len(ids))
+            self._rows[case_id] = len(self.case_ids)
+            self.case_ids.append(case_id)
+
+        if cases:
+            self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(lengths, dtype=np.int64)])
+            self.terms = np.concatenate([self.terms] + terms)
+            self.counts = np.concatenate([self.counts] + counts)
+            self._postings = None
+
+    def remove(self, case_ids):
+        """Drop cases (unknown IDs are ignored)"""
+        rows = [self._rows[case_id] for case_id in case_ids if case_id in self._rows]
+        if not rows:
+            return
+
+        keep = np.ones(len(self.case_ids), dtype=bool)
+        keep[rows] = False
+        lengths = np.diff(self.indptr)
+        entries = np.repeat(keep, lengths)
+
+        self.terms = self.terms[entries]
+        self.counts = self.counts[entries]
+        self.indptr = np.concatenate([[0], np.cumsum(lengths[keep], dtype=np.int64)])
+        self.case_ids = [case_id for case_id, kept in zip(self.case_ids, keep) if kept]
+        self._rows = {case_id: row for row, case_id in enumerate(self.case_ids)}
+        self._postings = None
+
+    def _term_major(self):
+        """
+        Postings: for every term, the rows containing it and its counts,
+        with document lengths and BM25 idf
+        """
+        if self._postings is None:
+            rows = np.repeat(np.arange(len(self.case_ids), dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.terms, kind="stable")
+            term_indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.terms, minlength=len(self.vocabulary)), out=term_indptr[1:])
+            doc_lengths = np.bincount(rows, weights=self.counts, minlength=len(self.case_ids))
+            self._postings = self._with_weights(term_indptr, rows[order], self.counts[order], doc_lengths)
+        return self._postings
+
+    def _with_weights(self, term_indptr, docs, tfs, doc_lengths):
+        cases = len(self.case_ids)
+        df = np.diff(term_indptr)
+        return {
+            "term_indptr": term_indptr,
+            "docs": docs,
+            "tfs": tfs,
+            "idf": np.log1p((cases - df + 0.5) / (df + 0.5)),
+            # BM25 length normalisation of every case
+            "norm": BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(doc_lengths.mean() if cases else 0, 1))
+        }
+
+    # Queries
+
+    def similar(self, text=None, case=None, case_id=None, limit=10, exclude=()):
+        """
+        Cases most similar to a text, a case dictionary or an indexed case
+
+        Args:
+            text: Query text (e.g. a prompt)
+            case: Case dictionary (e.g. a generated case)
+            case_id: ID of an indexed case; it is left out of the results
+            limit: Number of results
+            exclude: Case IDs to leave out (e.g. cases already practised)
+
+        Returns:
+            List of (case_id, score), best first; cases sharing no term with
+            the query are not returned
+        """
+        postings = self._term_major()
+
+        if case_id is not None:
+            row = self._rows.get(case_id)
+            if row is None:
+                return []
+            start, end = self.indptr[row], self.indptr[row + 1]
+            query = dict(zip(self.terms[start:end].tolist(), self.counts[start:end].tolist()))
+            exclude = set(exclude) | {case_id}
+        else:
+            counts = tokenize(text if text is not None else case_text(case or {}))
+            query = {self._term_ids[term]: count for term, count in counts.items() if term in self._term_ids}
+
+        if not query:
+            return []
+
+        term_ids = np.fromiter(query, dtype=np.int64, count=len(query))
+        if len(term_ids) > MAX_QUERY_TERMS:
+            weights = np.fromiter(query.values(), dtype=np.float64, count=len(query)) * postings["idf"][term_ids]
+            term_ids = term_ids[np.argpartition(-weights, MAX_QUERY_TERMS)[:MAX_QUERY_TERMS]]
+
+        # Gather the postings of every query term at once
+        starts = postings["term_indptr"][term_ids]
+        lengths = postings["term_indptr"][term_ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return []
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        docs = postings["docs"][offsets]
+        tfs = postings["tfs"][offsets].astype(np.float64)
+
+        contributions = np.repeat(postings["idf"][term_ids], lengths) * tfs * (BM25_K1 + 1) \
+            / (tfs + postings["norm"][docs])
+        scores = np.bincount(docs, weights=contributions, minlength=len(self.case_ids))
+
+        for excluded in exclude:
+            row = self._rows.get(excluded)
+            if row is not None:
+                scores[row] = 0.0
+
+        limit = min(limit, int(np.count_nonzero(scores)))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.case_ids[row], round(float(scores[row]), 4)) for row in top]
+
+    # Storage
+
+    def save(self, path):
+        """Write the index (with its postings) as one .npz file, atomically"""
+        postings = self._term_major()
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            version=np.array(SIMILARITY_VERSION),
+            case_ids=_pack_strings(self.case_ids),
+            vocabulary=_pack_strings(self.vocabulary),
+            indptr=self.indptr,
+            terms=self.terms,
+            counts=self.counts,
+            term_indptr=postings["term_indptr"],
+            docs=postings["docs"],
+            tfs=postings["tfs"]
+        )
+        write_bytes_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save()
+
+        Returns:
+            SimilarityIndex, or None if the file is missing or of another version
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != SIMILARITY_VERSION:
+                    return None
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            return None
+
+        index = cls()
+        index.case_ids = _unpack_strings(arrays["case_ids"])
+        index.vocabulary = _unpack_strings(arrays["vocabulary"])
+        index._term_ids = {term: idx for idx, term in enumerate(index.vocabulary)}
+        index._rows = {case_id: row for row, case_id in enumerate(index.case_ids)}
+        index.indptr = arrays["indptr"]
+        index.terms = arrays["terms"]
+        index.counts = arrays["counts"]
+
+        rows = np.repeat(np.arange(len(index.case_ids), dtype=np.int32), np.diff(index.indptr))
+        doc_lengths = np.bincount(rows, weights=index.counts, minlength=len(index.case_ids))
+        index._postings = index._with_weights(arrays["term_indptr"], arrays["docs"], arrays["tfs"], doc_lengths)
+        return index
+
+
+def _pack_strings(strings):
+    # Newline-separated UTF-8: no pickling, no fixed-width padding
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(array):
+    text = array.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Text Normalizer
+Canonical form of extracted page text (ligatures expanded, soft hyphens and
+hyphenated line breaks joined, exotic spaces and whitespace runs collapsed),
+produced in one pass per page together with a lower-cased shadow copy and
+an offset map back to the original text, so parsing rules can match
+case-sensitively instead of with re.IGNORECASE
+"""
+
+import bisect
+import re
+
+# One-to-one replacements (str.translate): offsets do not move. Tabs, form
+# feeds, no-break and typographic spaces become plain spaces
+CHARACTER_MAP = str.maketrans({
+    char: " " for char in "\t\v\f\u00a0\u1680\u202f\u205f\u3000" + "".join(map(chr, range(0x2000, 0x200b)))
+})
+# translate() is slow on non-ASCII text and few pages need it: look first
+MAPPED_CHARACTERS = re.compile("[" + "".join(map(chr, CHARACTER_MAP)) + "]")
+
+LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+}
+
+# Replacements that change the length of the text, applied in one regex
+# pass. There are no groups (they would slow the scan down several times):
+# a match is told apart by its first character
+REPLACEMENTS = re.compile(
+    # Ligatures and zero-width characters
+    r"[\ufb00-\ufb06\u200b-\u200d\u2060\ufeff]"
+    # Soft hyphen, with the line break it hides
+    r"|\u00ad\n?"
+    # Word hyphenated across a line break (the letter before is checked below)
+    r"|-\n(?=[a-z])"
+    # Spaces ending a line, or a run of spaces
+    r"| (?: +|(?=\r?\n|$))"
+    r"|\r\n?"
+)
+
+
+class NormalizedText:
+    """
+    Canonical text of one page
+
+    Attributes:
+        original: Text as extracted
+        text: Canonical text
+        lower: `text` lower-cased, with the same length: offsets and match
+            spans found in `lower` apply to `text`
+    """
+
+    __slots__ = ("original", "text", "lower", "_spans", "_ends")
+
+    def __init__(self, original):
+        self.original = original
+        translated = original.translate(CHARACTER_MAP) if MAPPED_CHARACTERS.search(original) else original
+
+        parts = []
+        # (canonical start, canonical end, original start, original end) of
+        # every replacement, in order
+        spans = []
+        position = 0
+        length = 0
+        for match in REPLACEMENTS.finditer(translated):
+            start, end = match.span()
+            first = translated[start]
+            if first == " ":
+                replacement = "" if end == len(translated) or translated[end] in "\r\n" else " "
+            elif first == "-":
+                if not (start and "a" <= translated[start - 1] <= "z"):
+                    continue
+                replacement = ""
+            elif first == "\r":
+                replacement = "\n"
+            else:
+                replacement = LIGATURES.get(first, "")
+
+            parts.append(translated[position:start])
+            parts.append(replacement)
+            length += start - position
+            spans.append((length, length + len(replacement), start, end))
+            length += len(replacement)
+            position = end
+        parts.append(translated[position:])
+
+        self.text = "".join(parts)
+        self._spans = spans
+        self._ends = [span[1] for span in spans]
+
+        lower = self.text.lower()
+        if len(lower) != len(self.text):
+            # A few characters (e.g. "İ") lower-case to two; leave those as
+            # they are so offsets still line up
+            lower = "".join(c.lower() if len(c.lower()) == 1 else c for c in self.text)
+        self.lower = lower
+
+    def original_offset(self, offset):
+        """Offset in the original text of an offset in the canonical text"""
+        idx = bisect.bisect_right(self._ends, offset) - 1
+
+        following = idx + 1
+        if following < len(self._spans) and offset >= self._spans[following][0]:
+            # Inside an expanded ligature or collapsed run: where it starts
+            return self._spans[following][2]
+
+        if idx < 0:
+            return offset
+        _, end, _, original_end = self._spans[idx]
+        return original_end + offset - end
+
+    def original_span(self, start, end):
+        """(start, end) in the original text of a span of the canonical text"""
+        if end <= start:
+            return (self.original_offset(start),) * 2
+        # From the last character: a span ends before characters deleted after it
+        return self.original_offset(start), self.original_offset(end - 1) + 1
+
+
+def normalize_text(text):
+    """Canonical form of a page's text (see NormalizedText)"""
+    return NormalizedText(text)
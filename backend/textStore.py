@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Text Store
+Keeps the case text of each source document once, compressed, in an
+extraction output; cases point into it with a UTF-8 byte range instead of
+embedding their own copy of the text
+"""
+
+import base64
+import lzma
+import zlib
+
+# zlib can also be read by the Node server (zlib.inflateSync); lzma is
+# smaller but Python-only
+TEXT_CODECS = {
+    "zlib": (lambda raw: zlib.compress(raw, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+DEFAULT_CODEC = "zlib"
+
+
+def pack_text(text, codec=DEFAULT_CODEC):
+    """
+    Compress a document's text for storage in JSON
+
+    Returns:
+        {"codec", "size" (UTF-8 bytes), "data" (base64)}
+    """
+    if codec not in TEXT_CODECS:
+        raise ValueError(f"Unknown text codec '{codec}' (expected one of {', '.join(TEXT_CODECS)})")
+
+    raw = text.encode("utf-8")
+    compress, _ = TEXT_CODECS[codec]
+    return {
+        "codec": codec,
+        "size": len(raw),
+        "data": base64.b64encode(compress(raw)).decode("ascii")
+    }
+
+
+def unpack_text(packed):
+    """UTF-8 bytes of a pack_text() result"""
+    _, decompress = TEXT_CODECS[packed["codec"]]
+    return decompress(base64.b64decode(packed["data"]))
+
+
+class TextStore:
+    """
+    Lazy reader of the "texts" section of an extraction output
+
+    A document is decompressed the first time one of its cases is read and
+    kept for later cases of the same document.
+    """
+
+    def __init__(self, texts):
+        """
+        Args:
+            texts: Dictionary of source -> pack_text() result
+        """
+        self.texts = texts or {}
+        self._documents = {}
+
+    def document(self, source):
+        """UTF-8 bytes of a source's text"""
+        raw = self._documents.get(source)
+        if raw is None:
+            raw = self._documents[source] = unpack_text(self.texts[source])
+        return raw
+
+    def case_text(self, case):
+        """
+        Text of one case
+
+        Falls back to an embedded "raw_text" (outputs written before the
+        text store) and returns "" for a case without either.
+        """
+        text_range = case.get("text_range")
+        if text_range is None or case.get("source") not in self.texts:
+            return case.get("raw_text", "")
+
+        start, end = text_range
+        return self.document(case["source"])[start:end].decode("utf-8")
+
+    def clear(self):
+        """Drop the decompressed documents"""
+        self._documents.clear()
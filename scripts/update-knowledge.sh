@@ -4,14 +4,10 @@
 echo "🔄 Updating Knowledge Base..."
 echo ""
 
-cd backend
+cd "$(dirname "$0")/.."
 
-echo "1️⃣ Extracting cases from PDFs..."
-python3 extractPDFs.py
-
-echo ""
-echo "2️⃣ Building knowledge base..."
-node buildKnowledgeBase.js
+# One process: extracts new or changed casebooks and merges their aggregates
+python3 tools/pipeline.py kb "$@"
 
 echo ""
 echo "✅ Knowledge base updated!"
@@ -145,7 +145,53 @@ else
 fi
 
 echo ""
-echo "5. Testing API (if server is running)"
+echo "5. Testing Failure Isolation"
+echo "----------------------------"
+
+# An unreadable PDF must be quarantined without aborting the run
+ISOLATION_DIR=$(mktemp -d)
+mkdir -p "$ISOLATION_DIR/casebooks"
+echo "not a pdf" > "$ISOLATION_DIR/casebooks/garbage.pdf"
+(cd backend && python3 - "$ISOLATION_DIR" > "$ISOLATION_DIR/run.log" 2>&1 <<'PYEOF'
+import json
+import sys
+
+from extractPDFsComplete import process_all_casebooks
+
+work = sys.argv[1]
+process_all_casebooks(f"{work}/casebooks", f"{work}/output.json", page_store_path=None,
+                      shards_dir=f"{work}/shards", journal_path=f"{work}/journal.jsonl",
+                      quarantine_path=f"{work}/quarantine.json")
+with open(f"{work}/quarantine.json") as f:
+    assert "garbage.pdf" in json.dumps(json.load(f))
+PYEOF
+)
+test_check "Unreadable PDF is quarantined"
+rm -rf "$ISOLATION_DIR"
+
+echo ""
+echo "6. Testing Similarity Index"
+echo "---------------------------"
+
+# An index whose last case has no terms must load back and answer queries
+SIMILARITY_FILE=$(mktemp --suffix=.npz)
+(cd backend && python3 - "$SIMILARITY_FILE" > /dev/null 2>&1 <<'PYEOF'
+import sys
+
+from similarityIndex import SimilarityIndex
+
+index = SimilarityIndex()
+index.add([("a", "market entry airline"), ("b", "airline pricing"), ("c", "")])
+index.save(sys.argv[1])
+loaded = SimilarityIndex.load(sys.argv[1])
+assert loaded.similar(text="airline") == index.similar(text="airline")
+PYEOF
+)
+test_check "Similarity index with a trailing empty case loads"
+rm -f "$SIMILARITY_FILE"
+
+echo ""
+echo "7. Testing API (if server is running)"
 echo "--------------------------------------"
 
 # Check if server is running
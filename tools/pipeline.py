@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Case Pipeline CLI
+Single entry point for extraction, segmentation, re-parsing, benchmarks and
+statistics. Heavy PDF libraries are only imported by the subcommands that
+open PDFs, so help and non-PDF commands start fast.
+
+Usage:
+    python3 tools/pipeline.py extract [--page-workers 4] [--low-memory] ...
+    python3 tools/pipeline.py segment
+    python3 tools/pipeline.py reparse
+    python3 tools/pipeline.py run          # extract + segment in one process
+    python3 tools/pipeline.py rescore      # re-score the library after a weight change
+    python3 tools/pipeline.py examples     # rebuild the generator's example bundles
+    python3 tools/pipeline.py kb           # update the knowledge base from new or changed PDFs
+    python3 tools/pipeline.py bench [--screenshots | --startup | --codec FILE] [pdfs...]
+    python3 tools/pipeline.py stats
+    python3 tools/pipeline.py watch        # incremental updates as PDFs change
+    python3 tools/pipeline.py export       # Parquet tables for analytics
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+
+def cmd_extract(args):
+    """Extract cases and visual assets from the casebook PDFs"""
+    from extractPDFsComplete import run_extraction, print_statistics
+
+    result = run_extraction(args)
+    if result:
+        print_statistics(result)
+    return result is not None
+
+
+def cmd_segment(args):
+    """Build the organized case library from the extraction output"""
+    from segmentCasebooks import WRITE_WORKERS, CaseLibraryBuilder
+
+    builder = CaseLibraryBuilder(args.library_dir, example_budgets=args.example_budgets,
+                                 write_workers=args.write_workers or WRITE_WORKERS)
+    return builder.build_library(args.input) is not None
+
+
+def cmd_reparse(args):
+    """Re-run case parsing from the page store without opening any PDF"""
+    from extractPDFsComplete import run_extraction, print_statistics
+
+    result = run_extraction(args, reparse=True)
+    if result:
+        print_statistics(result)
+    return result is not None
+
+
+def cmd_run(args):
+    """Extract and build the library in a single process"""
+    from extractPDFsComplete import run_extraction
+    from segmentCasebooks import WRITE_WORKERS, CaseLibraryBuilder
+
+    if run_extraction(args) is None:
+        return False
+
+    builder = CaseLibraryBuilder(args.library_dir, example_budgets=args.example_budgets,
+                                 write_workers=args.write_workers or WRITE_WORKERS)
+    return builder.build_library(args.output) is not None
+
+
+def cmd_rescore(args):
+    """Recompute library quality scores and tags from the stored feature rows"""
+    import time
+    from segmentCasebooks import CaseLibraryBuilder
+
+    start = time.perf_counter()
+    index = CaseLibraryBuilder(args.library_dir).rescore_library()
+    if index is not None:
+        print(f"  in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    return index is not None
+
+
+def cmd_examples(args):
+    """Rebuild the case generator's example bundles (e.g. after the knowledge base changed)"""
+    from segmentCasebooks import CaseLibraryBuilder
+
+    builder = CaseLibraryBuilder(args.library_dir, args.knowledge_base, args.example_budgets)
+    return builder.build_example_bundles() is not None
+
+
+def cmd_kb(args):
+    """Extract new or changed casebooks and update the knowledge base statistics"""
+    from extractPDFs import process_all_pdfs
+
+    process_all_pdfs(args.casebooks_dir, args.aggregates_dir, args.knowledge_base,
+                     output_path=args.output, force=args.force)
+    return True
+
+
+def cmd_bench(args):
+    """Benchmark extraction time, memory, screenshots or CLI start-up"""
+    import benchExtraction
+
+    benchExtraction.run(args)
+    return True
+
+
+def cmd_stats(args):
+    """Print statistics of the extraction output and the case library"""
+    from extractPDFsComplete import print_statistics
+    from recordCodec import load
+
+    found = False
+
+    extraction_path = Path(args.input)
+    if extraction_path.exists():
+        print_statistics(load(extraction_path))
+        found = True
+
+    index_path = Path(args.library_dir) / "index.json"
+    if index_path.exists():
+        index = load(index_path)
+
+        print(f"\nLibrary: {index['total_cases']} cases ({index_path})")
+        for group, counts in index["statistics"].items():
+            top = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items(), key=lambda x: -x[1])[:5])
+            print(f"  {group}: {top}")
+        found = True
+
+    if not found:
+        print("\n⚠️  Nothing to report yet. Run `pipeline.py extract` first.\n")
+    else:
+        print()
+
+    return found
+
+
+def cmd_watch(args):
+    """Watch the casebooks directory and update output and library incrementally"""
+    from watchCasebooks import run_watch
+
+    return run_watch(args)
+
+
+def cmd_export(args):
+    """Export the library as Parquet tables (cases, questions, exhibits, assets)"""
+    from columnarExport import ColumnarExporter
+
+    exporter = ColumnarExporter(args.library_dir, args.output)
+    return exporter.export(full=args.full) is not None
+
+
+def build_parser():
+    """Build the argument parser (imports no PDF libraries)"""
+    from pipelineArguments import add_bench_arguments, add_extraction_arguments, add_watch_arguments
+
+    parser = argparse.ArgumentParser(
+        prog="pipeline.py",
+        description="Casebook extraction and case library pipeline"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract = subparsers.add_parser("extract", help=cmd_extract.__doc__)
+    add_extraction_arguments(extract)
+    extract.set_defaults(func=cmd_extract)
+
+    segment = subparsers.add_parser("segment", help=cmd_segment.__doc__)
+    segment.add_argument("--input", default="data/casebooks_complete.json")
+    segment.add_argument("--library-dir", default="data/library")
+    segment.add_argument("--example-budgets", type=_token_budgets_argument, default=None,
+                         help="token budget of each example bundle size, e.g. compact=1500,standard=4000")
+    segment.add_argument("--write-workers", type=int, default=None,
+                         help="threads writing case directories and copying exhibits (default: 8)")
+    segment.set_defaults(func=cmd_segment)
+
+    reparse = subparsers.add_parser("reparse", help=cmd_reparse.__doc__)
+    reparse.add_argument("--page-store", default="data/page_store.sqlite")
+    reparse.add_argument("--output", default="data/casebooks_complete.json")
+    reparse.add_argument("--profile-regex", action="store_true",
+                         help="report time spent in each parsing regex")
+    reparse.set_defaults(func=cmd_reparse)
+
+    run = subparsers.add_parser("run", help=cmd_run.__doc__)
+    add_extraction_arguments(run, reparse_flag=False)
+    run.add_argument("--library-dir", default="data/library")
+    run.add_argument("--example-budgets", type=_token_budgets_argument, default=None,
+                     help="token budget of each example bundle size, e.g. compact=1500,standard=4000")
+    run.add_argument("--write-workers", type=int, default=None,
+                     help="threads writing case directories and copying exhibits (default: 8)")
+    run.set_defaults(func=cmd_run)
+
+    rescore = subparsers.add_parser("rescore", help=cmd_rescore.__doc__)
+    rescore.add_argument("--library-dir", default="data/library")
+    rescore.set_defaults(func=cmd_rescore)
+
+    examples = subparsers.add_parser("examples", help=cmd_examples.__doc__)
+    examples.add_argument("--library-dir", default="data/library")
+    examples.add_argument("--knowledge-base", default="data/knowledge_base.json")
+    examples.add_argument("--example-budgets", type=_token_budgets_argument, default=None,
+                          help="token budget of each example bundle size, e.g. compact=1500,standard=4000")
+    examples.set_defaults(func=cmd_examples)
+
+    kb = subparsers.add_parser("kb", help=cmd_kb.__doc__)
+    kb.add_argument("--casebooks-dir", default="data/casebooks")
+    kb.add_argument("--output", default="data/extracted_cases.json")
+    kb.add_argument("--aggregates-dir", default="data/kb_aggregates")
+    kb.add_argument("--knowledge-base", default="data/knowledge_base.json")
+    kb.add_argument("--force", action="store_true",
+                    help="extract every PDF, not only new or changed ones")
+    kb.set_defaults(func=cmd_kb)
+
+    bench = subparsers.add_parser("bench", help=cmd_bench.__doc__)
+    add_bench_arguments(bench)
+    bench.set_defaults(func=cmd_bench)
+
+    stats = subparsers.add_parser("stats", help=cmd_stats.__doc__)
+    stats.add_argument("--input", default="data/casebooks_complete.json")
+    stats.add_argument("--library-dir", default="data/library")
+    stats.set_defaults(func=cmd_stats)
+
+    watch = subparsers.add_parser("watch", help=cmd_watch.__doc__)
+    add_watch_arguments(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    export = subparsers.add_parser("export", help=cmd_export.__doc__)
+    export.add_argument("--library-dir", default="data/library")
+    export.add_argument("--output", default="data/analytics")
+    export.add_argument("--full", action="store_true",
+                        help="rewrite every casebook, not only changed ones")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def _token_budgets_argument(value):
+    from exampleBundles import parse_token_budgets
+
+    try:
+        return parse_token_budgets(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = build_parser().parse_args(argv)
+    return 0 if args.func(args) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
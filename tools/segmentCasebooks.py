@@ -4,21 +4,65 @@ Casebook Segmentation Tool
 Transforms extracted cases into organized library structure
 """
 
-import json
 import shutil
+import sys
+import time
+import contextlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import re
 
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+import caseFeatures
+import exampleBundles
+import recordCodec
+from caseBundle import BUNDLE_FILE, update_bundle, write_bundle
+from caseRecords import RecordError, validate_cases
+from fileUtils import write_bytes_atomic, write_json_atomic
+from similarityIndex import SIMILARITY_FILE, SimilarityIndex
+
+# Threads writing case directories (JSON files and exhibit copies)
+WRITE_WORKERS = 8
+
+
+def _run_now(func, *args):
+    """Completed Future of func(*args), for writing without a pool"""
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
 class CaseLibraryBuilder:
     """
     Builds an organized case library from extracted casebook data
     """
 
-    def __init__(self, library_dir="data/library"):
+    def __init__(self, library_dir="data/library", knowledge_base_path=None, example_budgets=None,
+                 write_workers=WRITE_WORKERS):
+        """
+        Args:
+            library_dir: Library directory
+            knowledge_base_path: knowledge_base.json the generator's example
+                bundles are built from (default: next to the library)
+            example_budgets: Token budget of each example bundle size
+                (default: exampleBundles.DEFAULT_TOKEN_BUDGETS)
+            write_workers: Threads writing case directories (1 writes them
+                one at a time, as records are computed)
+        """
         self.library_dir = Path(library_dir)
         self.cases_dir = self.library_dir / "cases"
         self.index_path = self.library_dir / "index.json"
+        self.bundle_path = self.library_dir / BUNDLE_FILE
+        self.similarity_path = self.library_dir / SIMILARITY_FILE
+        self.knowledge_base_path = Path(knowledge_base_path or self.library_dir.parent / "knowledge_base.json")
+        self.example_budgets = example_budgets
+        self.write_workers = write_workers
 
         # Create directory structure
         self.library_dir.mkdir(parents=True, exist_ok=True)
@@ -34,6 +78,9 @@ class CaseLibraryBuilder:
         # Case counters for ID generation
         self.case_counters = {}
 
+        # Encoded case.json of the cases written by this builder, for the bundle
+        self.case_records = {}
+
     def build_library(self, extracted_data_path="data/casebooks_complete.json"):
         """
         Build the case library from extracted data
@@ -56,56 +103,255 @@ class CaseLibraryBuilder:
             print("❌ No data to process. Run extractPDFsComplete.py first.\n")
             return None
 
+        try:
+            validate_cases(extracted_data["cases"])
+        except RecordError as e:
+            print(f"❌ Invalid extraction output: {e}\n")
+            return None
+
         total_cases = len(extracted_data["cases"])
         print(f"✓ Found {total_cases} cases to process\n")
 
+        # Score all cases at once from their feature matrix
+        scores = self._score_cases(extracted_data["cases"])
+
         # Process each case
-        print("🏗️  Building library structure...\n")
-        processed_cases = []
+        print(f"🏗️  Building library structure ({self.write_workers} writer threads)...\n")
+        started = time.perf_counter()
+        processed_cases = self._process_cases(extracted_data["cases"], scores, progress=True)
+        elapsed = time.perf_counter() - started
 
-        for idx, case in enumerate(extracted_data["cases"], 1):
-            print(f"Processing case {idx}/{total_cases}...", end="\r")
-            try:
-                library_case = self._process_case(case)
-                if library_case:
-                    processed_cases.append(library_case)
-            except Exception as e:
-                print(f"\n⚠️  Warning: Error processing case {idx}: {e}")
+        print(f"\n✓ Processed {len(processed_cases)} cases successfully in {elapsed:.2f}s\n")
 
-        print(f"\n✓ Processed {len(processed_cases)} cases successfully\n")
+        # Pack the case files into one bundle, then point the index at it
+        print("📦 Packing case bundle...")
+        build = write_bundle(self.bundle_path,
+                             ((case["case_id"], self.case_records[case["case_id"]]) for case in processed_cases))
+        print("🔎 Indexing case text for similarity search...")
+        self._update_similarity([case["case_id"] for case in processed_cases], rebuild=True)
 
         # Build index
         print("📋 Building library index...")
-        index = self._build_index(processed_cases)
+        index = self._build_index(processed_cases, build)
 
         # Save index
         print("💾 Saving index...")
         self._save_index(index)
+        self.build_example_bundles()
 
         # Print summary
         self._print_summary(index)
 
         return index
 
+    def update_library(self, cases, removed_sources=()):
+        """
+        Incrementally update an existing library
+
+        Cases of removed_sources are dropped and the given cases are added
+        with fresh IDs (numbering continues after the highest existing ID, so
+        IDs are never reused). New case directories and the case bundle are
+        written first, then index.json is replaced atomically, and only then
+        are the directories of dropped cases deleted: a reader of the index
+        never sees a case that is missing on disk. The bundle copies the
+        records of kept cases from the previous bundle, and only the added
+        cases are tokenized into the similarity index.
+
+        Args:
+            cases: Extracted cases to add (e.g. of new or changed PDFs)
+            removed_sources: PDF stems whose library cases should be dropped
+                (include the stems of changed PDFs)
+
+        Returns:
+            Library index data
+        """
+        removed_sources = set(removed_sources)
+        existing = self._load_extracted_data(self.index_path)
+        entries = existing["cases"] if existing else []
+
+        kept = [e for e in entries if e.get("source") not in removed_sources]
+        dropped = [e for e in entries if e.get("source") in removed_sources]
+
+        # Seed from dropped cases too: their directories still exist until
+        # the new index is published
+        self._seed_counters(entries)
+
+        added = self._process_cases(cases, self._score_cases(cases))
+
+        library_cases = kept + added
+        paths = {entry["case_id"]: entry["path"] for entry in library_cases}
+        build, _ = update_bundle(
+            self.bundle_path,
+            list(paths),
+            self.case_records,
+            fallback=lambda case_id: self._read_case_file(paths[case_id]),
+            previous_build=((existing or {}).get("bundle") or {}).get("build")
+        )
+        self._update_similarity(list(paths), paths)
+
+        self._recount_stats(library_cases)
+        index = self._build_index(library_cases, build)
+        self._save_index(index)
+        self.build_example_bundles()
+
+        for entry in dropped:
+            shutil.rmtree(self.library_dir.parent / entry["path"], ignore_errors=True)
+
+        print(f"📚 Library updated: +{len(added)} / -{len(dropped)} cases "
+              f"({index['total_cases']} total)")
+
+        return index
+
+    def library_sources(self):
+        """
+        PDF stems present in the library index
+
+        Returns:
+            Set of stems, or None if there is no index or it predates the
+            per-case "source" field (a full build is needed first)
+        """
+        existing = self._load_extracted_data(self.index_path)
+        if existing is None or any("source" not in e for e in existing["cases"]):
+            return None
+        return {e["source"] for e in existing["cases"]}
+
+    def build_example_bundles(self):
+        """
+        Precompute the case generator's example bundles from the knowledge
+        base and the saved library index
+
+        Returns:
+            The bundles data, or None without a knowledge base
+        """
+        data = exampleBundles.build_example_bundles(self.library_dir, self.knowledge_base_path, self.example_budgets)
+        if data is None:
+            print(f"⚠️  No knowledge base at {self.knowledge_base_path}: example bundles not built")
+            return None
+
+        sizes = ", ".join(f"{name} ≤{budget}" for name, budget in data["budgets"].items())
+        print(f"🧩 Example bundles: {len(data['bundles'])} buckets ({sizes} tokens), "
+              f"{len(data['fragments'])} distinct sections")
+        return data
+
+    def _update_similarity(self, case_ids, paths=None, rebuild=False):
+        """
+        Bring the similarity index in line with the library's cases
+
+        Cases already indexed are kept as they are (their text never changes
+        under the same ID); only the others are tokenized.
+
+        Args:
+            case_ids: IDs of every library case
+            paths: Dictionary case ID -> library path, to read cases not
+                written by this builder
+            rebuild: Start from an empty index (full builds)
+        """
+        index = None if rebuild else SimilarityIndex.load(self.similarity_path)
+        index = index or SimilarityIndex()
+
+        wanted = set(case_ids)
+        index.remove([case_id for case_id in index.case_ids if case_id not in wanted])
+
+        def cases():
+            for case_id in case_ids:
+                if case_id not in index:
+                    raw = self.case_records.get(case_id) or self._read_case_file(paths[case_id])
+                    yield case_id, recordCodec.decode(raw)
+
+        index.add(cases())
+        index.save(self.similarity_path)
+        return index
+
+    def _read_case_file(self, case_path):
+        """Encoded case.json of a library case (cases missing from the previous bundle)"""
+        with open(self.library_dir.parent / case_path / "case.json", "rb") as f:
+            return f.read()
+
+    def _seed_counters(self, entries):
+        """Continue ID numbering after the highest ID already in use"""
+        self.case_counters = {}
+        for entry in entries:
+            prefix, _, number = entry["case_id"].rpartition("_")
+            key = prefix[len("case_"):]
+            if number.isdigit():
+                self.case_counters[key] = max(self.case_counters.get(key, 0), int(number))
+
+    def _recount_stats(self, entries):
+        """Recompute the index statistics from library entries"""
+        self.stats = {"by_type": {}, "by_difficulty": {}, "by_industry": {}}
+        for entry in entries:
+            self._update_stats(entry["case_type"], entry["difficulty"], entry["industry"])
+
     def _load_extracted_data(self, path):
-        """Load the extracted casebook data"""
+        """Load the extracted casebook data (JSON or .msgpack)"""
         path = Path(path)
 
         if not path.exists():
             return None
 
-        with open(path, "r") as f:
-            return json.load(f)
+        return recordCodec.load(path)
 
-    def _process_case(self, case):
+    def _process_cases(self, cases, scores, progress=False):
         """
-        Process a single case into library format
+        Process cases into library format
+
+        Records (IDs, case.json bytes, metadata, index entries) are computed
+        on this thread in case order, so IDs and the index do not depend on
+        the number of writers. Writing the case directories runs on a pool
+        of write_workers threads, or inline after each record with a single
+        writer. A case whose record or files fail is left out with a
+        warning (its ID is not handed out again).
+
+        Args:
+            cases: Cases from extraction
+            scores: Entries of _score_cases, in case order
+            progress: Print progress while the files are written
+
+        Returns:
+            Library entries of the cases written, in case order
+        """
+        pending = []
+        with contextlib.ExitStack() as stack:
+            if self.write_workers > 1:
+                submit = stack.enter_context(ThreadPoolExecutor(max_workers=self.write_workers)).submit
+            else:
+                submit = _run_now
+
+            for idx, (case, case_scores) in enumerate(zip(cases, scores), 1):
+                try:
+                    entry, raw, metadata = self._prepare_case(case, case_scores)
+                except Exception as e:
+                    print(f"\n⚠️  Warning: Error processing case {idx}: {e}")
+                    continue
+                case_dir = self.library_dir.parent / entry["path"]
+                write = submit(self._write_case, case, case_dir, raw, metadata)
+                pending.append((idx, entry, raw, write))
+
+            entries = []
+            for done, (idx, entry, raw, write) in enumerate(pending, 1):
+                try:
+                    write.result()
+                except Exception as e:
+                    print(f"\n⚠️  Warning: Error writing case {idx}: {e}")
+                    continue
+                self.case_records[entry["case_id"]] = raw
+                self._update_stats(entry["case_type"], entry["difficulty"], entry["industry"])
+                entries.append(entry)
+                if progress and (done % 50 == 0 or done == len(pending)):
+                    print(f"Processing case {done}/{len(pending)}...", end="\r")
+
+        return entries
+
+    def _prepare_case(self, case, scores):
+        """
+        Library record of a single case, without touching the disk
 
         Args:
             case: Case data from extraction
+            scores: This case's entry from _score_cases
 
         Returns:
-            Library case metadata
+            (library entry, case.json bytes, metadata.json data)
         """
         # Extract metadata
         case_type = case["metadata"].get("case_type", "general")
@@ -114,42 +360,38 @@ class CaseLibraryBuilder:
 
         # Generate unique ID
         case_id = self._generate_case_id(case_type, difficulty)
-
-        # Create case directory
-        case_dir = self._create_case_directory(case_id, case_type, difficulty)
+        case_dir = self._case_directory(case_id, case_type, difficulty)
 
         # Prepare complete case data
         complete_case = self._prepare_complete_case(case, case_id)
-
-        # Save case.json
-        case_file = case_dir / "case.json"
-        with open(case_file, "w") as f:
-            json.dump(complete_case, f, indent=2)
-
-        # Save metadata.json
-        metadata = self._create_metadata(case, case_id, case_dir)
-        metadata_file = case_dir / "metadata.json"
-        with open(metadata_file, "w") as f:
-            json.dump(metadata, f, indent=2)
-
-        # Copy visual assets if they exist
-        self._copy_exhibits(case, case_dir)
-
-        # Update statistics
-        self._update_stats(case_type, difficulty, industry)
+        raw = recordCodec.encode(complete_case)
+        metadata = self._create_metadata(case, case_id, case_dir, scores["tags"])
 
         # Return library entry
-        return {
+        entry = {
             "case_id": case_id,
             "title": self._extract_title(case),
             "case_type": case_type,
             "difficulty": difficulty,
             "industry": industry,
             "path": str(case_dir.relative_to(self.library_dir.parent)),
+            "source": case.get("source", "unknown"),
             "has_exhibits": len(case["content"].get("exhibits", [])) > 0,
             "has_visuals": case["stats"].get("has_visual_assets", False),
-            "quality_score": self._calculate_quality_score(case)
+            "quality_score": scores["quality_score"],
+            "tags": scores["tags"],
+            "features": scores["features"]
         }
+        return entry, raw, metadata
+
+    def _write_case(self, case, case_dir, raw, metadata):
+        """Write a case directory: case.json, metadata.json and exhibit copies"""
+        (case_dir / "exhibits").mkdir(parents=True, exist_ok=True)
+        write_bytes_atomic(case_dir / "case.json", raw)
+        write_json_atomic(case_dir / "metadata.json", metadata)
+
+        # Copy visual assets if they exist
+        self._copy_exhibits(case, case_dir)
 
     def _generate_case_id(self, case_type, difficulty):
         """Generate unique case ID"""
@@ -170,17 +412,9 @@ class CaseLibraryBuilder:
 
         return f"case_{type_short}_{diff_short}_{number:03d}"
 
-    def _create_case_directory(self, case_id, case_type, difficulty):
-        """Create directory structure for a case"""
-        # Create path: cases/case_type/difficulty/case_id/
-        case_path = self.cases_dir / case_type / difficulty / case_id
-        case_path.mkdir(parents=True, exist_ok=True)
-
-        # Create exhibits subdirectory
-        exhibits_path = case_path / "exhibits"
-        exhibits_path.mkdir(exist_ok=True)
-
-        return case_path
+    def _case_directory(self, case_id, case_type, difficulty):
+        """Directory of a case: cases/case_type/difficulty/case_id/ (created by _write_case)"""
+        return self.cases_dir / case_type / difficulty / case_id
 
     def _prepare_complete_case(self, case, case_id):
         """Prepare complete case data with all information"""
@@ -195,7 +429,7 @@ class CaseLibraryBuilder:
             "version": "1.0"
         }
 
-    def _create_metadata(self, case, case_id, case_dir):
+    def _create_metadata(self, case, case_id, case_dir, tags):
         """Create lightweight metadata file"""
         return {
             "case_id": case_id,
@@ -203,7 +437,7 @@ class CaseLibraryBuilder:
             "case_type": case["metadata"].get("case_type", "general"),
             "difficulty": case["metadata"].get("difficulty", "medium"),
             "industry": case["metadata"].get("industry", "General"),
-            "tags": self._generate_tags(case),
+            "tags": tags,
             "statistics": {
                 "num_questions": case["stats"].get("num_questions", 0),
                 "num_exhibits": case["stats"].get("num_exhibits", 0),
@@ -236,37 +470,27 @@ class CaseLibraryBuilder:
 
         return f"Case {case.get('case_id', 'Unknown')}"
 
-    def _generate_tags(self, case):
-        """Generate relevant tags for the case"""
-        tags = []
-
-        # Add case type as tag
-        case_type = case["metadata"].get("case_type")
-        if case_type:
-            tags.append(case_type)
-
-        # Add industry as tag
-        industry = case["metadata"].get("industry")
-        if industry:
-            tags.append(industry.lower().replace(" ", "_"))
-
-        # Add tags based on content
-        content_text = str(case["content"]).lower()
-
-        tag_keywords = {
-            "quantitative": ["calculate", "compute", "×", "÷", "equation"],
-            "qualitative": ["brainstorm", "discuss", "factors", "considerations"],
-            "market_sizing": ["market size", "tam", "addressable market"],
-            "financial_analysis": ["revenue", "cost", "profit", "margin", "npv", "irr"],
-            "competitive_analysis": ["competitor", "market share", "rivalry"],
-            "strategy": ["strategic", "positioning", "competitive advantage"]
-        }
+    def _score_cases(self, cases):
+        """
+        Quality score, tags and feature row of every case
+
+        All cases are scored together from their feature matrix (recorded at
+        extraction, or scanned from the content for older extraction output).
+
+        Returns:
+            List of {"quality_score", "tags", "features"} in case order
+        """
+        matrix = caseFeatures.feature_matrix(cases)
+        types = [case["metadata"].get("case_type", "general") for case in cases]
+        industries = [case["metadata"].get("industry", "General") for case in cases]
 
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in content_text for keyword in keywords):
-                tags.append(tag)
+        scores = caseFeatures.quality_scores(matrix)
+        tag_lists = caseFeatures.tags(matrix, types, industries)
 
-        return list(set(tags))[:10]  # Limit to 10 unique tags
+        return [
+            {"quality_score": int(score), "tags": case_tags, "features": row.tolist()}
+            for score, case_tags, row in zip(scores, tag_lists, matrix)
+        ]
 
     def _copy_exhibits(self, case, case_dir):
         """Copy visual assets to case directory"""
@@ -286,7 +510,10 @@ class CaseLibraryBuilder:
         # Copy screenshots
         screenshots = case.get("visual_assets", {}).get("screenshots", [])
         for screenshot in screenshots:
-            src_path = Path(screenshot.get("filepath", ""))
+            if "filepath" not in screenshot:
+                # Recorded on demand: rendered from its descriptor when requested
+                continue
+            src_path = Path(screenshot["filepath"])
             if src_path.exists():
                 dst_path = exhibits_dir / screenshot["filename"]
                 try:
@@ -294,35 +521,40 @@ class CaseLibraryBuilder:
                 except Exception as e:
                     print(f"\n⚠️  Could not copy screenshot {screenshot['filename']}: {e}")
 
-    def _calculate_quality_score(self, case):
-        """Calculate quality score for the case"""
-        score = 0
-
-        # Has prompt
-        if case["content"].get("prompt"):
-            score += 20
+    def rescore_library(self):
+        """
+        Recompute quality scores and tags of the whole library from the
+        feature rows stored in the index (no case files are read)
 
-        # Has clarifying info
-        if case["content"].get("clarifying_information"):
-            score += 10
+        Returns:
+            Library index data, or None if the index has no features yet
+        """
+        index = self._load_extracted_data(self.index_path)
+        if index is None or index.get("features", {}).get("names") != caseFeatures.FEATURE_NAMES \
+                or any("features" not in entry for entry in index["cases"]):
+            print("❌ Index has no (current) feature rows. Rebuild the library first.\n")
+            return None
 
-        # Has framework
-        if case["content"].get("framework"):
-            score += 10
+        entries = index["cases"]
+        matrix = np.array([entry["features"] for entry in entries], dtype=np.int32) \
+            .reshape(len(entries), len(caseFeatures.FEATURE_NAMES))
+        types = [entry["case_type"] for entry in entries]
+        industries = [entry["industry"] for entry in entries]
 
-        # Has questions
-        num_questions = len(case["content"].get("questions", []))
-        score += min(num_questions * 10, 30)
+        scores = caseFeatures.quality_scores(matrix)
+        tag_lists = caseFeatures.tags(matrix, types, industries)
 
-        # Has exhibits
-        num_exhibits = len(case["content"].get("exhibits", []))
-        score += min(num_exhibits * 10, 20)
+        for entry, score, case_tags in zip(entries, scores, tag_lists):
+            entry["quality_score"] = int(score)
+            entry["tags"] = case_tags
 
-        # Has visual assets
-        if case["stats"].get("has_visual_assets"):
-            score += 10
+        index["last_updated"] = datetime.now().isoformat()
+        self._save_index(index)
+        print(f"✓ Re-scored {len(entries)} cases")
+        # Quality scores decide which library cases the bundles show
+        self.build_example_bundles()
 
-        return min(score, 100)
+        return index
 
     def _update_stats(self, case_type, difficulty, industry):
         """Update library statistics"""
@@ -330,8 +562,14 @@ class CaseLibraryBuilder:
         self.stats["by_difficulty"][difficulty] = self.stats["by_difficulty"].get(difficulty, 0) + 1
         self.stats["by_industry"][industry] = self.stats["by_industry"].get(industry, 0) + 1
 
-    def _build_index(self, cases):
-        """Build the library index"""
+    def _build_index(self, cases, bundle_build=None):
+        """
+        Build the library index
+
+        Args:
+            bundle_build: Build token of the case bundle holding these cases;
+                readers only use a bundle whose token matches the index
+        """
         return {
             "library_version": "1.0",
             "last_updated": datetime.now().isoformat(),
@@ -341,13 +579,14 @@ class CaseLibraryBuilder:
                 "by_difficulty": self.stats["by_difficulty"],
                 "by_industry": self.stats["by_industry"]
             },
+            "features": {"version": caseFeatures.FEATURES_VERSION, "names": caseFeatures.FEATURE_NAMES},
+            "bundle": {"file": BUNDLE_FILE, "build": bundle_build} if bundle_build else None,
             "cases": cases
         }
 
     def _save_index(self, index):
-        """Save the index file"""
-        with open(self.index_path, "w") as f:
-            json.dump(index, f, indent=2)
+        """Save the index file (atomically, so readers never see a partial index)"""
+        write_json_atomic(self.index_path, index)
 
     def _print_summary(self, index):
         """Print library summary"""
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Casebook Watcher
+Long-running watch mode: keeps the extraction output and the case library in
+sync with data/casebooks/, extracting only PDFs that were added or changed
+
+Usage:
+    python3 tools/watchCasebooks.py [--interval 2] [--debounce 5] [--once]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from extractionShards import ShardStore
+from fileUtils import file_signature
+from pipelineArguments import PDF_TIMEOUT, add_watch_arguments, profile_from_args
+from quarantine import Quarantine
+
+
+class CasebookWatcher:
+    """
+    Polls the casebooks directory and publishes incremental updates
+
+    Every PDF's extraction result is kept as a shard; an update re-extracts
+    only PDFs whose size or mtime changed (or that were extracted with a
+    cheaper profile), re-assembles the combined output
+    from the shards and applies the difference to the case library. Both
+    casebooks_complete.json and library/index.json are replaced atomically.
+    """
+
+    def __init__(self, casebooks_dir="data/casebooks", output_file="data/casebooks_complete.json",
+                 library_dir="data/library", shards_dir="data/extraction_shards",
+                 page_store_path="data/page_store.sqlite", interval=2.0, debounce=5.0,
+                 extractor_options=None, isolate=True, timeout=PDF_TIMEOUT, memory_limit_mb=None,
+                 quarantine_path="data/quarantine.json"):
+        """
+        Args:
+            casebooks_dir: Directory to watch for PDF files
+            output_file: Combined extraction output
+            library_dir: Case library kept up to date
+            shards_dir: Per-PDF extraction results
+            page_store_path: Page store (None disables it)
+            interval: Seconds between directory scans
+            debounce: Seconds the directory must stay unchanged before an
+                update starts, so a burst of copied files becomes one update
+            extractor_options: Extra CompleteCaseExtractor keyword arguments
+            isolate: Extract each PDF in its own worker process
+            timeout: Wall-clock limit per PDF in seconds (isolated mode)
+            memory_limit_mb: RSS limit per PDF in MB (isolated mode, Linux)
+            quarantine_path: PDFs that failed are recorded here and only
+                retried once they change
+        """
+        self.casebooks_dir = Path(casebooks_dir)
+        self.output_file = Path(output_file)
+        self.library_dir = Path(library_dir)
+        self.shards = ShardStore(shards_dir)
+        self.page_store_path = page_store_path
+        self.interval = interval
+        self.debounce = debounce
+        self.extractor_options = extractor_options or {}
+        self.isolate = isolate
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.quarantine = Quarantine(quarantine_path)
+
+        self._extractor = None
+        self._page_store = None
+
+    def snapshot(self):
+        """
+        Current PDFs and their signatures
+
+        Returns:
+            Dictionary of file name -> [size, mtime_ns]
+        """
+        snapshot = {}
+        for pdf_file in self.casebooks_dir.glob("*.pdf"):
+            try:
+                snapshot[pdf_file.name] = file_signature(pdf_file)
+            except FileNotFoundError:
+                # Removed between glob and stat
+                continue
+        return snapshot
+
+    def sync(self, snapshot=None, force=False):
+        """
+        Bring shards, extraction output and library in line with the directory
+
+        Args:
+            snapshot: Result of snapshot() (taken now if omitted)
+            force: Publish and reconcile the library even if no PDF changed
+
+        Returns:
+            True if anything was published
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+
+        changed = [
+            name for name, signature in sorted(snapshot.items())
+            if self.quarantine.reason(name, signature) is None
+            and not self.shards.is_current(name, signature, self.extractor_options.get("profile"))
+        ]
+        removed = [source for source in self.shards.sources() if source not in snapshot]
+
+        if not changed and not removed and not force:
+            return False
+
+        print(f"\n🔄 {len(changed)} new/changed, {len(removed)} removed PDF(s)")
+
+        refreshed = []
+        for name in changed:
+            if self._extract(name, snapshot[name]):
+                refreshed.append(name)
+
+        for name in removed:
+            print(f"  🗑️  {name}")
+            self.shards.remove(name)
+
+        if removed and self.page_store_path:
+            self._get_page_store().prune(snapshot)
+
+        if not refreshed and not removed and not force:
+            return False
+
+        self._publish_output(snapshot)
+        self._update_library(refreshed)
+        return True
+
+    def run(self):
+        """Watch until interrupted"""
+        print(f"\n👀 Watching {self.casebooks_dir} (every {self.interval:g}s, "
+              f"debounce {self.debounce:g}s). Press Ctrl+C to stop.")
+
+        synced = self.snapshot()
+        self.sync(synced, force=True)
+
+        last = synced
+        last_change = time.monotonic()
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.snapshot()
+
+                if current != last:
+                    last = current
+                    last_change = time.monotonic()
+                    continue
+
+                if current != synced and time.monotonic() - last_change >= self.debounce:
+                    self.sync(current)
+                    synced = current
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching\n")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._page_store is not None:
+            self._page_store.close()
+            self._page_store = None
+
+    def _get_page_store(self):
+        if self._page_store is None and self.page_store_path:
+            from pageStore import PageStore
+            self._page_store = PageStore(self.page_store_path)
+        return self._page_store
+
+    def _extract(self, name, signature):
+        """Extract one PDF into its shard; returns False (and quarantines it) on failure"""
+        from extractPDFsComplete import CompleteCaseExtractor
+        from isolatedExtraction import extract_isolated
+
+        pdf_file = self.casebooks_dir / name
+        try:
+            if self.isolate:
+                extract_isolated(pdf_file, signature, self.shards.shards_dir, self.page_store_path,
+                                 self.extractor_options, timeout=self.timeout,
+                                 memory_limit_mb=self.memory_limit_mb)
+            else:
+                if self._extractor is None:
+                    self._extractor = CompleteCaseExtractor(page_store=self._get_page_store(),
+                                                            **self.extractor_options)
+                self.shards.put(name, signature, self._extractor.extract_complete_pdf(pdf_file))
+        except Exception as e:
+            print(f"\n❌ Error processing {name}: {e} (quarantined until it changes)\n")
+            self.quarantine.add(name, signature, str(e))
+            return False
+
+        self.quarantine.release(name)
+        return True
+
+    def _publish_output(self, snapshot):
+        """Re-assemble the combined extraction output from the shards"""
+        from extractPDFsComplete import _compile_output, _save_output
+
+        results = self.shards.results(sorted(snapshot))
+        _save_output(_compile_output(results, len(snapshot)), self.output_file)
+
+    def _update_library(self, refreshed):
+        """Apply the cases of refreshed PDFs (and any drift) to the library"""
+        from segmentCasebooks import CaseLibraryBuilder
+
+        builder = CaseLibraryBuilder(self.library_dir)
+        library = builder.library_sources()
+
+        if library is None:
+            # No library yet, or one built before cases recorded their source
+            builder.build_library(self.output_file)
+            return
+
+        current = {Path(source).stem: source for source in self.shards.sources()}
+        refreshed_stems = {Path(name).stem for name in refreshed}
+
+        to_drop = refreshed_stems | (library - set(current))
+        to_add = refreshed_stems | (set(current) - library)
+
+        cases = []
+        for stem in sorted(to_add):
+            cases.extend(self.shards.get(current[stem])["result"]["cases"])
+
+        if cases or to_drop:
+            builder.update_library(cases, to_drop)
+
+
+def run_watch(args):
+    """Run watch mode (or a single sync) from parsed command-line options"""
+    watcher = CasebookWatcher(
+        args.casebooks_dir,
+        args.output,
+        library_dir=args.library_dir,
+        shards_dir=args.shards_dir,
+        page_store_path=None if args.no_page_store else args.page_store,
+        interval=args.interval,
+        debounce=args.debounce,
+        extractor_options={
+            "low_memory": args.low_memory,
+            "max_rss_mb": args.max_rss_mb,
+            "crop_exhibits": not args.full_page_screenshots,
+            "page_workers": args.page_workers,
+            "classify": not args.no_page_classifier,
+            "profile": profile_from_args(args)
+        },
+        isolate=not args.no_isolation,
+        timeout=args.pdf_timeout,
+        memory_limit_mb=args.pdf_memory_limit_mb
+    )
+
+    if args.retry_quarantined:
+        # Released entries are re-added by the next sync if they fail again
+        for source in list(watcher.quarantine.entries):
+            watcher.quarantine.release(source)
+
+    if args.once:
+        try:
+            watcher.sync(force=True)
+        finally:
+            watcher.close()
+        return True
+
+    watcher.run()
+    return True
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch data/casebooks and update incrementally")
+    add_watch_arguments(parser)
+    run_watch(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()